@@ -14,12 +14,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .machine_edge import MachineEdge
+from .implicit_machine_edge import ImplicitMachineEdge
+from .implicit_machine_edge_partition import ImplicitMachineEdgePartition
 from .machine_fpga_vertex import MachineFPGAVertex
 from .machine_graph import MachineGraph
 from .machine_spinnaker_link_vertex import MachineSpiNNakerLinkVertex
 from .machine_vertex import MachineVertex
 from .simple_machine_vertex import SimpleMachineVertex
 
-__all__ = ["MachineEdge", "MachineFPGAVertex", "MachineGraph",
+__all__ = ["ImplicitMachineEdge", "ImplicitMachineEdgePartition",
+           "MachineEdge", "MachineFPGAVertex", "MachineGraph",
            "MachineSpiNNakerLinkVertex", "MachineVertex",
            "SimpleMachineVertex"]
@@ -0,0 +1,73 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from spinn_utilities.overrides import overrides
+from .machine_edge import MachineEdge
+
+
+class ImplicitMachineEdge(MachineEdge):
+    """ A machine edge of an :py:class:`ImplicitMachineEdgePartition`, made\
+        only when asked for.
+
+    As the same edge may be made many times, edges are equal if they join\
+    the same vertices for the same application edge, and the application\
+    edge does not remember them.
+    """
+
+    __slots__ = [
+        # The partition the edge is in
+        "_partition"
+    ]
+
+    def __init__(self, pre_vertex, post_vertex, app_edge, partition):
+        """
+        :param MachineVertex pre_vertex: The vertex at the start of the edge.
+        :param MachineVertex post_vertex: The vertex at the end of the edge.
+        :param ApplicationEdge app_edge:
+            The application edge from which this was made.
+        :param ImplicitMachineEdgePartition partition:
+            The partition the edge is in
+        """
+        self._partition = partition
+        super(ImplicitMachineEdge, self).__init__(
+            pre_vertex, post_vertex, app_edge.traffic_type,
+            "machine_edge_for{}".format(app_edge.label),
+            partition.traffic_weight, app_edge)
+
+    @overrides(MachineEdge.associate_application_edge)
+    def associate_application_edge(self):
+        # The edge is made again each time it is asked for, so remembering
+        # it would keep every copy
+        pass
+
+    @property
+    def partition(self):
+        """ The partition the edge is in
+
+        :rtype: ImplicitMachineEdgePartition
+        """
+        return self._partition
+
+    def __eq__(self, other):
+        return (isinstance(other, ImplicitMachineEdge) and
+                self._pre_vertex == other._pre_vertex and
+                self._post_vertex == other._post_vertex and
+                self._app_edge == other._app_edge)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self._pre_vertex, self._post_vertex, self._app_edge))
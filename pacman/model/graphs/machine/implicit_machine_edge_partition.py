@@ -0,0 +1,126 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from spinn_utilities.overrides import overrides
+from pacman.exceptions import PacmanConfigurationException
+from pacman.model.graphs import OutgoingEdgePartition
+from .implicit_machine_edge import ImplicitMachineEdge
+from .machine_edge import MachineEdge
+
+
+class _ImplicitEdges(object):
+    """ The edges of an :py:class:`ImplicitMachineEdgePartition`, made each\
+        time they are iterated over.
+    """
+
+    __slots__ = [
+        # The partition whose edges these are
+        "_partition"
+    ]
+
+    def __init__(self, partition):
+        """
+        :param ImplicitMachineEdgePartition partition:
+        """
+        self._partition = partition
+
+    def __iter__(self):
+        partition = self._partition
+        for app_edge in partition.application_partition.edges:
+            for post_vertex in app_edge.post_vertex.machine_vertices:
+                yield ImplicitMachineEdge(
+                    partition.pre_vertex, post_vertex, app_edge, partition)
+
+    def __len__(self):
+        return sum(
+            len(app_edge.post_vertex.machine_vertices)
+            for app_edge in self._partition.application_partition.edges)
+
+    def __contains__(self, edge):
+        return (isinstance(edge, ImplicitMachineEdge) and
+                edge.partition is self._partition)
+
+
+class ImplicitMachineEdgePartition(OutgoingEdgePartition):
+    """ An outgoing edge partition of a machine vertex which holds no edges,\
+        but makes them when asked for from the partition of the application\
+        vertex of the machine vertex: one edge to each machine vertex of the\
+        post-vertex of each application edge.
+
+    The memory used is then that of the application edges, however many\
+    machine vertices they join.  The edges are\
+    :py:class:`ImplicitMachineEdge` objects; the machine edge type of the\
+    application edges is not used.
+    """
+
+    __slots__ = [
+        # The application partition the edges are made from
+        "_application_partition"
+    ]
+
+    def __init__(self, pre_vertex, application_partition):
+        """
+        :param MachineVertex pre_vertex:
+            The vertex at which all the edges start; its application vertex\
+            must be that of the application partition
+        :param OutgoingEdgePartition application_partition:
+            The application partition to make the edges from
+        """
+        super(ImplicitMachineEdgePartition, self).__init__(
+            application_partition.identifier, MachineEdge,
+            application_partition.constraints, application_partition.label,
+            application_partition.traffic_weight)
+        self._pre_vertex = pre_vertex
+        self._traffic_type = application_partition.traffic_type
+        self._application_partition = application_partition
+
+    @property
+    def application_partition(self):
+        """ The application partition the edges are made from
+
+        :rtype: OutgoingEdgePartition
+        """
+        return self._application_partition
+
+    @overrides(OutgoingEdgePartition.add_edge)
+    def add_edge(self, edge):
+        raise PacmanConfigurationException(
+            "The edges of an implicit partition come from its application "
+            "partition, so no more can be added")
+
+    @property
+    @overrides(OutgoingEdgePartition.edges)
+    def edges(self):
+        return _ImplicitEdges(self)
+
+    @property
+    @overrides(OutgoingEdgePartition.n_edges)
+    def n_edges(self):
+        return len(_ImplicitEdges(self))
+
+    def edges_ending_at_vertex(self, vertex):
+        """ Get the edges of the partition that end at a machine vertex
+
+        :param MachineVertex vertex: The vertex at which the edges end
+        :rtype: list(ImplicitMachineEdge)
+        """
+        return [
+            ImplicitMachineEdge(self._pre_vertex, vertex, app_edge, self)
+            for app_edge in self._application_partition.edges
+            if app_edge.post_vertex == vertex.app_vertex]
+
+    @overrides(OutgoingEdgePartition.__contains__)
+    def __contains__(self, edge):
+        return edge in _ImplicitEdges(self)
@@ -13,17 +13,82 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import defaultdict
+from spinn_utilities.overrides import overrides
+from .implicit_machine_edge import ImplicitMachineEdge
+from .implicit_machine_edge_partition import ImplicitMachineEdgePartition
 from .machine_vertex import MachineVertex
 from .machine_edge import MachineEdge
 from pacman.model.graphs.graph import Graph
 from pacman.model.graphs import OutgoingEdgePartition
 
 
+class _EdgesWithImplicit(object):
+    """ The edges of a machine graph at a vertex: those added to the graph\
+        and those of implicit partitions, which are made each time they are\
+        iterated over.
+    """
+
+    __slots__ = [
+        # The edges added to the graph
+        "_edges",
+
+        # The implicit partitions with edges at the vertex
+        "_partitions",
+
+        # The vertex the edges end at, or None if they start at it
+        "_post_vertex"
+    ]
+
+    def __init__(self, edges, partitions, post_vertex=None):
+        """
+        :param iterable(MachineEdge) edges: The edges added to the graph
+        :param list(ImplicitMachineEdgePartition) partitions:
+            The implicit partitions with edges at the vertex
+        :param post_vertex:
+            The vertex the edges end at, or None if they start at it
+        :type post_vertex: MachineVertex or None
+        """
+        self._edges = edges
+        self._partitions = partitions
+        self._post_vertex = post_vertex
+
+    def _implicit_edges(self, partition):
+        """
+        :param ImplicitMachineEdgePartition partition:
+        :rtype: iterable(ImplicitMachineEdge)
+        """
+        if self._post_vertex is None:
+            return partition.edges
+        return partition.edges_ending_at_vertex(self._post_vertex)
+
+    def __iter__(self):
+        for edge in self._edges:
+            yield edge
+        for partition in self._partitions:
+            for edge in self._implicit_edges(partition):
+                yield edge
+
+    def __len__(self):
+        return len(self._edges) + sum(
+            len(self._implicit_edges(partition))
+            for partition in self._partitions)
+
+
 class MachineGraph(Graph):
     """ A graph whose vertices can fit on the chips of a machine.
+
+    Besides edges added to it, the graph may have\
+    :py:class:`ImplicitMachineEdgePartition` objects, added with\
+    :py:meth:`add_outgoing_edge_partition`, whose edges are made only when\
+    asked for.
     """
 
-    __slots__ = []
+    __slots__ = [
+        # The implicit partitions with an application edge ending at each
+        # application vertex, by application vertex
+        "_implicit_partitions_by_post_vertex"
+    ]
 
     def __init__(self, label, application_graph=None):
         """
@@ -38,3 +103,67 @@ class MachineGraph(Graph):
             MachineVertex, MachineEdge, OutgoingEdgePartition, label)
         if application_graph:
             application_graph.forget_machine_graph()
+        self._implicit_partitions_by_post_vertex = defaultdict(list)
+
+    @overrides(Graph.add_outgoing_edge_partition)
+    def add_outgoing_edge_partition(self, outgoing_edge_partition):
+        super(MachineGraph, self).add_outgoing_edge_partition(
+            outgoing_edge_partition)
+        if isinstance(outgoing_edge_partition, ImplicitMachineEdgePartition):
+            post_vertices = set(
+                app_edge.post_vertex for app_edge in
+                outgoing_edge_partition.application_partition.edges)
+            for post_vertex in post_vertices:
+                self._implicit_partitions_by_post_vertex[post_vertex].append(
+                    outgoing_edge_partition)
+
+    def _implicit_partitions_ending_at_vertex(self, vertex):
+        """
+        :param MachineVertex vertex:
+        :return: The implicit partitions with edges ending at the vertex
+        :rtype: list(ImplicitMachineEdgePartition)
+        """
+        if vertex.app_vertex is None:
+            return []
+        return self._implicit_partitions_by_post_vertex.get(
+            vertex.app_vertex, [])
+
+    @overrides(Graph.get_outgoing_partition_for_edge)
+    def get_outgoing_partition_for_edge(self, edge):
+        if isinstance(edge, ImplicitMachineEdge):
+            return edge.partition
+        return super(MachineGraph, self).get_outgoing_partition_for_edge(edge)
+
+    @overrides(Graph.get_edges_starting_at_vertex)
+    def get_edges_starting_at_vertex(self, vertex):
+        edges = super(MachineGraph, self).get_edges_starting_at_vertex(vertex)
+        implicit_partitions = [
+            partition for partition in
+            self.get_outgoing_edge_partitions_starting_at_vertex(vertex)
+            if isinstance(partition, ImplicitMachineEdgePartition)]
+        if not implicit_partitions:
+            return edges
+        return _EdgesWithImplicit(edges, implicit_partitions)
+
+    @overrides(Graph.get_edges_ending_at_vertex)
+    def get_edges_ending_at_vertex(self, vertex):
+        edges = super(MachineGraph, self).get_edges_ending_at_vertex(vertex)
+        implicit_partitions = self._implicit_partitions_ending_at_vertex(
+            vertex)
+        if not implicit_partitions:
+            return edges
+        return _EdgesWithImplicit(edges, implicit_partitions, vertex)
+
+    @overrides(Graph.get_edges_ending_at_vertex_with_partition_name)
+    def get_edges_ending_at_vertex_with_partition_name(
+            self, vertex, partition_name):
+        edges = super(
+            MachineGraph, self).get_edges_ending_at_vertex_with_partition_name(
+                vertex, partition_name)
+        implicit_partitions = [
+            partition for partition in
+            self._implicit_partitions_ending_at_vertex(vertex)
+            if partition.identifier == partition_name]
+        if not implicit_partitions:
+            return edges
+        return _EdgesWithImplicit(edges, implicit_partitions, vertex)
@@ -16,6 +16,48 @@
 import numpy
 from pacman.exceptions import PacmanConfigurationException
 
+#: The positions of the zero bits of each mask seen, lowest first
+_ZERO_BITS = dict()
+
+
+def zero_bits_of_mask(mask):
+    """ Get the positions of the zero bits of a 32-bit mask, which are the\
+        bits that vary between the keys that the mask matches
+
+    The positions of each mask are worked out once and then shared, so the\
+    array returned is read-only.
+
+    :param int mask: The mask
+    :return: The positions, lowest first
+    :rtype: ~numpy.ndarray(uint32)
+    """
+    zeros = _ZERO_BITS.get(mask)
+    if zeros is None:
+        zeros = numpy.array(
+            [bit for bit in range(32) if not (mask >> bit) & 1],
+            dtype="uint32")
+        zeros.flags.writeable = False
+        _ZERO_BITS[mask] = zeros
+    return zeros
+
+
+def _key_offsets(zeros, n_keys):
+    """ Get the bits to add to a base key to make each of its first keys
+
+    :param ~numpy.ndarray(uint32) zeros:
+        The positions of the zero bits of the mask, lowest first
+    :param int n_keys: The number of keys to make
+    :return: The bits of each key not in the base key, in order
+    :rtype: ~numpy.ndarray(uint32)
+    """
+    # The value of each key is continuous, with its bits spread out over
+    # the zero bits of the mask
+    values = numpy.arange(n_keys, dtype="uint32")
+    offsets = numpy.zeros(n_keys, dtype="uint32")
+    for bit, position in enumerate(zeros):
+        offsets |= ((values >> bit) & 1) << position
+    return offsets
+
 
 class BaseKeyAndMask(object):
     """ A Key and Mask to be used for routing.
@@ -86,7 +128,7 @@ class BaseKeyAndMask(object):
         return self.__repr__()
 
     def __hash__(self):
-        return self.__repr__().__hash__()
+        return hash((self._base_key, self._mask))
 
     @property
     def n_keys(self):
@@ -94,15 +136,7 @@ class BaseKeyAndMask(object):
 
         :rtype: int
         """
-        # converts mask into array of bit representation
-        unwrapped_mask = numpy.unpackbits(
-            numpy.asarray([self._mask], dtype=">u4").view(dtype="uint8"))
-
-        # how many zeros are in the bit representation array
-        zeros = numpy.where(unwrapped_mask == 0)[0]
-
-        # number of keys available from this mask size
-        return 2 ** len(zeros)
+        return 1 << len(zero_bits_of_mask(self._mask))
 
     def get_keys(self, key_array=None, offset=0, n_keys=None):
         """ Get the ordered list of keys that the combination allows
@@ -118,10 +152,7 @@ class BaseKeyAndMask(object):
             the array
         :rtype: tuple(~numpy.ndarray(int), int)
         """
-        # Get the position of the zeros in the mask - assume 32-bits
-        unwrapped_mask = numpy.unpackbits(
-            numpy.asarray([self._mask], dtype=">u4").view(dtype="uint8"))
-        zeros = numpy.where(unwrapped_mask == 0)[0]
+        zeros = zero_bits_of_mask(self._mask)
 
         # If there are no zeros, there is only one key in the range, so
         # return that
@@ -132,7 +163,7 @@ class BaseKeyAndMask(object):
             return key_array, 1
 
         # We now know how many values there are - 2^len(zeros)
-        max_n_keys = 2 ** len(zeros)
+        max_n_keys = 1 << len(zeros)
         if key_array is not None and len(key_array) < max_n_keys:
             max_n_keys = len(key_array)
         if n_keys is None or n_keys > max_n_keys:
@@ -140,19 +171,49 @@ class BaseKeyAndMask(object):
         if key_array is None:
             key_array = numpy.zeros(n_keys, dtype=">u4")
 
-        # Create a list of 2^len(zeros) keys
-        unwrapped_key = numpy.unpackbits(
-            numpy.asarray([self._base_key], dtype=">u4").view(dtype="uint8"))
-
-        # for each key, create its key with the idea of a neuron ID being
-        # continuous and live at an offset position from the bottom of
-        # the key
-        for value in range(n_keys):
-            key = numpy.copy(unwrapped_key)
-            unwrapped_value = numpy.unpackbits(
-                numpy.asarray([value], dtype=">u4")
-                     .view(dtype="uint8"))[-len(zeros):]
-            key[zeros] = unwrapped_value
-            key_array[value + offset] = \
-                numpy.packbits(key).view(dtype=">u4")[0].item()
+        key_array[offset:offset + n_keys] = (
+            _key_offsets(zeros, n_keys) | numpy.uint32(self._base_key))
         return key_array, n_keys
+
+    @staticmethod
+    def get_keys_of_all(keys_and_masks, n_keys=None):
+        """ Get the ordered list of keys that each of several combinations\
+            allows, one combination after another, in a single array
+
+        The keys of combinations with the same mask are made from one table\
+        of the bits to add to the base key, so this is much faster than\
+        calling :py:meth:`get_keys` for each combination.
+
+        :param iterable(BaseKeyAndMask) keys_and_masks:
+            The combinations to get the keys of
+        :param int n_keys:
+            Optional limit on the number of keys returned. If less than this\
+            number of keys are available, only the keys available will be\
+            returned
+        :return: An array of the keys
+        :rtype: ~numpy.ndarray(int)
+        """
+        # Work out where the keys of each combination go, so that the keys
+        # of each mask can be made in one go
+        remaining = n_keys
+        by_mask = dict()
+        offset = 0
+        for key_and_mask in keys_and_masks:
+            if remaining is not None and remaining <= 0:
+                break
+            km_n_keys = key_and_mask.n_keys
+            if remaining is not None:
+                km_n_keys = min(km_n_keys, remaining)
+                remaining -= km_n_keys
+            by_mask.setdefault(key_and_mask.mask, list()).append(
+                (key_and_mask.key, offset, km_n_keys))
+            offset += km_n_keys
+
+        key_array = numpy.zeros(offset, dtype=">u4")
+        for mask, keys in by_mask.items():
+            offsets = _key_offsets(
+                zero_bits_of_mask(mask), max(n for _, _, n in keys))
+            for base_key, start, km_n_keys in keys:
+                key_array[start:start + km_n_keys] = (
+                    offsets[:km_n_keys] | numpy.uint32(base_key))
+        return key_array
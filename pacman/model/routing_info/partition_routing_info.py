@@ -13,8 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import numpy
 from pacman.exceptions import PacmanConfigurationException
+from .base_key_and_mask import BaseKeyAndMask
 
 
 class PartitionRoutingInfo(object):
@@ -56,13 +56,7 @@ class PartitionRoutingInfo(object):
                 "You asked for {} keys, but the routing info can only "
                 "provide {} keys.".format(n_keys, max_n_keys))
 
-        key_array = numpy.zeros(n_keys, dtype=">u4")
-        offset = 0
-        for key_and_mask in self._keys_and_masks:
-            _, km_offset = key_and_mask.get_keys(
-                key_array=key_array, offset=offset, n_keys=(n_keys - offset))
-            offset += km_offset
-        return key_array
+        return BaseKeyAndMask.get_keys_of_all(self._keys_and_masks, n_keys)
 
     @property
     def keys_and_masks(self):
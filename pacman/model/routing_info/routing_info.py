@@ -13,8 +13,125 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
+import numpy
 from six import itervalues
 from pacman.exceptions import PacmanAlreadyExistsException
+from pacman.model.graphs.machine import (
+    ImplicitMachineEdge, ImplicitMachineEdgePartition)
+from .base_key_and_mask import zero_bits_of_mask
+
+
+class _KeyIndex(object):
+    """ The keys and masks of the partitions of a :py:class:`RoutingInfo`,\
+        sorted by key for each mask, to look up the partition of a key.
+    """
+
+    __slots__ = [
+        # For each mask, the zero bits of the mask, the sorted keys with
+        # that mask, and for each key the order the partition was added in
+        # and the number of keys of the partition before those of the key
+        # and mask
+        "_tables",
+
+        # The partitions in the order they were added, then None
+        "_partitions"
+    ]
+
+    def __init__(self, partition_infos):
+        """
+        :param iterable(PartitionRoutingInfo) partition_infos:
+            The routing information of the partitions, in the order added
+        """
+        partition_infos = list(partition_infos)
+
+        # The partitions, with None last to be found for an order of -1
+        self._partitions = numpy.empty(len(partition_infos) + 1, dtype=object)
+        by_mask = dict()
+        for order, partition_info in enumerate(partition_infos):
+            self._partitions[order] = partition_info.partition
+            offset = 0
+            for key_and_mask in partition_info.keys_and_masks:
+                by_mask.setdefault(key_and_mask.mask, list()).append(
+                    (key_and_mask.key_combo, order, offset))
+                offset += key_and_mask.n_keys
+
+        self._tables = list()
+        for mask, entries in by_mask.items():
+            # Where keys are shared, the partition added first is found
+            entries.sort()
+            keys, orders, offsets = zip(*entries)
+            self._tables.append((
+                mask, zero_bits_of_mask(mask),
+                numpy.array(keys, dtype="uint32"),
+                numpy.array(orders, dtype="int64"),
+                numpy.array(offsets, dtype="int64")))
+
+    def lookup(self, keys):
+        """ Find the partition of each of an array of keys
+
+        :param ~numpy.ndarray(int) keys:
+        :return: The order each partition was added in, or -1 where a key\
+            is not in any partition, and the index of each key in the keys\
+            of its partition
+        :rtype: tuple(~numpy.ndarray(int), ~numpy.ndarray(int))
+        """
+        keys = numpy.asarray(keys, dtype="uint32")
+        n_partitions = len(self._partitions) - 1
+        found = numpy.full(len(keys), n_partitions, dtype="int64")
+        atoms = numpy.zeros(len(keys), dtype="int64")
+        for mask, zeros, table_keys, orders, offsets in self._tables:
+            combos = keys & numpy.uint32(mask)
+            index = numpy.searchsorted(table_keys, combos)
+            in_table = index < len(table_keys)
+            in_table[in_table] = (
+                table_keys[index[in_table]] == combos[in_table])
+            index = index[in_table]
+            better = orders[index] < found[in_table]
+            matched = numpy.flatnonzero(in_table)[better]
+            index = index[better]
+            found[matched] = orders[index]
+
+            # The index of a key is the value of its bits under the zeros
+            # of the mask, after the keys of earlier keys and masks
+            matched_keys = keys[matched].astype("int64")
+            value = numpy.zeros(len(matched), dtype="int64")
+            for bit, position in enumerate(zeros):
+                value |= ((matched_keys >> int(position)) & 1) << bit
+            atoms[matched] = offsets[index] + value
+        found[found == n_partitions] = -1
+        return found, atoms
+
+    def get_partitions(self, orders):
+        """ Get the partitions in the order they were added
+
+        :param ~numpy.ndarray(int) orders: The orders from :py:meth:`lookup`
+        :return: The partitions, with None for an order of -1
+        :rtype: ~numpy.ndarray(OutgoingEdgePartition)
+        """
+        return self._partitions[orders]
+
+    def lookup_key(self, key):
+        """ Find the partition of a key
+
+        :param int key:
+        :return: The partition and the index of the key in the keys of the\
+            partition, or None if the key is not in any partition
+        :rtype: tuple(OutgoingEdgePartition, int) or None
+        """
+        found = None
+        for mask, zeros, table_keys, orders, offsets in self._tables:
+            combo = key & mask
+            index = int(numpy.searchsorted(table_keys, combo))
+            if (index < len(table_keys) and table_keys[index] == combo and
+                    (found is None or orders[index] < found[0])):
+                value = 0
+                for bit, position in enumerate(zeros.tolist()):
+                    value |= ((key >> position) & 1) << bit
+                found = (int(orders[index]), int(offsets[index]) + value)
+        if found is None:
+            return None
+        return self._partitions[found[0]], found[1]
 
 
 class RoutingInfo(object):
@@ -23,15 +140,19 @@ class RoutingInfo(object):
     """
 
     __slots__ = [
-        # Partition information indexed by partition
+        # Partition information indexed by partition, in the order added
         "_info_by_partition",
 
         # Partition information indexed by edge pre vertex and partition ID
         # name
         "_info_by_prevertex",
 
-        # Partition information by edge
-        "_info_by_edge"
+        # Partition information by edge, except for the edges of implicit
+        # partitions, which are made when asked for
+        "_info_by_edge",
+
+        # The index of the partitions by key, made when first needed
+        "_key_index"
     ]
 
     def __init__(self, partition_info_items=None):
@@ -42,8 +163,9 @@ class RoutingInfo(object):
             two partition information objects with the same partition
         """
 
-        # Partition information indexed by partition
-        self._info_by_partition = dict()
+        # Partition information indexed by partition, in the order added,
+        # so that the key index finds the partition added first
+        self._info_by_partition = OrderedDict()
 
         # Partition information indexed by edge pre vertex and partition ID
         # name
@@ -52,6 +174,9 @@ class RoutingInfo(object):
         # Partition information by edge
         self._info_by_edge = dict()
 
+        # The index of the partitions by key
+        self._key_index = None
+
         if partition_info_items is not None:
             for partition_info_item in partition_info_items:
                 self.add_partition_info(partition_info_item)
@@ -76,9 +201,11 @@ class RoutingInfo(object):
 
         self._info_by_partition[p] = partition_info
         self._info_by_prevertex[p.pre_vertex, p.identifier] = partition_info
+        self._key_index = None
 
-        for edge in p.edges:
-            self._info_by_edge[edge] = partition_info
+        if not isinstance(p, ImplicitMachineEdgePartition):
+            for edge in p.edges:
+                self._info_by_edge[edge] = partition_info
 
     def get_first_key_from_partition(self, partition):
         """ Get the first key associated with a particular partition
@@ -136,6 +263,8 @@ class RoutingInfo(object):
 
         :param AbstractEdge edge: The edge to search for
         """
+        if isinstance(edge, ImplicitMachineEdge):
+            return self._info_by_partition.get(edge.partition, None)
         return self._info_by_edge.get(edge, None)
 
     def get_first_key_for_edge(self, edge):
@@ -147,6 +276,44 @@ class RoutingInfo(object):
             return self._info_by_edge[edge].keys_and_masks[0].key
         return None
 
+    def __get_key_index(self):
+        """
+        :rtype: _KeyIndex
+        """
+        if self._key_index is None:
+            self._key_index = _KeyIndex(itervalues(self._info_by_partition))
+        return self._key_index
+
+    def get_partition_and_atom_from_key(self, key):
+        """ Get the partition which a key was allocated to, and the index of\
+            the key in the keys of the partition, in the order of\
+            :py:meth:`PartitionRoutingInfo.get_keys`
+
+        If more than one partition has the key, the one added first is\
+        found.
+
+        :param int key: The key to look up
+        :return: The partition and index of the key, or None if no partition\
+            has the key
+        :rtype: tuple(OutgoingEdgePartition, int) or None
+        """
+        return self.__get_key_index().lookup_key(key)
+
+    def get_partitions_and_atoms_from_keys(self, keys):
+        """ Get the partition which each of an array of keys was allocated\
+            to, and the index of each key in the keys of its partition
+
+        :param ~numpy.ndarray(int) keys: The keys to look up
+        :return: The partition of each key, or None where no partition has\
+            the key, and the index of each key in its partition (0 where no\
+            partition has the key)
+        :rtype: tuple(~numpy.ndarray(OutgoingEdgePartition),
+            ~numpy.ndarray(int))
+        """
+        key_index = self.__get_key_index()
+        orders, atoms = key_index.lookup(keys)
+        return key_index.get_partitions(orders), atoms
+
     def __iter__(self):
         """ Gets an iterator for the partition routing information
 
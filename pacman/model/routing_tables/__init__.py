@@ -17,7 +17,10 @@ from .uncompressed_multicast_routing_table import (
     UnCompressedMulticastRoutingTable)
 from .compressed_multicast_routing_table import (
     CompressedMulticastRoutingTable)
+from .array_multicast_routing_table import ArrayMulticastRoutingTable
 from .multicast_routing_tables import MulticastRoutingTables
+from .mapped_multicast_routing_tables import MappedMulticastRoutingTables
 
 __all__ = ["UnCompressedMulticastRoutingTable",
-           "CompressedMulticastRoutingTable", "MulticastRoutingTables"]
+           "CompressedMulticastRoutingTable", "ArrayMulticastRoutingTable",
+           "MulticastRoutingTables", "MappedMulticastRoutingTables"]
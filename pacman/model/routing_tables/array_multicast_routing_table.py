@@ -0,0 +1,445 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+from spinn_utilities.overrides import overrides
+from spinn_machine import MulticastRoutingEntry
+from pacman.exceptions import (
+    PacmanAlreadyExistsException, PacmanRoutingException)
+from pacman.model.routing_tables.abstract_multicast_routing_table import \
+    AbsractMulticastRoutingTable
+
+
+class ArrayMulticastRoutingTable(AbsractMulticastRoutingTable):
+    """ Represents a routing table for a chip, holding the keys, masks,\
+        routes and defaultable flags of its entries in NumPy arrays.
+
+    The arrays can be read directly, without copying, through\
+    :py:attr:`keys`, :py:attr:`masks`, :py:attr:`routes` and\
+    :py:attr:`defaultable`.  :py:class:`~spinn_machine.MulticastRoutingEntry`\
+    objects are only made when :py:attr:`multicast_routing_entries` is\
+    asked for, so the table takes a small fraction of the memory of an\
+    :py:class:`UnCompressedMulticastRoutingTable`.  Entries are best added\
+    all together with :py:meth:`add_entries`; adding them one at a time\
+    checks each against all those already in the table.
+    """
+
+    __slots__ = [
+        # The x-coordinate of the chip for which this is the routing table
+        "_x",
+
+        # The y-coordinate of the chip for which this is the routing tables
+        "_y",
+
+        # The keys of the entries, with room for more at the end
+        "_keys",
+
+        # The masks of the entries, with room for more at the end
+        "_masks",
+
+        # The spinnaker_route of each entry, with room for more at the end
+        "_routes",
+
+        # Whether each entry is defaultable, with room for more at the end
+        "_defaultable",
+
+        # The number of entries in the table
+        "_n_entries",
+
+        # The entries as MulticastRoutingEntry objects, made when first
+        # asked for, or None
+        "_entries",
+
+        # The index of the entry of each key << 32 | mask, made when first
+        # needed, or None
+        "_index_by_key_mask",
+
+        # The index of the last entry of each key, made when first needed,
+        # or None
+        "_index_by_key"
+    ]
+
+    def __init__(self, x, y, keys=(), masks=(), routes=(), defaultable=()):
+        """
+        :param int x:
+            The x-coordinate of the chip for which this is the routing table
+        :param int y:
+            The y-coordinate of the chip for which this is the routing tables
+        :param keys: The keys of the entries to add to the table
+        :type keys: ~numpy.ndarray or iterable(int)
+        :param masks: The masks of the entries
+        :type masks: ~numpy.ndarray or iterable(int)
+        :param routes: The spinnaker_route of each of the entries
+        :type routes: ~numpy.ndarray or iterable(int)
+        :param defaultable: Whether each of the entries is defaultable
+        :type defaultable: ~numpy.ndarray or iterable(bool)
+        :raise PacmanAlreadyExistsException:
+            If any two routing entries contain the same key-mask combination
+        :raise PacmanRoutingException:
+            If a key is changed when masked with its mask
+        """
+        self._x = x
+        self._y = y
+        self._keys = numpy.zeros(0, dtype=numpy.uint32)
+        self._masks = numpy.zeros(0, dtype=numpy.uint32)
+        self._routes = numpy.zeros(0, dtype=numpy.uint32)
+        self._defaultable = numpy.zeros(0, dtype=bool)
+        self._n_entries = 0
+        self._entries = None
+        self._index_by_key_mask = None
+        self._index_by_key = None
+        self.add_entries(keys, masks, routes, defaultable)
+
+    @staticmethod
+    def from_routing_table(routing_table):
+        """ Make a table with the same entries as another table
+
+        :param AbsractMulticastRoutingTable routing_table: The table to copy
+        :rtype: ArrayMulticastRoutingTable
+        """
+        entries = routing_table.multicast_routing_entries
+        return ArrayMulticastRoutingTable(
+            routing_table.x, routing_table.y,
+            [entry.routing_entry_key for entry in entries],
+            [entry.mask for entry in entries],
+            [entry.spinnaker_route for entry in entries],
+            [entry.defaultable for entry in entries])
+
+    def _reserve(self, n_entries):
+        """ Make sure that there is room for a number of entries
+
+        :param int n_entries: The number of entries needed in total
+        """
+        capacity = len(self._keys)
+        if n_entries <= capacity:
+            return
+        capacity = max(n_entries, 2 * capacity)
+        for name in ("_keys", "_masks", "_routes", "_defaultable"):
+            old = getattr(self, name)
+            new = numpy.zeros(capacity, dtype=old.dtype)
+            new[:self._n_entries] = old[:self._n_entries]
+            setattr(self, name, new)
+
+    def add_entries(self, keys, masks, routes, defaultable):
+        """ Adds routing entries to this table
+
+        :param keys: The keys of the entries to add
+        :type keys: ~numpy.ndarray or iterable(int)
+        :param masks: The masks of the entries
+        :type masks: ~numpy.ndarray or iterable(int)
+        :param routes: The spinnaker_route of each of the entries
+        :type routes: ~numpy.ndarray or iterable(int)
+        :param defaultable: Whether each of the entries is defaultable
+        :type defaultable: ~numpy.ndarray or iterable(bool)
+        :raise PacmanAlreadyExistsException:
+            If a routing entry with the same key-mask combination already
+            exists, or is added twice
+        :raise PacmanRoutingException:
+            If a key is changed when masked with its mask
+        """
+        keys = numpy.asarray(keys, dtype=numpy.uint32)
+        masks = numpy.asarray(masks, dtype=numpy.uint32)
+        routes = numpy.asarray(routes, dtype=numpy.uint32)
+        defaultable = numpy.asarray(defaultable, dtype=bool)
+        if not len(keys):
+            return
+        changed = numpy.flatnonzero((keys & masks) != keys)
+        if len(changed):
+            raise PacmanRoutingException(
+                "The key {} is changed when masked with the mask {}."
+                " This is determined to be an error in the tool chain. Please "
+                "correct this and try again.".format(
+                    keys[changed[0]], masks[changed[0]]))
+
+        start = self._n_entries
+        end = start + len(keys)
+        self._reserve(end)
+        self._keys[start:end] = keys
+        self._masks[start:end] = masks
+        self._routes[start:end] = routes
+        self._defaultable[start:end] = defaultable
+
+        # Look for key-mask pairs that are in the table more than once
+        key_masks = (self._keys[:end].astype(numpy.uint64) << 32 |
+                     self._masks[:end])
+        _, first = numpy.unique(key_masks, return_index=True)
+        if len(first) < end:
+            duplicate = numpy.setdiff1d(
+                numpy.arange(end), first, assume_unique=True)[0]
+            entry = self._entry(duplicate)
+            raise PacmanAlreadyExistsException(
+                "Multicast_routing_entry", str(entry))
+        self._n_entries = end
+        if self._entries is not None:
+            self._entries.extend(self._make_entries(start, end))
+        if self._index_by_key_mask is not None:
+            self._index_by_key_mask.update(
+                zip(key_masks[start:].tolist(), range(start, end)))
+        if self._index_by_key is not None:
+            self._index_by_key.update(zip(keys.tolist(), range(start, end)))
+
+    def add_multicast_routing_entry(self, multicast_routing_entry):
+        """ Adds a routing entry to this table
+
+        :param ~spinn_machine.MulticastRoutingEntry multicast_routing_entry:
+            The route to add
+        :rtype: None
+        :raise PacmanAlreadyExistsException:
+            If a routing entry with the same key-mask combination already
+            exists
+        """
+        key = multicast_routing_entry.routing_entry_key
+        mask = multicast_routing_entry.mask
+        n = self._n_entries
+        index_by_key_mask = self._get_index_by_key_mask()
+        key_mask = key << 32 | mask
+        if key_mask in index_by_key_mask:
+            raise PacmanAlreadyExistsException(
+                "Multicast_routing_entry", str(multicast_routing_entry))
+        self._reserve(n + 1)
+        self._keys[n] = key
+        self._masks[n] = mask
+        self._routes[n] = multicast_routing_entry.spinnaker_route
+        self._defaultable[n] = multicast_routing_entry.defaultable
+        self._n_entries = n + 1
+        index_by_key_mask[key_mask] = n
+        if self._index_by_key is not None:
+            self._index_by_key[key] = n
+        if self._entries is not None:
+            self._entries.append(self._entry(n))
+
+    @staticmethod
+    def _view(array):
+        """
+        :param ~numpy.ndarray array:
+        :return: A read-only view of the array
+        :rtype: ~numpy.ndarray
+        """
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def keys(self):
+        """ The keys of the entries, as a read-only view
+
+        :rtype: ~numpy.ndarray
+        """
+        return self._view(self._keys[:self._n_entries])
+
+    @property
+    def masks(self):
+        """ The masks of the entries, as a read-only view
+
+        :rtype: ~numpy.ndarray
+        """
+        return self._view(self._masks[:self._n_entries])
+
+    @property
+    def routes(self):
+        """ The spinnaker_route of each entry, as a read-only view
+
+        :rtype: ~numpy.ndarray
+        """
+        return self._view(self._routes[:self._n_entries])
+
+    @property
+    def defaultable(self):
+        """ Whether each entry is defaultable, as a read-only view
+
+        :rtype: ~numpy.ndarray
+        """
+        return self._view(self._defaultable[:self._n_entries])
+
+    def _entry(self, index):
+        """
+        :param int index: The index of an entry
+        :rtype: ~spinn_machine.MulticastRoutingEntry
+        """
+        return MulticastRoutingEntry(
+            int(self._keys[index]), int(self._masks[index]),
+            defaultable=bool(self._defaultable[index]),
+            spinnaker_route=int(self._routes[index]))
+
+    def _entry_at(self, index):
+        """
+        :param int index: The index of an entry
+        :return: The entry, as made before if it has been
+        :rtype: ~spinn_machine.MulticastRoutingEntry
+        """
+        if self._entries is not None:
+            return self._entries[index]
+        return self._entry(index)
+
+    def _get_index_by_key_mask(self):
+        """
+        :return: The index of the entry of each key << 32 | mask
+        :rtype: dict(int, int)
+        """
+        if self._index_by_key_mask is None:
+            n = self._n_entries
+            self._index_by_key_mask = dict(zip((
+                self._keys[:n].astype(numpy.uint64) << 32 |
+                self._masks[:n]).tolist(), range(n)))
+        return self._index_by_key_mask
+
+    def _get_index_by_key(self):
+        """
+        :return: The index of the last entry of each key
+        :rtype: dict(int, int)
+        """
+        if self._index_by_key is None:
+            # Later entries replace earlier ones with the same key
+            self._index_by_key = dict(zip(
+                self._keys[:self._n_entries].tolist(),
+                range(self._n_entries)))
+        return self._index_by_key
+
+    def _make_entries(self, start, end):
+        """
+        :param int start: The index of the first entry to make
+        :param int end: The index after the last entry to make
+        :rtype: list(~spinn_machine.MulticastRoutingEntry)
+        """
+        return [
+            MulticastRoutingEntry(
+                key, mask, defaultable=defaultable, spinnaker_route=route)
+            for key, mask, route, defaultable in zip(
+                self._keys[start:end].tolist(),
+                self._masks[start:end].tolist(),
+                self._routes[start:end].tolist(),
+                self._defaultable[start:end].tolist())]
+
+    @property
+    @overrides(AbsractMulticastRoutingTable.x)
+    def x(self):
+        """ The x-coordinate of the chip of this table
+
+        :rtype: int
+        """
+        return self._x
+
+    @property
+    @overrides(AbsractMulticastRoutingTable.y)
+    def y(self):
+        """ The y-coordinate of the chip of this table
+
+        :rtype: int
+        """
+        return self._y
+
+    @property
+    @overrides(AbsractMulticastRoutingTable.multicast_routing_entries)
+    def multicast_routing_entries(self):
+        """ The multicast routing entries in the table, made when first\
+            asked for and then kept up to date as entries are added
+
+        :rtype: list(~spinn_machine.MulticastRoutingEntry)
+        :raise None: does not raise any known exceptions
+        """
+        if self._entries is None:
+            self._entries = self._make_entries(0, self._n_entries)
+        return self._entries
+
+    @property
+    @overrides(AbsractMulticastRoutingTable.number_of_entries)
+    def number_of_entries(self):
+        """ The number of multi-cast routing entries there are in the\
+            multicast routing table
+
+        :rtype: int
+        """
+        return self._n_entries
+
+    @property
+    @overrides(AbsractMulticastRoutingTable.number_of_defaultable_entries)
+    def number_of_defaultable_entries(self):
+        """ The number of multi-cast routing entries that are set to be\
+            defaultable within this multicast routing table
+
+        :rtype: int
+        """
+        return int(numpy.count_nonzero(
+            self._defaultable[:self._n_entries]))
+
+    def get_entry_by_routing_entry_key(self, routing_entry_key):
+        """  Get the routing entry associated with the specified key \
+            or None if the routing table does not match the key
+
+        :param routing_entry_key: the routing key to be searched
+        :type routing_entry_key: int
+        :return the routing entry associated with the routing key_combo or\
+            None if no such entry exists
+        :rtype:\
+            :py:class:`spinn_machine.MulticastRoutingEntry`
+        """
+        # As in UnCompressedMulticastRoutingTable, the last entry added wins
+        index = self._get_index_by_key().get(int(routing_entry_key))
+        if index is None:
+            return None
+        return self._entry_at(index)
+
+    def get_multicast_routing_entry_by_routing_entry_key(
+            self, routing_entry_key, mask):
+        """ Get the routing entry associated with the specified key_combo-mask\
+            combination or None if the routing table does not match the\
+            key_combo
+
+        :param int routing_entry_key: the routing key to be searched
+        :param int mask: the routing mask to be searched
+        :return: the routing entry associated with the routing key_combo or\
+            None if no such entry exists
+        :rtype: ~spinn_machine.MulticastRoutingEntry or None
+        """
+        if (routing_entry_key & mask) != routing_entry_key:
+            raise PacmanRoutingException(
+                "The key {} is changed when masked with the mask {}."
+                " This is determined to be an error in the tool chain. Please "
+                "correct this and try again.".format(routing_entry_key, mask))
+
+        index = self._get_index_by_key_mask().get(
+            int(routing_entry_key) << 32 | int(mask))
+        if index is None:
+            return None
+        return self._entry_at(index)
+
+    @overrides(AbsractMulticastRoutingTable.__eq__)
+    def __eq__(self, other):
+        if not isinstance(other, ArrayMulticastRoutingTable):
+            # Let other types of table decide whether they match this one
+            if isinstance(other, AbsractMulticastRoutingTable):
+                return other.__eq__(self)
+            return False
+        if self._x != other.x or self._y != other.y:
+            return False
+        return (numpy.array_equal(self.keys, other.keys) and
+                numpy.array_equal(self.masks, other.masks) and
+                numpy.array_equal(self.routes, other.routes) and
+                numpy.array_equal(self.defaultable, other.defaultable))
+
+    @overrides(AbsractMulticastRoutingTable.__ne__)
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    @overrides(AbsractMulticastRoutingTable.__repr__)
+    def __repr__(self):
+        entry_string = ""
+        for entry in self.multicast_routing_entries:
+            entry_string += "{}\n".format(entry)
+        return "{}:{}\n\n{}".format(self._x, self._y, entry_string)
+
+    @overrides(AbsractMulticastRoutingTable.__hash__)
+    def __hash__(self):
+        return id(self)
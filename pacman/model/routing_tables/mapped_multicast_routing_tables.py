@@ -0,0 +1,239 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" A binary file format for multicast routing tables, and a collection of\
+    routing tables which reads the tables of such a file when they are\
+    asked for.
+
+A file starts with a header of the magic bytes ``PMRT``, the format version\
+and the number of tables.  An index follows, giving the x and y coordinates\
+of the chip of each table, the index of its first entry and its number of\
+entries.  The entries of all the tables follow, each as a key, a mask, a\
+spinnaker_route and a defaultable flag.  All the numbers are little-endian\
+unsigned integers.
+"""
+
+import gzip
+import json
+import os
+import numpy
+from spinn_utilities.overrides import overrides
+from pacman.exceptions import (
+    PacmanAlreadyExistsException, PacmanConfigurationException)
+from .array_multicast_routing_table import ArrayMulticastRoutingTable
+from .multicast_routing_tables import MulticastRoutingTables
+
+#: The bytes at the start of every file
+_MAGIC = b"PMRT"
+#: The version of the format written
+_VERSION = 1
+#: The layout of the header of a file
+_HEADER = numpy.dtype([
+    ("magic", "S4"), ("version", "<u4"), ("n_tables", "<u4")])
+#: The layout of the index record of each table
+_INDEX = numpy.dtype([
+    ("x", "<u4"), ("y", "<u4"), ("first", "<u8"), ("n_entries", "<u4")])
+#: The layout of each entry
+_ENTRY = numpy.dtype([
+    ("key", "<u4"), ("mask", "<u4"), ("route", "<u4"),
+    ("defaultable", "<u4")])
+
+
+def _columns(routing_table):
+    """ Get the entries of a table as arrays
+
+    :param AbsractMulticastRoutingTable routing_table:
+    :return: the keys, masks, routes and defaultable flags of the entries
+    :rtype: tuple(~numpy.ndarray, ~numpy.ndarray, ~numpy.ndarray,
+        ~numpy.ndarray)
+    """
+    if not isinstance(routing_table, ArrayMulticastRoutingTable):
+        routing_table = ArrayMulticastRoutingTable.from_routing_table(
+            routing_table)
+    return (routing_table.keys, routing_table.masks, routing_table.routes,
+            routing_table.defaultable)
+
+
+def _write(tables, filename):
+    """ Write tables to a file
+
+    :param list(tuple(int,int,tuple)) tables:
+        The x, y and columns (as from :py:func:`_columns`) of each table
+    :param str filename: The name of the file to write
+    """
+    header = numpy.zeros(1, dtype=_HEADER)
+    header["magic"] = _MAGIC
+    header["version"] = _VERSION
+    header["n_tables"] = len(tables)
+    index = numpy.zeros(len(tables), dtype=_INDEX)
+    first = 0
+    for i, (x, y, columns) in enumerate(tables):
+        index[i] = (x, y, first, len(columns[0]))
+        first += len(columns[0])
+
+    with open(filename, "wb") as f:
+        f.write(header.tobytes())
+        f.write(index.tobytes())
+        for _, _, (keys, masks, routes, defaultable) in tables:
+            entries = numpy.zeros(len(keys), dtype=_ENTRY)
+            entries["key"] = keys
+            entries["mask"] = masks
+            entries["route"] = routes
+            entries["defaultable"] = defaultable
+            f.write(entries.tobytes())
+
+
+def to_binary(router_tables, filename):
+    """ Write routing tables to a binary file
+
+    :param MulticastRoutingTables router_tables: The tables to write
+    :param str filename: The name of the file to write
+    """
+    tables = sorted(
+        (table.x, table.y, _columns(table))
+        for table in router_tables.routing_tables)
+    _write(tables, filename)
+
+
+def json_to_binary(json_filename, binary_filename):
+    """ Convert a file of routing tables written by\
+        :py:func:`~pacman.model.routing_tables.multicast_routing_tables.to_json`\
+        into a binary file
+
+    :param str json_filename:
+        The name of the JSON file, which is read through gzip if the name\
+        ends with ``.gz``
+    :param str binary_filename: The name of the binary file to write
+    """
+    opener = gzip.open if json_filename.endswith(".gz") else open
+    with opener(json_filename) as j_file:
+        j_router = json.load(j_file)
+    tables = list()
+    for j_table in j_router:
+        j_entries = j_table["entries"]
+        tables.append((j_table["x"], j_table["y"], (
+            [j_entry["key"] for j_entry in j_entries],
+            [j_entry["mask"] for j_entry in j_entries],
+            [j_entry["spinnaker_route"] for j_entry in j_entries],
+            [j_entry["defaultable"] for j_entry in j_entries])))
+    tables.sort(key=lambda table: (table[0], table[1]))
+    _write(tables, binary_filename)
+
+
+def from_binary(filename):
+    """ Read routing tables from a binary file
+
+    :param str filename: The name of the file to read
+    :return: The tables, each read from the file when first asked for
+    :rtype: MappedMulticastRoutingTables
+    """
+    return MappedMulticastRoutingTables(filename)
+
+
+class MappedMulticastRoutingTables(MulticastRoutingTables):
+    """ The multicast routing tables of a file written by\
+        :py:func:`to_binary`.
+
+    The file is memory-mapped, and the table of a chip is only read from it\
+    when that table is asked for.  The tables read are\
+    :py:class:`ArrayMulticastRoutingTable` objects.
+    """
+
+    __slots__ = [
+        # The index record of each table in the file, by (x, y)
+        "_index",
+
+        # The entries of all the tables in the file, memory-mapped
+        "_entries"
+    ]
+
+    def __init__(self, filename):
+        """
+        :param str filename: The name of the file to read
+        :raise PacmanConfigurationException:
+            If the file is not a routing tables file of a known version, or\
+            is truncated
+        """
+        super(MappedMulticastRoutingTables, self).__init__()
+        size = os.path.getsize(filename)
+        if size < _HEADER.itemsize:
+            raise PacmanConfigurationException(
+                "{} is not a version {} routing tables file".format(
+                    filename, _VERSION))
+        data = numpy.memmap(filename, dtype=numpy.uint8, mode="r")
+        header = data[:_HEADER.itemsize].view(_HEADER)
+        if (header["magic"][0] != _MAGIC or
+                header["version"][0] != _VERSION):
+            raise PacmanConfigurationException(
+                "{} is not a version {} routing tables file".format(
+                    filename, _VERSION))
+        start = _HEADER.itemsize
+        end = start + int(header["n_tables"][0]) * _INDEX.itemsize
+        if size < end or (size - end) % _ENTRY.itemsize:
+            raise PacmanConfigurationException(
+                "{} is truncated".format(filename))
+        index = data[start:end].view(_INDEX)
+        self._entries = data[end:].view(_ENTRY)
+        ends = index["first"] + index["n_entries"]
+        if len(ends) and int(ends.max()) > len(self._entries):
+            raise PacmanConfigurationException(
+                "{} is truncated".format(filename))
+        self._index = {
+            (int(record["x"]), int(record["y"])): record for record in index}
+
+    def _read(self, x, y):
+        """ Read the table of a chip from the file
+
+        :param int x: The x-coordinate of the chip
+        :param int y: The y-coordinate of the chip
+        :rtype: ArrayMulticastRoutingTable
+        """
+        record = self._index.pop((x, y))
+        first = int(record["first"])
+        entries = self._entries[first:first + int(record["n_entries"])]
+        table = ArrayMulticastRoutingTable(
+            x, y, entries["key"], entries["mask"], entries["route"],
+            entries["defaultable"])
+        super(MappedMulticastRoutingTables, self).add_routing_table(table)
+        return table
+
+    @overrides(MulticastRoutingTables.add_routing_table)
+    def add_routing_table(self, routing_table):
+        if (routing_table.x, routing_table.y) in self._index:
+            raise PacmanAlreadyExistsException(
+                "The Routing table for chip {}:{} already exists in this "
+                "collection and therefore is deemed an error to re-add it"
+                .format(routing_table.x, routing_table.y), str(routing_table))
+        super(MappedMulticastRoutingTables, self).add_routing_table(
+            routing_table)
+
+    @property
+    @overrides(MulticastRoutingTables.routing_tables)
+    def routing_tables(self):
+        for x, y in list(self._index):
+            self._read(x, y)
+        return super(MappedMulticastRoutingTables, self).routing_tables
+
+    @overrides(MulticastRoutingTables.get_routing_table_for_chip)
+    def get_routing_table_for_chip(self, x, y):
+        if (x, y) in self._index:
+            return self._read(x, y)
+        return super(
+            MappedMulticastRoutingTables, self).get_routing_table_for_chip(
+                x, y)
+
+    @overrides(MulticastRoutingTables.__iter__)
+    def __iter__(self):
+        return iter(self.routing_tables)
@@ -18,6 +18,8 @@ from pacman.exceptions import (
     PacmanAlreadyExistsException, PacmanRoutingException)
 from pacman.model.routing_tables.abstract_multicast_routing_table import \
     AbsractMulticastRoutingTable
+from pacman.model.routing_tables.array_multicast_routing_table import \
+    ArrayMulticastRoutingTable
 from spinn_utilities.overrides import overrides
 
 
@@ -189,7 +191,9 @@ class UnCompressedMulticastRoutingTable(AbsractMulticastRoutingTable):
 
     @overrides(AbsractMulticastRoutingTable.__eq__)
     def __eq__(self, other):
-        if not isinstance(other, UnCompressedMulticastRoutingTable):
+        if not isinstance(other, (
+                UnCompressedMulticastRoutingTable,
+                ArrayMulticastRoutingTable)):
             return False
         if self._x != other.x and self._y != other.y:
             return False
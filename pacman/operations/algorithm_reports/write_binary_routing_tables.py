@@ -0,0 +1,42 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from pacman.model.routing_tables.mapped_multicast_routing_tables import (
+    to_binary)
+
+ROUTING_TABLES_FILENAME = "routing_tables.bin"
+
+
+class WriteBinaryRoutingTables(object):
+    """ Converter from MulticastRoutingTables to the binary format read by\
+        :py:class:`~pacman.model.routing_tables.MappedMulticastRoutingTables`.
+
+    :param MulticastRoutingTables router_tables:
+        Routing Tables to convert
+    :param str json_folder: the folder to which the file is written
+    :return: the name of the generated file
+    :rtype: str
+    """
+
+    def __call__(self, router_tables, json_folder):
+        """
+        :param MulticastRoutingTables router_tables:
+        :param str json_folder:
+        :rtype: str
+        """
+        file_path = os.path.join(json_folder, ROUTING_TABLES_FILENAME)
+        to_binary(router_tables, file_path)
+        return file_path
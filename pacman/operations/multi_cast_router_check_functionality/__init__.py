@@ -13,6 +13,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from .valid_routes_checker import validate_routes
+from .valid_routes_checker import validate_routes, validate_routes_in_batches
 
-__all__ = ["validate_routes"]
+__all__ = ["validate_routes", "validate_routes_in_batches"]
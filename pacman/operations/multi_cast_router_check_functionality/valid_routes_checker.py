@@ -17,6 +17,7 @@
 """
 from collections import namedtuple
 import logging
+import numpy
 from spinn_utilities.ordered_set import OrderedSet
 from spinn_utilities.progress_bar import ProgressBar
 from spinn_utilities.log import FormatAdapter
@@ -24,8 +25,11 @@ from pacman.exceptions import PacmanRoutingException
 from pacman.model.constraints.key_allocator_constraints import (
     ContiguousKeyRangeContraint)
 from pacman.model.graphs.common import EdgeTrafficType
+from pacman.model.routing_tables import ArrayMulticastRoutingTable
+from pacman.utilities.algorithm_utilities.machine_topology import (
+    MachineTopology)
 from pacman.utilities.utility_calls import locate_constraints_of_type
-from pacman.utilities.constants import FULL_MASK
+from pacman.utilities.constants import BITS_IN_KEY, FULL_MASK
 
 logger = FormatAdapter(logging.getLogger(__name__))
 range_masks = {FULL_MASK - ((2 ** i) - 1) for i in range(33)}
@@ -35,6 +39,13 @@ PlacementTuple = namedtuple('PlacementTuple', 'x y p')
 # Define an internal class for failures
 _Failure = namedtuple('_Failure', 'router_x router_y keys source_mask')
 
+#: The number of keys traced together by :py:func:`validate_routes_in_batches`
+_BATCH_SIZE = 1 << 16
+#: The number of links of a router, which are the low bits of a spinnaker_route
+_N_LINKS = 6
+#: The number of bits of a spinnaker_route which are processors
+_N_PROCESSORS = BITS_IN_KEY - _N_LINKS
+
 
 def validate_routes(machine_graph, placements, routing_infos,
                     routing_tables, machine):
@@ -53,12 +64,35 @@ def validate_routes(machine_graph, placements, routing_infos,
         found by the search on a given router, or a cycle is detected
     """
 
-    def traffic_multicast(edge):
-        return edge.traffic_type == EdgeTrafficType.MULTICAST
-
     progress = ProgressBar(
         placements.placements,
         "Verifying the routes from each core travel to the correct locations")
+    for placement, key_and_mask, destination_placements, n_atoms, \
+            is_continuous in _traces(
+                machine_graph, placements, routing_infos, progress):
+        _search_route(
+            placement, destination_placements, key_and_mask,
+            routing_tables, machine, n_atoms, is_continuous)
+
+
+def _traces(machine_graph, placements, routing_infos, progress):
+    """ Get the keys and masks sent by each placement and the placements\
+        that each should reach
+
+    :param MachineGraph machine_graph:
+    :param Placements placements:
+    :param RoutingInfo routing_infos:
+    :param ~spinn_utilities.progress_bar.ProgressBar progress:
+        The progress bar to go over the placements with
+    :return: The placement, the key and mask, the placements to reach, the\
+        number of atoms and whether the keys and atoms mapping is continuous
+    :rtype: iterable(tuple(Placement, BaseKeyAndMask,\
+        OrderedSet(PlacementTuple), int, bool))
+    """
+
+    def traffic_multicast(edge):
+        return edge.traffic_type == EdgeTrafficType.MULTICAST
+
     for placement in progress.over(placements.placements):
 
         # locate all placements to which this placement/vertex will
@@ -99,9 +133,8 @@ def validate_routes(machine_graph, placements, routing_infos,
 
             # search for these destinations
             for key_and_mask in r_info.keys_and_masks:
-                _search_route(
-                    placement, destination_placements, key_and_mask,
-                    routing_tables, machine, n_atoms, is_continuous)
+                yield (placement, key_and_mask, destination_placements,
+                       n_atoms, is_continuous)
 
 
 def _check_if_partition_has_continuous_keys(partition):
@@ -148,6 +181,30 @@ def _search_route(source_placement, dest_placements, key_and_mask,
         routing_tables, machine, n_atoms, is_continuous,
         failed_to_cover_all_keys_routers)
 
+    _check_trace(
+        source_placement, dest_placements, key_and_mask, located_destinations,
+        failed_to_cover_all_keys_routers)
+
+
+def _check_trace(source_placement, dest_placements, key_and_mask,
+                 located_destinations, failed_to_cover_all_keys_routers):
+    """ Check that a trace reached the destinations it should have, and no\
+        others
+
+    :param Placement source_placement:
+        the placement from which the search started
+    :param iterable(PlacementTuple) dest_placements:
+        the placements to which this trace should visit only once
+    :param BaseKeyAndMask key_and_mask:
+        the key and mask associated with this set of edges
+    :param set(PlacementTuple) located_destinations:
+        the placements reached by the trace, which is emptied
+    :param list(_Failure) failed_to_cover_all_keys_routers:
+        list of failed routers for all keys
+    :rtype: None
+    :raise PacmanRoutingException:
+        when the trace completes and there are still destinations not visited
+    """
     # start removing from located_destinations and check if destinations not
     #  reached
     failed_to_reach_destinations = list()
@@ -407,7 +464,7 @@ def _locate_routing_entry(current_router, key, n_atoms):
                             hex(key), hex(key_combo), hex(entry.mask),
                             hex(last_key), hex(e_key)))
         elif entry.mask in range_masks:
-            last_atom = key + n_atoms
+            last_atom = key + n_atoms - 1
             last_key = e_key + (~entry.mask & FULL_MASK)
             if min(last_key, last_atom) - max(e_key, key) + 1 > 0:
                 raise Exception(
@@ -418,3 +475,347 @@ def _locate_routing_entry(current_router, key, n_atoms):
     if found_entry is None:
         raise PacmanRoutingException("no entry located")
     return found_entry
+
+
+def validate_routes_in_batches(machine_graph, placements, routing_infos,
+                               routing_tables, machine):
+    """ Check the routes as :py:func:`validate_routes` does, but by sending\
+        many keys through the routing tables at once.
+
+    Each table is searched as a router would, finding the first entry that\
+    matches each key, with one binary search per mask of the table.  The\
+    keys of many partitions are followed through the machine together, one\
+    hop at a time.  Every key of a partition with continuous keys is\
+    followed, rather than just the first, so each must reach all the\
+    destinations of the partition.  Keys that are not matched by any entry\
+    on a router are reported as not covered, rather than the range of each\
+    entry being checked against the keys.  Otherwise the same errors are\
+    raised as by :py:func:`validate_routes`, though not always for the\
+    same partition if several partitions are wrong.
+
+    :param MachineGraph machine_graph: the graph
+    :param Placements placements: the placements container
+    :param RoutingInfo routing_infos: the routing info container
+    :param MulticastRoutingTables routing_tables:
+        the routing tables generated by the routing algorithm
+    :param ~spinn_machine.Machine machine: the python machine object
+    :rtype: None
+    :raises PacmanRoutingException: when either no routing table entry is\
+        found by the search on a given router, or a cycle is detected
+    """
+    progress = ProgressBar(
+        placements.placements,
+        "Verifying the routes from each core travel to the correct locations")
+    tracer = _BatchTracer(routing_tables, machine)
+    for placement, key_and_mask, destination_placements, n_atoms, \
+            is_continuous in _traces(
+                machine_graph, placements, routing_infos, progress):
+        tracer.add(placement, key_and_mask, destination_placements,
+                   n_atoms if is_continuous else 1)
+        if tracer.n_keys >= _BATCH_SIZE:
+            tracer.trace()
+    tracer.trace()
+
+
+class _SearchableTable(object):
+    """ The entries of a routing table grouped by mask, with the keys of\
+        each group sorted, so that the first entry matching each of many\
+        keys can be found without looking at every entry.
+    """
+
+    __slots__ = [
+        # The spinnaker_route of each entry, then 0 for keys not matched
+        "routes",
+
+        # The number of entries in the table, which is the index given to
+        # keys not matched
+        "n_entries",
+
+        # Each mask of the table, with the sorted keys of the entries with
+        # the mask, and the index of the first entry with each key
+        "_groups"
+    ]
+
+    def __init__(self, table):
+        """
+        :param table: The table, which is searched in order
+        :type table: MulticastRoutingTable or None
+        """
+        if table is None:
+            table = ArrayMulticastRoutingTable(0, 0)
+        elif not isinstance(table, ArrayMulticastRoutingTable):
+            table = ArrayMulticastRoutingTable.from_routing_table(table)
+        self.n_entries = table.number_of_entries
+        self.routes = numpy.append(table.routes, 0).astype(numpy.uint32)
+        self._groups = list()
+        for mask in numpy.unique(table.masks):
+            indices = numpy.flatnonzero(table.masks == mask)
+            keys, firsts = numpy.unique(
+                table.keys[indices], return_index=True)
+            self._groups.append((mask, keys, indices[firsts]))
+
+    def first_matching(self, keys):
+        """ Find the first entry that matches each of several keys
+
+        :param ~numpy.ndarray keys: The keys, as uint32
+        :return: The index of the entry for each key, or\
+            :py:attr:`n_entries` if there is none
+        :rtype: ~numpy.ndarray
+        """
+        found = numpy.full(len(keys), self.n_entries)
+        for mask, group_keys, indices in self._groups:
+            masked = keys & mask
+            positions = numpy.searchsorted(group_keys, masked)
+            positions[positions == len(group_keys)] = 0
+            hits = group_keys[positions] == masked
+            found[hits] = numpy.minimum(found[hits], indices[positions[hits]])
+        return found
+
+
+class _BatchTracer(object):
+    """ Follows many keys through the routing tables at once, each from the\
+        chip of the placement that sends it.
+    """
+
+    __slots__ = [
+        # The routing tables being checked
+        "_routing_tables",
+
+        # The (x, y) coordinates of each chip, by index
+        "_coordinates",
+
+        # The index of each chip, by (x, y)
+        "_chip_ids",
+
+        # The index of the chip at the end of each link of each chip, or -1
+        "_next_chips",
+
+        # The searchable table of each chip index looked at so far
+        "_tables",
+
+        # The placement, key and mask, destinations and first key of each
+        # trace waiting to be followed
+        "_traces",
+
+        # The keys of each trace waiting to be followed
+        "_keys",
+
+        # The number of keys waiting to be followed
+        "n_keys"
+    ]
+
+    def __init__(self, routing_tables, machine):
+        """
+        :param MulticastRoutingTables routing_tables:
+        :param ~spinn_machine.Machine machine:
+        """
+        topology = MachineTopology.of(machine)
+        self._routing_tables = routing_tables
+        self._coordinates = topology.coordinates
+        self._chip_ids = topology.ids
+        self._next_chips = numpy.full(
+            (len(self._chip_ids), _N_LINKS), -1, dtype=int)
+        for chip in machine.chips:
+            chip_id = self._chip_ids[chip.x, chip.y]
+            for link in chip.router.links:
+                self._next_chips[chip_id, link.source_link_id] = \
+                    self._chip_ids.get(
+                        (link.destination_x, link.destination_y), -1)
+        self._tables = dict()
+        self._traces = list()
+        self._keys = list()
+        self.n_keys = 0
+
+    def add(self, placement, key_and_mask, destinations, n_keys):
+        """ Add a trace to be followed
+
+        :param Placement placement: The placement sending the keys
+        :param BaseKeyAndMask key_and_mask: The first key and the mask
+        :param OrderedSet(PlacementTuple) destinations:
+            The placements the keys should reach
+        :param int n_keys:
+            The number of keys to follow, counting up from the first
+        """
+        self._traces.append(
+            (placement, key_and_mask, destinations, self.n_keys))
+        self._keys.append(
+            (key_and_mask.key + numpy.arange(n_keys)).astype(numpy.uint32))
+        self.n_keys += n_keys
+
+    def __table(self, chip_id):
+        """
+        :param int chip_id:
+        :rtype: _SearchableTable
+        """
+        if chip_id not in self._tables:
+            x, y = self._coordinates[chip_id]
+            self._tables[chip_id] = _SearchableTable(
+                self._routing_tables.get_routing_table_for_chip(
+                    int(x), int(y)))
+        return self._tables[chip_id]
+
+    def __xy(self, chip_id):
+        """
+        :param int chip_id:
+        :rtype: tuple(int,int)
+        """
+        x, y = self._coordinates[chip_id]
+        return int(x), int(y)
+
+    def trace(self):
+        """ Follow the keys of all the traces added since this was last\
+            called
+
+        :raise PacmanRoutingException:
+            If any of the traces fails to reach the right destinations
+        """
+        if not self._traces:
+            return
+        traces = self._traces
+        keys = numpy.concatenate(self._keys)
+        firsts = numpy.array([trace[3] for trace in traces])
+        trace_of_key = numpy.repeat(
+            numpy.arange(len(traces)), numpy.diff(numpy.append(
+                firsts, self.n_keys)))
+        n_keys_of_trace = numpy.bincount(trace_of_key)
+        self._traces = list()
+        self._keys = list()
+        self.n_keys = 0
+
+        # Each key starts on the chip of the placement that sends it
+        rows = numpy.arange(len(keys))
+        chips = numpy.array([
+            self._chip_ids[trace[0].x, trace[0].y]
+            for trace in traces])[trace_of_key]
+        failures = dict()
+        reached = self.__follow(keys, rows, chips, firsts, trace_of_key,
+                                traces, failures)
+
+        # Work out, for each trace, the placements reached by every key
+        # and the placements reached by any
+        reached_rows, reached_chips, processors = reached
+        row_indices, bits = numpy.nonzero(
+            (processors[:, numpy.newaxis] >> numpy.arange(
+                _N_PROCESSORS, dtype=numpy.uint32)) & 1)
+        span = len(self._chip_ids) * _N_PROCESSORS
+        pairs, counts = numpy.unique(
+            trace_of_key[reached_rows[row_indices]] * span +
+            reached_chips[row_indices] * _N_PROCESSORS + bits,
+            return_counts=True)
+        by_all = pairs[counts == n_keys_of_trace[pairs // span]]
+        expected = numpy.array([
+            index * span + self._chip_ids[dest.x, dest.y] * _N_PROCESSORS +
+            dest.p
+            for index, (_, _, destinations, _) in enumerate(traces)
+            for dest in destinations], dtype=int)
+        missed = numpy.setdiff1d(expected, by_all)
+        extra = numpy.setdiff1d(pairs, expected)
+        bad = numpy.union1d(
+            numpy.union1d(missed // span, extra // span),
+            numpy.array(list(failures), dtype=int))
+        if not len(bad):
+            return
+
+        # Report the first trace that went wrong as a single trace would
+        index = int(bad[0])
+        placement, key_and_mask, destinations, _ = traces[index]
+        located = set()
+        for pair in numpy.concatenate((
+                by_all[by_all // span == index],
+                extra[extra // span == index])):
+            chip_id, p = divmod(int(pair) % span, _N_PROCESSORS)
+            x, y = self.__xy(chip_id)
+            located.add(PlacementTuple(x, y, p))
+        _check_trace(placement, destinations, key_and_mask, located,
+                     failures.get(index, []))
+
+    def __follow(self, keys, rows, chips, firsts, trace_of_key, traces,
+                 failures):
+        """ Follow keys through the routing tables, one hop at a time
+
+        :param ~numpy.ndarray keys: The keys
+        :param ~numpy.ndarray rows: The index of each key to start with
+        :param ~numpy.ndarray chips: The chip index each key starts on
+        :param ~numpy.ndarray firsts: The index of the first key of each trace
+        :param ~numpy.ndarray trace_of_key: The trace index of each key
+        :param list traces:
+        :param dict(int,list(_Failure)) failures:
+            The routers on which each trace has keys not covered, by trace\
+            index, which is added to
+        :return: The key index, chip index and processors of the routes\
+            which reach processors
+        :rtype: tuple(~numpy.ndarray, ~numpy.ndarray, ~numpy.ndarray)
+        :raise PacmanRoutingException:
+            If the first key of a trace is not covered on a router, or a key\
+            visits a router more than once
+        """
+        n_chips = len(self._chip_ids)
+        visited = numpy.sort(rows * n_chips + chips)
+        reached = ([], [], [])
+        while len(rows):
+            # Look each key up in the table of the chip it is on
+            routes = numpy.zeros(len(rows), dtype=numpy.uint32)
+            order = numpy.argsort(chips, kind="mergesort")
+            starts = numpy.flatnonzero(numpy.diff(chips[order])) + 1
+            for sel in numpy.split(order, starts):
+                chip_id = chips[sel[0]]
+                table = self.__table(chip_id)
+                entries = table.first_matching(keys[rows[sel]])
+                routes[sel] = table.routes[entries]
+                missed = rows[sel[entries == table.n_entries]]
+                if not len(missed):
+                    continue
+                # The first key of a trace is the one at its trace's start
+                if (firsts[trace_of_key[missed]] == missed).any():
+                    raise PacmanRoutingException("no entry located")
+                x, y = self.__xy(chip_id)
+                for index in numpy.unique(trace_of_key[missed]):
+                    failures.setdefault(int(index), []).append(_Failure(
+                        x, y, keys[missed[trace_of_key[missed] == index]]
+                        .tolist(), traces[index][1].mask))
+
+            # Note the processors the keys are sent to
+            processors = routes >> _N_LINKS
+            to_processors = numpy.flatnonzero(processors)
+            reached[0].append(rows[to_processors])
+            reached[1].append(chips[to_processors])
+            reached[2].append(processors[to_processors])
+
+            # Send the keys down the links to the next chips
+            next_rows = list()
+            next_chips = list()
+            for link in range(_N_LINKS):
+                sel = numpy.flatnonzero((routes >> link) & 1)
+                destinations = self._next_chips[chips[sel], link]
+                if (destinations < 0).any():
+                    chip_id = chips[sel[destinations < 0][0]]
+                    raise PacmanRoutingException(
+                        "the route on router {} goes down link {}, which "
+                        "does not exist".format(self.__xy(chip_id), link))
+                next_rows.append(rows[sel])
+                next_chips.append(destinations)
+            rows = numpy.concatenate(next_rows)
+            chips = numpy.concatenate(next_chips)
+
+            # Check that no key has been to any of the next chips before
+            codes = numpy.sort(rows * n_chips + chips)
+            positions = numpy.minimum(
+                numpy.searchsorted(visited, codes), len(visited) - 1)
+            repeated = numpy.concatenate((
+                codes[1:][codes[1:] == codes[:-1]],
+                codes[visited[positions] == codes]))
+            if len(repeated):
+                row, chip_id = divmod(int(repeated.min()), n_chips)
+                visited_routers = {
+                    self.__xy(code % n_chips)
+                    for code in visited[visited // n_chips == row]}
+                raise PacmanRoutingException(
+                    "visited this router before, there is a cycle here. "
+                    "The routers I've currently visited are {} and the "
+                    "router i'm visiting is {}".format(
+                        visited_routers, self.__xy(chip_id)))
+            # Merging the two sorted runs takes linear time
+            visited = numpy.sort(
+                numpy.concatenate((visited, codes)), kind="mergesort")
+
+        return tuple(numpy.concatenate(values) for values in reached)
@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from itertools import groupby
 import logging
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.exceptions import PacmanPartitionException
@@ -24,7 +25,7 @@ from pacman.model.graphs.machine import MachineGraph
 from pacman.utilities import utility_calls
 from pacman.utilities.algorithm_utilities.partition_algorithm_utilities \
     import (generate_machine_edges, get_remaining_constraints)
-from pacman.utilities.utility_objs import ResourceTracker
+from pacman.utilities.utility_objs import ChipSelection, ResourceTracker
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,9 @@ class BasicPartitioner(object):
     :param ~spinn_machine.Machine machine:
         The machine with respect to which to partition the application graph
     :param int plan_n_timesteps: number of timesteps to plan for
+    :param bool implicit_edges:
+        Whether to add implicit edge partitions to the machine graph, whose
+        machine edges are only made when they are asked for
     :return: A machine graph
     :rtype: MachineGraph
     :raise PacmanPartitionException:
@@ -52,11 +56,14 @@ class BasicPartitioner(object):
         return top / bottom
 
     # inherited from AbstractPartitionAlgorithm
-    def __call__(self, graph, machine, plan_n_timesteps):
+    def __call__(self, graph, machine, plan_n_timesteps,
+                 implicit_edges=False):
         """
         :param ApplicationGraph graph:
         :param ~spinn_machine.Machine machine:
         :param int plan_n_timesteps:
+        :param bool implicit_edges:
+            Whether to make the machine edges only when they are asked for
         :rtype: MachineGraph
         :raise PacmanPartitionException:
         """
@@ -70,14 +77,18 @@ class BasicPartitioner(object):
         # start progress bar
         progress = ProgressBar(graph.n_vertices, "Partitioning graph vertices")
         machine_graph = MachineGraph("Machine graph for " + graph.label, graph)
-        resource_tracker = ResourceTracker(machine, plan_n_timesteps)
+        # Nothing is ever deallocated here, so first fit through the index
+        # gives the same chips as walking them in order
+        resource_tracker = ResourceTracker(
+            machine, plan_n_timesteps,
+            chip_selection=ChipSelection.FIRST_FIT)
 
         # Partition one vertex at a time
         for vertex in progress.over(graph.vertices):
             self._partition_one_application_vertex(
                 vertex, resource_tracker, machine_graph, plan_n_timesteps)
 
-        generate_machine_edges(machine_graph, graph)
+        generate_machine_edges(machine_graph, graph, implicit_edges)
 
         return machine_graph, resource_tracker.chips_used
 
@@ -100,6 +111,7 @@ class BasicPartitioner(object):
                 "Not enough resources available to create vertex")
 
         # Partition into vertices
+        all_resources = list()
         for first in range(0, vertex.n_atoms, int(atoms_per_core)):
             # Determine vertex size
             last = int(min(first + atoms_per_core, vertex.n_atoms) - 1)
@@ -110,6 +122,7 @@ class BasicPartitioner(object):
             # Create and store new vertex, and increment elements first
             vertex_slice = Slice(first, last)
             resources = vertex.get_resources_used_by_atoms(vertex_slice)
+            all_resources.append(resources)
 
             m_vertex = vertex.create_machine_vertex(
                 vertex_slice, resources,
@@ -117,9 +130,32 @@ class BasicPartitioner(object):
                 get_remaining_constraints(vertex))
             m_graph.add_vertex(m_vertex)
 
-            # update allocated resources
-            res_tracker.allocate_constrained_resources(
-                resources, vertex.constraints)
+        # update allocated resources, a run of identical ones at a time
+        for resources, run in groupby(all_resources):
+            self._allocate_run(
+                res_tracker, resources, vertex.constraints, len(list(run)))
+
+    @staticmethod
+    def _allocate_run(res_tracker, resources, constraints, count):
+        """ Allocates the same resources a number of times.
+
+        :param ResourceTracker res_tracker:
+        :param ResourceContainer resources:
+        :param list(AbstractConstraint) constraints:
+        :param int count:
+        """
+        x, y, p = res_tracker.get_chip_and_core(constraints)
+        board_address, ip_tags, reverse_ip_tags = res_tracker.get_ip_tag_info(
+            resources, constraints)
+        if p is not None or ip_tags or reverse_ip_tags:
+            for _ in range(count):
+                res_tracker.allocate_constrained_resources(
+                    resources, constraints)
+            return
+        chips = None
+        if x is not None and y is not None:
+            chips = [(x, y)]
+        res_tracker.allocate_many(resources, count, chips, board_address)
 
     def _compute_atoms_per_core(self, vertex, res_tracker, plan_n_timesteps):
         """ Work out how many atoms per core are required for the given\
@@ -47,6 +47,9 @@ class PartitionAndPlacePartitioner(object):
     :param int plan_n_timesteps: number of timesteps to plan for
     :param preallocated_resources:
     :type preallocated_resources: PreAllocatedResourceContainer or None
+    :param bool implicit_edges:
+        Whether to add implicit edge partitions to the machine graph, whose
+        machine edges are only made when they are asked for
     :return:
         A machine_graph of partitioned vertices and partitioned edges,
         and the number of chips needed to satisfy this partitioning.
@@ -60,13 +63,15 @@ class PartitionAndPlacePartitioner(object):
     # inherited from AbstractPartitionAlgorithm
     def __call__(
             self, graph, machine, plan_n_timesteps,
-            preallocated_resources=None):
+            preallocated_resources=None, implicit_edges=False):
         """
         :param ApplicationGraph graph:
         :param ~spinn_machine.Machine machine:
         :param int plan_n_timesteps:
         :param preallocated_resources:
         :type preallocated_resources: PreAllocatedResourceContainer or None
+        :param bool implicit_edges:
+            Whether to make the machine edges only when they are asked for
         :rtype: tuple(MachineGraph, int)
         :raise PacmanPartitionException:
         """
@@ -108,7 +113,7 @@ class PartitionAndPlacePartitioner(object):
                     resource_tracker, progress, vertex_groups)
         progress.end()
 
-        generate_machine_edges(machine_graph, graph)
+        generate_machine_edges(machine_graph, graph, implicit_edges)
 
         return machine_graph, resource_tracker.chips_used
 
@@ -223,8 +228,9 @@ class PartitionAndPlacePartitioner(object):
     @staticmethod
     def _reallocate_resources(
             used_placements, resource_tracker, lo_atom, hi_atom):
-        """ Readjusts resource allocation and updates the placement list to\
-            take into account the new layout of the atoms
+        """ Reallocates resources and updates the placement list to\
+            take into account the new layout of the atoms.  The existing\
+            allocations must already have been rolled back.
 
         :param used_placements:
             the original list of tuples containing placement data
@@ -241,14 +247,9 @@ class PartitionAndPlacePartitioner(object):
         """
 
         new_used_placements = list()
-        for (placed_vertex, x, y, p, placed_resources,
+        for (placed_vertex, x, y, p, _,
                 ip_tags, reverse_ip_tags) in used_placements:
 
-            if not isinstance(placed_vertex, AbstractVirtual):
-                # Deallocate the existing resources
-                resource_tracker.unallocate_resources(
-                    x, y, p, placed_resources, ip_tags, reverse_ip_tags)
-
             # Get the new resource usage
             vertex_slice = Slice(lo_atom, hi_atom)
             new_resources = placed_vertex.get_resources_used_by_atoms(
@@ -291,101 +292,117 @@ class PartitionAndPlacePartitioner(object):
         """
         used_placements = list()
 
-        # Find the number of atoms that will fit in each vertex given the
-        # resources available
-        min_hi_atom = hi_atom
-        for vertex in vertices:
-
-            # get resources used by vertex
-            vertex_slice = Slice(lo_atom, hi_atom)
-            used_resources = vertex.get_resources_used_by_atoms(vertex_slice)
+        # Record the allocations made, so they can be undone in one go if
+        # the number of atoms has to be reduced
+        token = resource_tracker.checkpoint()
 
-            x = None
-            y = None
-            p = None
-            ip_tags = None
-            reverse_ip_tags = None
-            if not isinstance(vertex, AbstractVirtual):
+        try:
+            # Find the number of atoms that will fit in each vertex given the
+            # resources available
+            min_hi_atom = hi_atom
+            for vertex in vertices:
 
-                # get max resources_available on machine
-                resources_available = resource_tracker\
-                    .get_maximum_constrained_resources_available(
-                        used_resources, vertex.constraints)
-
-                # Work out the ratio of used to available resources
-                ratio = self._find_max_ratio(
-                    used_resources, resources_available, plan_n_timesteps)
-
-                if fixed_n_atoms and ratio > 1.0:
-                    raise PacmanPartitionException(
-                        "No more of vertex '{}' would fit on the board:\n"
-                        "    Allocated so far: {} atoms\n"
-                        "    Request for SDRAM: {}\n"
-                        "    Largest SDRAM space: {}".format(
-                            vertex, lo_atom - 1,
-                            used_resources.sdram.get_total_sdram(
-                                plan_n_timesteps),
-                            resources_available.sdram.get_total_sdram(
-                                plan_n_timesteps)))
-
-                while ratio > 1.0 and hi_atom >= lo_atom:
-                    # Scale the resources available by the ratio
-                    old_n_atoms = (hi_atom - lo_atom) + 1
-                    new_n_atoms = int(old_n_atoms / (ratio * 1.1))
-
-                    # Avoid infinite looping
-                    if old_n_atoms == new_n_atoms:
-                        new_n_atoms -= 1
-
-                    # Find the new resource usage
-                    hi_atom = lo_atom + new_n_atoms - 1
-                    if hi_atom >= lo_atom:
-                        vertex_slice = Slice(lo_atom, hi_atom)
-                        used_resources = \
-                            vertex.get_resources_used_by_atoms(vertex_slice)
-                        ratio = self._find_max_ratio(
-                            used_resources, resources_available,
-                            plan_n_timesteps)
-
-                # If we couldn't partition, raise an exception
-                if hi_atom < lo_atom:
-                    raise PacmanPartitionException(
-                        "No more of vertex '{}' would fit on the board:\n"
-                        "    Allocated so far: {} atoms\n"
-                        "    Request for SDRAM: {}\n"
-                        "    Largest SDRAM space: {}".format(
-                            vertex, lo_atom - 1,
-                            used_resources.sdram.get_total_sdram(
-                                plan_n_timesteps),
-                            resources_available.sdram.get_total_sdram(
-                                plan_n_timesteps)))
-
-                # Try to scale up until just below the resource usage
-                used_resources, hi_atom = self._scale_up_resource_usage(
-                    used_resources, hi_atom, lo_atom, max_atoms_per_core,
-                    vertex, plan_n_timesteps, resources_available, ratio)
-
-                # If this hi_atom is smaller than the current minimum, update
-                # the other placements to use (hopefully) less
-                # resources available
-                if hi_atom < min_hi_atom:
-                    min_hi_atom = hi_atom
-                    used_placements = self._reallocate_resources(
-                        used_placements, resource_tracker, lo_atom, hi_atom)
-
-                # Attempt to allocate the resources available for this vertex
-                # on the machine
-                try:
-                    (x, y, p, ip_tags, reverse_ip_tags) = \
-                        resource_tracker.allocate_constrained_resources(
+                # get resources used by vertex
+                vertex_slice = Slice(lo_atom, hi_atom)
+                used_resources = vertex.get_resources_used_by_atoms(
+                    vertex_slice)
+
+                x = None
+                y = None
+                p = None
+                ip_tags = None
+                reverse_ip_tags = None
+                if not isinstance(vertex, AbstractVirtual):
+
+                    # get max resources_available on machine
+                    resources_available = resource_tracker\
+                        .get_maximum_constrained_resources_available(
                             used_resources, vertex.constraints)
-                except PacmanValueError as e:
-                    raise_from(PacmanValueError(
-                        "Unable to allocate requested resources available to"
-                        " vertex '{}':\n{}".format(vertex, e)), e)
 
-            used_placements.append((vertex, x, y, p, used_resources,
-                                    ip_tags, reverse_ip_tags))
+                    # Work out the ratio of used to available resources
+                    ratio = self._find_max_ratio(
+                        used_resources, resources_available, plan_n_timesteps)
+
+                    if fixed_n_atoms and ratio > 1.0:
+                        raise PacmanPartitionException(
+                            "No more of vertex '{}' would fit on the board:\n"
+                            "    Allocated so far: {} atoms\n"
+                            "    Request for SDRAM: {}\n"
+                            "    Largest SDRAM space: {}".format(
+                                vertex, lo_atom - 1,
+                                used_resources.sdram.get_total_sdram(
+                                    plan_n_timesteps),
+                                resources_available.sdram.get_total_sdram(
+                                    plan_n_timesteps)))
+
+                    while ratio > 1.0 and hi_atom >= lo_atom:
+                        # Scale the resources available by the ratio
+                        old_n_atoms = (hi_atom - lo_atom) + 1
+                        new_n_atoms = int(old_n_atoms / (ratio * 1.1))
+
+                        # Avoid infinite looping
+                        if old_n_atoms == new_n_atoms:
+                            new_n_atoms -= 1
+
+                        # Find the new resource usage
+                        hi_atom = lo_atom + new_n_atoms - 1
+                        if hi_atom >= lo_atom:
+                            vertex_slice = Slice(lo_atom, hi_atom)
+                            used_resources = \
+                                vertex.get_resources_used_by_atoms(
+                                    vertex_slice)
+                            ratio = self._find_max_ratio(
+                                used_resources, resources_available,
+                                plan_n_timesteps)
+
+                    # If we couldn't partition, raise an exception
+                    if hi_atom < lo_atom:
+                        raise PacmanPartitionException(
+                            "No more of vertex '{}' would fit on the board:\n"
+                            "    Allocated so far: {} atoms\n"
+                            "    Request for SDRAM: {}\n"
+                            "    Largest SDRAM space: {}".format(
+                                vertex, lo_atom - 1,
+                                used_resources.sdram.get_total_sdram(
+                                    plan_n_timesteps),
+                                resources_available.sdram.get_total_sdram(
+                                    plan_n_timesteps)))
+
+                    # Try to scale up until just below the resource usage
+                    used_resources, hi_atom = self._scale_up_resource_usage(
+                        used_resources, hi_atom, lo_atom, max_atoms_per_core,
+                        vertex, plan_n_timesteps, resources_available, ratio)
+
+                    # If this hi_atom is smaller than the current minimum,
+                    # update the other placements to use (hopefully) less
+                    # resources available
+                    if hi_atom < min_hi_atom:
+                        min_hi_atom = hi_atom
+                        resource_tracker.rollback(token)
+                        token = resource_tracker.checkpoint()
+                        used_placements = self._reallocate_resources(
+                            used_placements, resource_tracker, lo_atom,
+                            hi_atom)
+
+                    # Attempt to allocate the resources available for this
+                    # vertex on the machine
+                    try:
+                        (x, y, p, ip_tags, reverse_ip_tags) = \
+                            resource_tracker.allocate_constrained_resources(
+                                used_resources, vertex.constraints)
+                    except PacmanValueError as e:
+                        raise_from(PacmanValueError(
+                            "Unable to allocate requested resources "
+                            "available to vertex '{}':\n{}".format(
+                                vertex, e)), e)
+
+                used_placements.append((vertex, x, y, p, used_resources,
+                                        ip_tags, reverse_ip_tags))
+        except Exception:
+            # Free what was allocated before the vertices stopped fitting
+            resource_tracker.rollback(token)
+            raise
+        resource_tracker.commit(token)
 
         # reduce data to what the parent requires
         final_placements = list()
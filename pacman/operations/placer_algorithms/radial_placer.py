@@ -17,7 +17,8 @@ from collections import deque
 import logging
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.model.constraints.placer_constraints import (
-    RadialPlacementFromChipConstraint, SameChipAsConstraint)
+    AbstractPlacerConstraint, RadialPlacementFromChipConstraint,
+    SameChipAsConstraint)
 from pacman.utilities.algorithm_utilities.placer_algorithm_utilities import (
     get_same_chip_vertex_groups, sort_vertices_by_known_constraints)
 from pacman.model.placements import Placement, Placements
@@ -56,12 +57,29 @@ class RadialPlacer(object):
             machine, plan_n_timesteps, self._generate_radial_chips(machine))
         vertices_on_same_chip = get_same_chip_vertex_groups(machine_graph)
         all_vertices_placed = set()
+
+        # Unconstrained vertices with the same resources are placed together
+        run = list()
+        run_resources = None
         for vertex in progress.over(vertices):
-            if vertex not in all_vertices_placed:
-                vertices_placed = self._place_vertex(
-                    vertex, resource_tracker, machine, placements,
-                    vertices_on_same_chip)
-                all_vertices_placed.update(vertices_placed)
+            if vertex in all_vertices_placed:
+                continue
+            if self._can_place_in_run(vertex, vertices_on_same_chip):
+                resources = vertex.resources_required
+                if run and resources != run_resources:
+                    self._place_run(
+                        run, run_resources, resource_tracker, placements)
+                    run = list()
+                run.append(vertex)
+                run_resources = resources
+                continue
+            self._place_run(run, run_resources, resource_tracker, placements)
+            run = list()
+            vertices_placed = self._place_vertex(
+                vertex, resource_tracker, machine, placements,
+                vertices_on_same_chip)
+            all_vertices_placed.update(vertices_placed)
+        self._place_run(run, run_resources, resource_tracker, placements)
         return placements
 
     def _check_constraints(
@@ -74,6 +92,41 @@ class RadialPlacer(object):
         ResourceTracker.check_constraints(
             vertices, additional_placement_constraints=placement_constraints)
 
+    @staticmethod
+    def _can_place_in_run(vertex, vertices_on_same_chip):
+        """ Determine if a vertex can be placed along with others that\
+            need the same resources, which is when nothing constrains where\
+            it goes.
+
+        :param MachineVertex vertex:
+        :param vertices_on_same_chip:
+        :type vertices_on_same_chip: dict(MachineVertex, set(MachineVertex))
+        :rtype: bool
+        """
+        if len(vertices_on_same_chip[vertex]) > 1:
+            return False
+        if any(isinstance(constraint, AbstractPlacerConstraint)
+               for constraint in vertex.constraints):
+            return False
+        resources = vertex.resources_required
+        return not resources.iptags and not resources.reverse_iptags
+
+    @staticmethod
+    def _place_run(run, resources, resource_tracker, placements):
+        """ Place a run of unconstrained vertices that need the same\
+            resources.
+
+        :param list(MachineVertex) run:
+        :param ResourceContainer resources:
+        :param ResourceTracker resource_tracker:
+        :param Placements placements:
+        """
+        if not run:
+            return
+        allocations = resource_tracker.allocate_many(resources, len(run))
+        for (x, y, p), vertex in zip(allocations, run):
+            placements.add_placement(Placement(vertex, x, y, p))
+
     def _place_vertex(
             self, vertex, resource_tracker, machine, placements,
             vertices_on_same_chip):
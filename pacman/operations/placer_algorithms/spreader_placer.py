@@ -13,10 +13,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from bisect import bisect_left, insort
 try:
     from collections.abc import defaultdict
 except ImportError:
     from collections import defaultdict
+from collections import OrderedDict
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.model.graphs.common import EdgeTrafficType
 from pacman.model.placements import Placement, Placements
@@ -31,6 +33,137 @@ import math
 import sys
 
 
+class _ChipOrder(object):
+    """ Chips in order of least cost first, as a stable sort by cost would\
+        put them, kept as buckets of chips of equal cost so that resorting\
+        only moves the chips whose cost has changed.
+
+    Until first sorted, the chips are in the order they were given in.
+    """
+
+    __slots__ = [
+        # The chips in the order they were given in, until first sorted
+        "_unsorted",
+
+        # The map of (x,y) and cost the chips are sorted by
+        "_cost_per_chip",
+
+        # The cost of each chip when last sorted, by (x,y)
+        "_sorted_cost",
+
+        # The distinct costs of the chips when last sorted, least first
+        "_costs",
+
+        # The chips of each cost, by cost, in order, each mapped to a
+        # sequence number which increases along the bucket
+        "_buckets",
+
+        # The sequence number to give the next chip put at the front of a
+        # bucket
+        "_front",
+
+        # The sequence number to give the next chip put at the back of a
+        # bucket
+        "_back"
+    ]
+
+    def __init__(self, chips, cost_per_chip):
+        """
+        :param iterable(tuple(int,int)) chips: the chips, in starting order
+        :param cost_per_chip: the map of (x,y) and cost.
+        :type cost_per_chip: dict(tuple(int, int), int)
+        """
+        self._unsorted = list(chips)
+        self._cost_per_chip = cost_per_chip
+        self._sorted_cost = dict.fromkeys(self._unsorted)
+        self._costs = list()
+        self._buckets = dict()
+        self._front = -1
+        self._back = 0
+
+    def resort(self, changed_chips):
+        """ Put the chips back in order of least cost first
+
+        :param iterable(tuple(int,int)) changed_chips:
+            the chips whose cost may have changed since last sorted
+        """
+        if self._unsorted is not None:
+            for chip in self._unsorted:
+                self._append(chip, self._cost_per_chip[chip])
+            self._unsorted = None
+            return
+
+        # A stable sort would keep the chips which moved in their old order,
+        # and put those whose cost went up before the chips already of their
+        # new cost, and those whose cost went down after them
+        moved = list()
+        for chip in set(changed_chips):
+            old_cost = self._sorted_cost.get(chip)
+            if old_cost is not None and (
+                    self._cost_per_chip[chip] != old_cost):
+                moved.append((old_cost, self._buckets[old_cost][chip], chip))
+        moved.sort()
+        for old_cost, _, chip in moved:
+            bucket = self._buckets[old_cost]
+            del bucket[chip]
+            if not bucket:
+                del self._buckets[old_cost]
+                del self._costs[bisect_left(self._costs, old_cost)]
+        raised = [chip for old_cost, _, chip in moved
+                  if self._cost_per_chip[chip] > old_cost]
+        self._front -= len(raised)
+        heads = dict()
+        for sequence, chip in enumerate(raised, self._front + 1):
+            cost = self._cost_per_chip[chip]
+            heads.setdefault(cost, OrderedDict())[chip] = sequence
+            self._sorted_cost[chip] = cost
+        # Rebuild each bucket with its new chips at the front, as an
+        # OrderedDict cannot have chips added at the front in place
+        for cost, head in heads.items():
+            head.update(self._bucket(cost))
+            self._buckets[cost] = head
+        for old_cost, _, chip in moved:
+            cost = self._cost_per_chip[chip]
+            if cost < old_cost:
+                self._append(chip, cost)
+
+    def _bucket(self, cost):
+        """
+        :param int cost:
+        :return: the chips of the given cost, added if needed
+        :rtype: ~collections.OrderedDict
+        """
+        bucket = self._buckets.get(cost)
+        if bucket is None:
+            bucket = OrderedDict()
+            self._buckets[cost] = bucket
+            insort(self._costs, cost)
+        return bucket
+
+    def _append(self, chip, cost):
+        """
+        :param tuple(int,int) chip:
+        :param int cost:
+        """
+        self._bucket(cost)[chip] = self._back
+        self._back += 1
+        self._sorted_cost[chip] = cost
+
+    def __iter__(self):
+        if self._unsorted is not None:
+            return iter(self._unsorted)
+        return (chip for cost in self._costs for chip in self._buckets[cost])
+
+    def __len__(self):
+        return len(self._sorted_cost)
+
+    def __contains__(self, chip):
+        return chip in self._sorted_cost
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class SpreaderPlacer(OneToOnePlacer):
     """ places vertices on as many chips as available with a effort to
     reduce the number of packets being received by the router in total.
@@ -61,11 +194,15 @@ class SpreaderPlacer(OneToOnePlacer):
     def __init__(self):
         OneToOnePlacer.__init__(self)
 
+        # The cost of each vertex, by vertex, as worked out so far
+        self._vertex_costs = dict()
+
     def __call__(self, machine_graph, machine, n_keys_map, plan_n_timesteps):
         # create progress bar
         progress_bar = ProgressBar(
             (machine_graph.n_vertices * self.ITERATIONS) + self.STEPS,
             "Placing graph vertices via spreading over an entire machine")
+        self._vertex_costs = dict()
 
         # check that the algorithm can handle the constraints
         self._check_constraints(
@@ -103,7 +240,7 @@ class SpreaderPlacer(OneToOnePlacer):
                 hard_vertex.resources_required, hard_vertex.constraints)
             placements.add_placement(Placement(hard_vertex, x, y, p))
             placed_vertices.add(hard_vertex)
-            cost_per_chip[x, y] += self._get_cost(
+            cost_per_chip[x, y] += self._get_cached_cost(
                 hard_vertex, machine_graph, n_keys_map)
 
         # place groups of verts that need the same chip on the same chip,
@@ -147,7 +284,7 @@ class SpreaderPlacer(OneToOnePlacer):
         incoming_size_map = defaultdict(list)
         for vertex in machine_graph.vertices:
             if vertex not in placed_vertices:
-                incoming_size = self._get_cost(
+                incoming_size = self._get_cached_cost(
                     vertex, machine_graph, n_keys_map)
                 incoming_size_map[incoming_size].append(vertex)
         sorted_keys = sorted(incoming_size_map.keys(), reverse=True)
@@ -155,19 +292,22 @@ class SpreaderPlacer(OneToOnePlacer):
             vert_list.extend(incoming_size_map[key])
         return vert_list
 
-    @staticmethod
-    def _sort_chips_based_off_incoming_cost(chips, cost_per_chip):
-        """ sorts chips out so that the chip in front has least incoming cost.
+    def _get_cached_cost(self, vertex, machine_graph, n_keys_map):
+        """ gets how many packets are to be processed by a given vertex,\
+            working it out only the first time it is asked for.
 
-        :param list(tuple(int,int)) chips: iterable of chips to sort
-        :param cost_per_chip: the map of (x,y) and cost.
-        :type cost_per_chip: dict(tuple(int, int), int)
-        :return: iterable of chips in a sorted fashion.
-        :rtype: list(tuple(int,int))
+        :param MachineVertex vertex: the vertex the get the cost of
+        :param MachineGraph machine_graph: the machine graph
+        :param AbstractMachinePartitionNKeysMap n_keys_map:
+            the map of outgoing partition and n keys down it.
+        :return: total keys to come into this vertex.
+        :rtype: int
         """
-
-        data = sorted(chips, key=lambda chip: cost_per_chip[chip[0], chip[1]])
-        return data
+        cost = self._vertex_costs.get(vertex)
+        if cost is None:
+            cost = self._get_cost(vertex, machine_graph, n_keys_map)
+            self._vertex_costs[vertex] = cost
+        return cost
 
     @staticmethod
     def _get_cost(vertex, machine_graph, n_keys_map):
@@ -198,8 +338,7 @@ class SpreaderPlacer(OneToOnePlacer):
             machine_graph.get_outgoing_edge_partitions_starting_at_vertex(
                 vertex)
         for partition in out_going_partitions:
-            edge = list(partition.edges)[0]
-            if edge.traffic_type == EdgeTrafficType.MULTICAST:
+            if partition.traffic_type == EdgeTrafficType.MULTICAST:
                 total_incoming_keys += \
                     n_keys_map.n_keys_for_partition(partition)
         return total_incoming_keys
@@ -242,8 +381,10 @@ class SpreaderPlacer(OneToOnePlacer):
         :param AbstractMachinePartitionNKeysMap n_keys_map:
         :rtype: None
         """
+        chips_in_order = _ChipOrder(chips_in_order, cost_per_chip)
         for vertex in same_chip_vertex_groups.keys():
             if len(same_chip_vertex_groups[vertex]) != 1:
+                changed_chips = list()
                 if vertex not in placed_vertices:
                     to_do_as_group = list()
                     for other_vert in same_chip_vertex_groups[vertex]:
@@ -264,13 +405,13 @@ class SpreaderPlacer(OneToOnePlacer):
                         placements.add_placement(
                             Placement(placed_vertex, x, y, p))
                         placed_vertices.add(placed_vertex)
-                        cost_per_chip[x, y] += self._get_cost(
+                        cost_per_chip[x, y] += self._get_cached_cost(
                             placed_vertex, machine_graph, n_keys_map)
+                        changed_chips.append((x, y))
 
                 # resort the chips, as no idea where in the list the resource
                 # tracker selected
-                chips_in_order = self._sort_chips_based_off_incoming_cost(
-                    chips_in_order, cost_per_chip)
+                chips_in_order.resort(changed_chips)
 
         # update progress bar to cover one cycle of all the verts in the graph
         progress_bar.update(len(machine_graph.vertices))
@@ -300,6 +441,8 @@ class SpreaderPlacer(OneToOnePlacer):
         :rtype: None
         """
 
+        chips_in_order = _ChipOrder(chips_in_order, cost_per_chip)
+
         # go through each 1 to 1 group separately
         for group in one_to_one_groups:
 
@@ -337,6 +480,7 @@ class SpreaderPlacer(OneToOnePlacer):
                         start_chip_y=y)
 
             # allocate verts.
+            changed_chips = list()
             for one_to_one_vertex in unallocated:
                 (x, y, p, _, _) = \
                     resource_tracker.allocate_constrained_resources(
@@ -351,12 +495,15 @@ class SpreaderPlacer(OneToOnePlacer):
                     vertex=one_to_one_vertex, x=x, y=y, p=p))
 
                 # update cost
-                cost_per_chip[x, y] += self._get_cost(
+                cost_per_chip[x, y] += self._get_cached_cost(
                     one_to_one_vertex, machine_graph, n_keys_map)
+                changed_chips.append((x, y))
 
-            # sort chips for the next group cycle
-            chips_in_order = self._sort_chips_based_off_incoming_cost(
-                chips, cost_per_chip)
+            # sort chips for the next group cycle; if the chips were radial
+            # from a shared chip, those not yet looked at become the order
+            if chips is not chips_in_order:
+                chips_in_order = _ChipOrder(chips, cost_per_chip)
+            chips_in_order.resort(changed_chips)
         # update progress bar to cover one cycle of all the verts in the graph
         progress_bar.update(len(machine_graph.vertices))
 
@@ -386,16 +533,16 @@ class SpreaderPlacer(OneToOnePlacer):
         sorted_verts = self._sort_left_over_verts_based_on_incoming_packets(
             machine_graph, placed_vertices, n_keys_map)
 
+        chips_in_order = _ChipOrder(chips_in_order, cost_per_chip)
         for vertex in sorted_verts:
             (x, y, p, _, _) = resource_tracker.allocate_constrained_resources(
                 vertex.resources_required,
                 vertex.constraints, chips_in_order)
             placements.add_placement(Placement(vertex=vertex, x=x, y=y, p=p))
-            cost_per_chip[x, y] += self._get_cost(
+            cost_per_chip[x, y] += self._get_cached_cost(
                 vertex, machine_graph, n_keys_map)
             # sort chips for the next group cycle
-            chips_in_order = self._sort_chips_based_off_incoming_cost(
-                chips_in_order, cost_per_chip)
+            chips_in_order.resort([(x, y)])
 
         progress_bar.update(len(machine_graph.vertices))
 
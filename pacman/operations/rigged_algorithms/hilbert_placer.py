@@ -14,17 +14,53 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import weakref
+import numpy
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.model.constraints.placer_constraints import SameChipAsConstraint
 from pacman.utilities.algorithm_utilities.placer_algorithm_utilities import (
     get_same_chip_vertex_groups, sort_vertices_by_known_constraints)
 from pacman.model.placements import Placement, Placements
+from pacman.utilities.algorithm_utilities import MachineTopology
 from pacman.utilities.utility_objs import ResourceTracker
 from pacman.operations.rigged_algorithms.hilbert_state import HilbertState
 
 logger = logging.getLogger(__name__)
 
 
+def hilbert_indices(x, y, level):
+    """ Get the positions of points along the 2D Hilbert curve of\
+        :py:meth:`HilbertPlacer._hilbert_curve`, worked out for all the\
+        points at once.
+
+    :param ~numpy.ndarray x: The x coordinates of the points
+    :param ~numpy.ndarray y: The y coordinates of the points
+    :param int level: The number of levels of the curve; the points must\
+        be within the `2**level` square it fills
+    :return: The index of each point along the curve
+    :rtype: ~numpy.ndarray
+    """
+    size = 1 << level
+    x = numpy.asarray(x, dtype=numpy.int64)
+    y = numpy.asarray(y, dtype=numpy.int64)
+    indices = numpy.zeros(x.shape, dtype=numpy.int64)
+    half = size >> 1
+    while half:
+        # Which quadrant of the current square the point is in, in the
+        # order the curve visits them
+        x_high = (x & half) > 0
+        y_high = (y & half) > 0
+        indices += half * half * ((3 * x_high) ^ y_high)
+
+        # Turn the quadrant round to match the curve of the square above
+        flip = x_high & ~y_high
+        x = numpy.where(flip, size - 1 - x, x)
+        y = numpy.where(flip, size - 1 - y, y)
+        x, y = numpy.where(y_high, x, y), numpy.where(y_high, y, x)
+        half >>= 1
+    return indices
+
+
 class HilbertPlacer(object):
     """ A simple placing algorithm using the Hilbert space-filling curve,\
         translated from RIG.
@@ -36,6 +72,9 @@ class HilbertPlacer(object):
     :rtype: Placements
     """
 
+    #: The chips of each machine seen in Hilbert order, indexed by machine
+    _chip_orders = weakref.WeakKeyDictionary()
+
     def __call__(self, machine_graph, machine, plan_n_timesteps):
         # check that the algorithm can handle the constraints
         self._check_constraints(
@@ -83,23 +122,29 @@ class HilbertPlacer(object):
             vertices, additional_placement_constraints=placement_constraints)
 
     def _generate_hilbert_chips(self, machine):
-        """ A generator which iterates over a set of chips in a machine in\
-            a Hilbert path.
+        """ Get the chips in a machine in the order of a Hilbert path.
 
-        For use as a chip ordering for the sequential placer.
+        For use as a chip ordering for the sequential placer.  The order is\
+        only worked out again if chips are added to the machine.
 
         :param ~spinn_machine.Machine machine: A SpiNNaker machine object.
         :return x, y coordinates of chips to place
-        :rtype tuple(int, int)
+        :rtype list(tuple(int, int))
         """
+        chips = self._chip_orders.get(machine)
+        if chips is not None and len(chips) == machine.n_chips:
+            return chips
 
         # set size of curve based on number of chips on machine
         max_dimen = max(machine.max_chip_x, machine.max_chip_y)
         hilbert_levels = (max_dimen.bit_length() if max_dimen >= 1 else 0)
 
-        for x, y in self._hilbert_curve(hilbert_levels):
-            if machine.is_chip_at(x, y):
-                yield x, y
+        coordinates = MachineTopology.of(machine).coordinates
+        order = numpy.argsort(hilbert_indices(
+            coordinates[:, 0], coordinates[:, 1], hilbert_levels))
+        chips = [(x, y) for x, y in coordinates[order].tolist()]
+        self._chip_orders[machine] = chips
+        return chips
 
     def _place_vertex(self, vertex, resource_tracker, machine, placements,
                       vertices_on_same_chip):
@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .basic_dijkstra_routing import BasicDijkstraRouting
+from .heap_dijkstra_routing import HeapDijkstraRouting
 from .ner_route import NerRoute
 
-__all__ = ['BasicDijkstraRouting', 'NerRoute']
+__all__ = ['BasicDijkstraRouting', 'HeapDijkstraRouting', 'NerRoute']
@@ -15,6 +15,7 @@
 
 import logging
 import sys
+from collections import OrderedDict
 from six.moves import zip
 from spinn_utilities.progress_bar import ProgressBar, DummyProgressBar
 from pacman.exceptions import PacmanRoutingException
@@ -52,6 +53,23 @@ class _DijkstraInfo(object):
         self.cost = None
 
 
+class _ShortestPathTree(object):
+    """ The state of a search from a source chip, which can be resumed to\
+        reach more destinations.
+
+    :ivar dict(tuple(int,int),_DijkstraInfo) tables:
+        The Dijkstra tables of the search
+    :ivar tuple(int,int) current:
+        The chip activated most recently, whose neighbours have not yet had
+        their costs updated
+    """
+    __slots__ = ["tables", "current"]
+
+    def __init__(self, tables, source):
+        self.tables = tables
+        self.current = source
+
+
 class BasicDijkstraRouting(object):
     """ An routing algorithm that can find routes for edges between vertices\
         in a machine graph that have been placed on a machine by the use of a\
@@ -79,12 +97,19 @@ class BasicDijkstraRouting(object):
         "_max_bw",
 
         # the SpiNNMachine object used within the system.
-        "_machine"
+        "_machine",
+
+        # The searches from each source chip, as _ShortestPathTree indexed by
+        # (x, y), with the most recently used last
+        "_trees"
     ]
 
     BW_PER_ROUTE_ENTRY = 0.01
     MAX_BW = 250
 
+    #: The number of source chips whose searches are kept for reuse
+    MAX_CACHED_TREES = 32
+
     def __call__(self, placements, machine, machine_graph,
                  bw_per_route_entry=BW_PER_ROUTE_ENTRY, max_bw=MAX_BW,
                  use_progress_bar=True):
@@ -107,9 +132,9 @@ class BasicDijkstraRouting(object):
         self._bw_per_route_entry = bw_per_route_entry
         self._max_bw = max_bw
         self._machine = machine
+        self._trees = OrderedDict()
 
         nodes_info = self._initiate_node_info(machine)
-        tables = self._initiate_dijkstra_tables(machine)
         self._update_all_weights(nodes_info)
 
         # each vertex represents a core in the board
@@ -119,17 +144,16 @@ class BasicDijkstraRouting(object):
 
         for placement in progress.over(placements.placements):
             self._route(placement, placements, machine, machine_graph,
-                        nodes_info, tables)
+                        nodes_info)
         return self._routing_paths
 
-    def _route(self, placement, placements, machine, graph, node_info, tables):
+    def _route(self, placement, placements, machine, graph, node_info):
         """
         :param Placement placement:
         :param Placements placements:
         :param ~spinn_machine.Machine machine:
         :param MachineGraph graph:
         :param dict(tuple(int,int),_NodeInfo) node_info:
-        :param dict(tuple(int,int),_DijkstraInfo) tables:
         """
         # pylint: disable=too-many-arguments
         out_going_edges = (
@@ -147,19 +171,41 @@ class BasicDijkstraRouting(object):
             dest_chips.add((chip.x, chip.y))
             edges_to_route.append(edge)
 
-        if dest_chips:
-            self._update_all_weights(node_info)
-            self._reset_tables(tables)
-            tables[placement.x, placement.y].activated = True
-            tables[placement.x, placement.y].cost = 0
-            self._propagate_costs_until_reached_destinations(
-                tables, node_info, dest_chips, placement.x, placement.y)
+        if not dest_chips:
+            return
+        if self._update_all_weights(node_info):
+            self._trees.clear()
+        tree = self._get_tree(placement.x, placement.y)
+        self._propagate_costs_until_reached_destinations(
+            tree, node_info, dest_chips, placement.x, placement.y)
 
         for edge in edges_to_route:
             dest = edge.post_vertex
             dest_placement = placements.get_placement_of_vertex(dest)
             self._retrace_back_to_source(
-                dest_placement, tables, edge, node_info, placement.p, graph)
+                dest_placement, tree.tables, edge, node_info, placement.p,
+                graph)
+
+    def _get_tree(self, x, y):
+        """ Get the search from a source chip, starting a new one if it is\
+            not in the cache.  Placements on the same chip share a search,\
+            so they only have to search further if their destinations have\
+            not already been reached.
+
+        :param int x: The x-coordinate of the source chip
+        :param int y: The y-coordinate of the source chip
+        :rtype: _ShortestPathTree
+        """
+        tree = self._trees.pop((x, y), None)
+        if tree is None:
+            tables = self._initiate_dijkstra_tables(self._machine)
+            tables[x, y].activated = True
+            tables[x, y].cost = 0
+            tree = _ShortestPathTree(tables, (x, y))
+            if len(self._trees) >= self.MAX_CACHED_TREES:
+                self._trees.popitem(last=False)
+        self._trees[x, y] = tree
+        return tree
 
     def _initiate_node_info(self, machine):
         """ Set up a dictionary which contains data for each chip in the\
@@ -203,10 +249,16 @@ class BasicDijkstraRouting(object):
 
         :param dict(tuple(int,int),_NodeInfo) nodes_info:
             the node info dictionary
+        :return: Whether any weight changed, in which case searches made\
+            with the old weights are no longer valid
+        :rtype: bool
         """
+        changed = False
         for key in nodes_info:
             if nodes_info[key] is not None:
-                self._update_neighbour_weights(nodes_info, key)
+                if self._update_neighbour_weights(nodes_info, key):
+                    changed = True
+        return changed
 
     def _update_neighbour_weights(self, nodes_info, key):
         """ Change the weights of the neighbouring nodes
@@ -215,28 +267,25 @@ class BasicDijkstraRouting(object):
             the node info dictionary
         :param tuple(int,int) key:
             the identifier to the object in `nodes_info`
+        :return: Whether any weight changed
+        :rtype: bool
         """
+        changed = False
+        weights = nodes_info[key].weights
         for n, neighbour in enumerate(nodes_info[key].neighbours):
-            if neighbour is not None:
-                nodes_info[key].weights[n] = 1
-
-    @staticmethod
-    def _reset_tables(tables):
-        """ Reset the Dijkstra tables for a new path search
-
-        :param dict(tuple(int,int),_DijkstraInfo) tables:
-            the dictionary object for the Dijkstra-tables
-        """
-        for key in tables:
-            tables[key] = _DijkstraInfo()
+            if neighbour is not None and weights[n] != 1:
+                weights[n] = 1
+                changed = True
+        return changed
 
     def _propagate_costs_until_reached_destinations(
-            self, tables, nodes_info, dest_chips, x_source, y_source):
+            self, tree, nodes_info, dest_chips, x_source, y_source):
         """ Propagate the weights till the destination nodes of the source\
-            nodes are retraced
+            nodes are retraced, carrying on from where any earlier search\
+            from the same source stopped
 
-        :param dict(tuple(int,int),_DijkstraInfo) tables:
-            the dictionary object for the Dijkstra-tables
+        :param _ShortestPathTree tree:
+            the search from the source so far
         :param dict(tuple(int,int),_NodeInfo) nodes_info:
             the dictionary object for the nodes inside a route scope
         :param set(tuple(int,int)) dest_chips:
@@ -247,11 +296,12 @@ class BasicDijkstraRouting(object):
             node
         """
 
-        dest_chips_to_find = set(dest_chips)
+        tables = tree.tables
+        dest_chips_to_find = set(
+            key for key in dest_chips if not tables[key].activated)
         source = (x_source, y_source)
-        dest_chips_to_find.discard(source)
 
-        current = source
+        current = tree.current
 
         # Iterate only if the destination node hasn't been activated
         while dest_chips_to_find:
@@ -272,6 +322,7 @@ class BasicDijkstraRouting(object):
             # lowest current cost
             current = self._minimum(tables)
             tables[current].activated = True
+            tree.current = current
             dest_chips_to_find.discard(current)
 
     @staticmethod
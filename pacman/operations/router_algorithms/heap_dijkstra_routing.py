@@ -0,0 +1,315 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import heapq
+import numpy
+from spinn_utilities.progress_bar import ProgressBar, DummyProgressBar
+from pacman.exceptions import PacmanRoutingException
+from pacman.model.graphs.common import EdgeTrafficType
+from pacman.model.routing_table_by_partition import (
+    MulticastRoutingTableByPartition, MulticastRoutingTableByPartitionEntry)
+from .basic_dijkstra_routing import BasicDijkstraRouting
+
+#: Neighbour ID used where a chip has no link in a direction
+_NO_LINK = -1
+#: Neighbour ID used where a link goes to a chip that is not in the machine
+_NO_CHIP = -2
+
+
+class _ChipTopology(object):
+    """ The chips of a machine given dense IDs, with the neighbours and link\
+        weights of each chip held in arrays indexed by ID and link.
+    """
+
+    __slots__ = [
+        # The (x, y) coordinates of each chip, indexed by ID
+        "keys",
+
+        # The ID of each chip, indexed by (x, y) coordinates
+        "ids",
+
+        # Array of (chip ID, link ID) giving the ID of the chip at the other
+        # end of the link, or _NO_LINK or _NO_CHIP
+        "neighbours",
+
+        # Array of (chip ID, link ID) giving the weight of each link, which
+        # is infinite where there is no link
+        "weights",
+
+        # The neighbours and weights as lists of lists, which are faster to
+        # read one item at a time than the arrays are
+        "neighbour_lists",
+        "weight_lists"
+    ]
+
+    def __init__(self, machine):
+        """
+        :param ~spinn_machine.Machine machine: The machine to index
+        """
+        self.keys = [(chip.x, chip.y) for chip in machine.chips]
+        self.ids = {key: chip_id for chip_id, key in enumerate(self.keys)}
+        self.neighbours = numpy.full((len(self.keys), 6), _NO_LINK, numpy.intp)
+        self.weights = numpy.full((len(self.keys), 6), numpy.inf)
+        for chip_id, chip in enumerate(machine.chips):
+            for link_id in range(6):
+                link = chip.router.get_link(link_id)
+                if link is not None:
+                    self.neighbours[chip_id, link_id] = self.ids.get(
+                        (link.destination_x, link.destination_y), _NO_CHIP)
+                    self.weights[chip_id, link_id] = 1
+        self.neighbour_lists = self.neighbours.tolist()
+        self.weight_lists = self.weights.tolist()
+
+
+class HeapDijkstraRouting(object):
+    """ A routing algorithm which finds the same routes as\
+        :py:class:`BasicDijkstraRouting`, but faster.
+
+    The chips are given dense IDs and their neighbours are found once per\
+    machine.  The costs of each search are kept in arrays which are not\
+    cleared between searches; instead each search has a generation number,\
+    and a cost only counts if it was set in the current generation.  The\
+    next chip to visit comes from a binary heap rather than a scan of all\
+    the chips.  A placement on the same chip as the one before carries on\
+    the search of that placement, and only searches further if its\
+    destinations have not been reached already.
+
+    :param Placements placements: The placements of the edges
+    :param ~spinn_machine.Machine machine:
+        The machine through which the routes are to be found
+    :param MachineGraph machine_graph: the machine_graph object
+    :param bool use_progress_bar: whether to show a progress bar
+    :return: The discovered routes
+    :rtype: MulticastRoutingTableByPartition
+    :raise PacmanRoutingException:
+        If something goes wrong with the routing
+    """
+
+    __slots__ = [
+        # the routing path objects used to be returned to the work flow
+        "_routing_paths",
+
+        # The chips and links of the machine
+        "_topology",
+
+        # The cost of reaching each chip, by ID, in the current search
+        "_cost",
+
+        # The generation in which the cost of each chip was last set
+        "_cost_generation",
+
+        # The generation in which each chip was last visited
+        "_visited_generation",
+
+        # The generation of the current search
+        "_generation",
+
+        # The ID of the source chip of the current search, or None
+        "_source",
+
+        # The chip visited most recently in the current search, whose
+        # neighbours have not yet had their costs updated
+        "_current",
+
+        # The heap of (cost, chip ID) still to visit in the current search
+        "_heap"
+    ]
+
+    def __call__(self, placements, machine, machine_graph,
+                 bw_per_route_entry=BasicDijkstraRouting.BW_PER_ROUTE_ENTRY,
+                 max_bw=BasicDijkstraRouting.MAX_BW, use_progress_bar=True):
+        """ Find routes between the edges with the allocated information,
+            placed in the given places
+
+        :param Placements placements: The placements of the edges
+        :param ~spinn_machine.Machine machine:
+            The machine through which the routes are to be found
+        :param MachineGraph machine_graph: the machine_graph object
+        :param float bw_per_route_entry: Not used; as for\
+            :py:class:`BasicDijkstraRouting`
+        :param float max_bw: Not used; as for\
+            :py:class:`BasicDijkstraRouting`
+        :param bool use_progress_bar: whether to show a progress bar
+        :return: The discovered routes
+        :rtype: MulticastRoutingTableByPartition
+        :raise PacmanRoutingException:
+            If something goes wrong with the routing
+        """
+        # pylint: disable=too-many-arguments, unused-argument
+        self._routing_paths = MulticastRoutingTableByPartition()
+        self._topology = _ChipTopology(machine)
+        n_chips = len(self._topology.keys)
+        self._cost = numpy.zeros(n_chips)
+        self._cost_generation = numpy.zeros(n_chips, numpy.int64)
+        self._visited_generation = numpy.zeros(n_chips, numpy.int64)
+        self._generation = 0
+        self._source = None
+
+        pb_factory = ProgressBar if use_progress_bar else DummyProgressBar
+        progress = pb_factory(placements.n_placements,
+                              "Creating routing entries")
+        for placement in progress.over(placements.placements):
+            self._route(placement, placements, machine_graph)
+        return self._routing_paths
+
+    def _route(self, placement, placements, graph):
+        """
+        :param Placement placement:
+        :param Placements placements:
+        :param MachineGraph graph:
+        """
+        edges_to_route = list()
+        dest_chips = set()
+        for edge in graph.get_edges_starting_at_vertex(placement.vertex):
+            if edge.traffic_type == EdgeTrafficType.MULTICAST:
+                dest = placements.get_placement_of_vertex(edge.post_vertex)
+                dest_chips.add(self._topology.ids[dest.x, dest.y])
+                edges_to_route.append((edge, dest))
+
+        if dest_chips:
+            self._search(
+                self._topology.ids[placement.x, placement.y], dest_chips)
+
+        for edge, dest in edges_to_route:
+            self._retrace_back_to_source(dest, edge, placement.p, graph)
+
+    def _search(self, source, dest_chips):
+        """ Find the cost of reaching chips from a source until all the\
+            destinations have been visited, carrying on from the previous\
+            search if it was from the same source
+
+        :param int source: The ID of the source chip
+        :param set(int) dest_chips: The IDs of the destination chips
+        :raise PacmanRoutingException:
+            when a destination could not be reached from the source
+        """
+        cost = self._cost
+        cost_generation = self._cost_generation
+        visited_generation = self._visited_generation
+        neighbours = self._topology.neighbour_lists
+        weights = self._topology.weight_lists
+
+        if source != self._source:
+            self._generation += 1
+            self._source = source
+            self._current = source
+            self._heap = list()
+            cost[source] = 0
+            cost_generation[source] = self._generation
+            visited_generation[source] = self._generation
+        generation = self._generation
+        heap = self._heap
+        current = self._current
+        to_find = set(
+            chip_id for chip_id in dest_chips
+            if visited_generation[chip_id] != generation)
+        while to_find:
+            current_cost = cost[current]
+            for link_id, neighbour in enumerate(neighbours[current]):
+                if neighbour == _NO_LINK or neighbour == source:
+                    continue
+                if neighbour == _NO_CHIP:
+                    x, y = self._topology.keys[current]
+                    raise PacmanRoutingException(
+                        "Tried to propagate from ({}, {}) down link {} to a"
+                        " chip which is not in the graph: remove"
+                        " non-existent neighbours".format(x, y, link_id))
+                if visited_generation[neighbour] == generation:
+                    continue
+                new_cost = current_cost + weights[current][link_id]
+                if (cost_generation[neighbour] != generation or
+                        new_cost < cost[neighbour]):
+                    cost[neighbour] = new_cost
+                    cost_generation[neighbour] = generation
+                    heapq.heappush(heap, (new_cost, neighbour))
+
+            # Visit the unvisited chip with the lowest cost
+            while True:
+                if not heap:
+                    self._source = None
+                    raise PacmanRoutingException(
+                        "Destination could not be activated, ending run")
+                _, current = heapq.heappop(heap)
+                if visited_generation[current] != generation:
+                    break
+            visited_generation[current] = generation
+            self._current = current
+            to_find.discard(current)
+
+    def _retrace_back_to_source(self, dest, edge, source_processor, graph):
+        """ Add the routing entries along the path from the source to a\
+            destination, found by walking back from the destination through\
+            chips whose costs fall by the weight of the link
+
+        :param Placement dest: Destination placement
+        :param MachineEdge edge:
+        :param int source_processor:
+        :param MachineGraph graph:
+        :raise PacmanRoutingException:
+            when no chip is found which precedes a chip on the path
+        """
+        partitions = [
+            partition for partition in
+            graph.get_outgoing_edge_partitions_starting_at_vertex(
+                edge.pre_vertex)
+            if edge in partition]
+
+        prev_entry = None
+        processors = [] if dest.p is None else [dest.p]
+        for partition in partitions:
+            prev_entry = MulticastRoutingTableByPartitionEntry(
+                out_going_links=None, outgoing_processors=processors)
+            self._routing_paths.add_path_entry(
+                prev_entry, dest.x, dest.y, partition)
+
+        generation = self._generation
+        cost = self._cost
+        cost_generation = self._cost_generation
+        neighbours = self._topology.neighbour_lists
+        weights = self._topology.weight_lists
+        current = self._topology.ids[dest.x, dest.y]
+        while cost[current] != 0:
+            for link_id, neighbour in enumerate(neighbours[current]):
+                if neighbour == _NO_LINK:
+                    continue
+                if neighbour == _NO_CHIP:
+                    raise PacmanRoutingException(
+                        "Tried to trace back to node not in "
+                        "graph: remove non-existent neighbours")
+                if cost_generation[neighbour] != generation:
+                    continue
+                direction = BasicDijkstraRouting._get_reverse_direction(
+                    link_id)
+                sought_cost = cost[current] - weights[neighbour][direction]
+                if BasicDijkstraRouting._close_enough(
+                        cost[neighbour], sought_cost):
+                    x, y = self._topology.keys[neighbour]
+                    entry = None
+                    for partition in partitions:
+                        entry = MulticastRoutingTableByPartitionEntry(
+                            direction, None)
+                        prev_entry.incoming_link = link_id
+                        self._routing_paths.add_path_entry(
+                            entry, x, y, partition)
+                    prev_entry = entry
+                    current = neighbour
+                    break
+            else:
+                raise PacmanRoutingException(
+                    "Iterated through all neighbours of tracking node but"
+                    " did not find a preceding node! Consider increasing "
+                    "acceptable discrepancy between sought traceback cost"
+                    " and actual cost at node. Terminating...")
+        prev_entry.incoming_processor = source_processor
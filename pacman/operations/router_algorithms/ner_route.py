@@ -27,9 +27,11 @@ https://github.com/project-rig/rig/blob/master/rig/place_and_route/route/utils.p
 """
 
 import heapq
+import multiprocessing
 
 from collections import deque
 
+import numpy
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.exceptions import MachineHasDisconnectedSubRegion
 from pacman.model.graphs import (
@@ -37,8 +39,20 @@ from pacman.model.graphs import (
 from pacman.model.graphs.common import EdgeTrafficType
 from pacman.model.routing_table_by_partition import (
     MulticastRoutingTableByPartition, MulticastRoutingTableByPartitionEntry)
+from pacman.utilities.algorithm_utilities import MachineTopology
 from .routing_tree import RoutingTree
 
+#: The offsets (x, y) of the chips at each distance from a chip, indexed by
+#: distance, up to the largest radius asked for so far
+_hex_rings = [[(0, 0)]]
+
+#: The number of destinations of a net from which they are sorted by distance
+#: with array operations; smaller nets are quicker to sort one at a time
+_MIN_ARRAY_SORT = 256
+
+#: The machine to route over in a worker process of a parallel NerRoute
+_worker_machine = None
+
 
 def _convert_a_route(
         routing_tables, partition, incoming_processor, incoming_link,
@@ -83,6 +97,80 @@ def _convert_a_route(
             routing_tables, partition, None, next_incoming_link, next_hop)
 
 
+def _hex_ring_offsets(radius):
+    """ Get the offsets of the chips at each distance from a chip, up to a\
+        given distance, ignoring wrap-arounds
+
+    :param int radius: The largest distance to get the offsets of
+    :return: A list of the (x, y) offsets at each distance from 0 to radius
+    :rtype: list(list(tuple(int,int)))
+    """
+    for distance in range(len(_hex_rings), radius + 1):
+        ring = list()
+        for x in range(-distance, distance + 1):
+            for y in range(-distance, distance + 1):
+                if (x >= 0) == (y >= 0):
+                    length = max(abs(x), abs(y))
+                else:
+                    length = abs(x) + abs(y)
+                if length == distance:
+                    ring.append((x, y))
+        _hex_rings.append(ring)
+    return _hex_rings[:radius + 1]
+
+
+def _nearest_route_node(route, order, destination, radius, machine):
+    """ Find the node of a route closest to a destination, if one is within\
+        a given distance.  Of nodes that are equally close, the one added to\
+        the route first is chosen.
+
+    Small routes are scanned in full.  In larger routes, the chips around\
+    the destination are looked up in the route in rings of increasing\
+    distance, so the search stops at the first ring which holds a node, and\
+    the cost does not depend on the size of the route.  The rings wrap\
+    around the edges of the machine; as that can put a chip further away\
+    than its ring suggests on a machine which does not wrap, each chip\
+    found is checked with the true distance.
+
+    :param dict(tuple(int,int),RoutingTree) route: The nodes of the route
+    :param dict(tuple(int,int),int) order:
+        The order in which the nodes were added to the route
+    :param tuple(int,int) destination: The (x, y) coordinates to look near
+    :param int radius: The furthest a node may be from the destination
+    :param ~spinn_machine.Machine machine:
+    :return: The (x, y) coordinates of the node, or None if none is close
+    :rtype: tuple(int,int) or None
+    """
+    rings = _hex_ring_offsets(radius)
+    if len(route) * len(rings) < sum(len(ring) for ring in rings):
+        neighbour = None
+        neighbour_distance = None
+        for candidate_neighbour in route:
+            distance = machine.get_vector_length(
+                candidate_neighbour, destination)
+            if distance <= radius and (
+                    neighbour is None or distance < neighbour_distance):
+                neighbour = candidate_neighbour
+                neighbour_distance = distance
+        return neighbour
+
+    x, y = destination
+    width = machine.width
+    height = machine.height
+    for distance, ring in enumerate(rings):
+        neighbour = None
+        for dx, dy in ring:
+            candidate_neighbour = ((x + dx) % width, (y + dy) % height)
+            if (candidate_neighbour in route and (
+                    neighbour is None or order[candidate_neighbour] <
+                    order[neighbour]) and machine.get_vector_length(
+                        candidate_neighbour, destination) == distance):
+                neighbour = candidate_neighbour
+        if neighbour is not None:
+            return neighbour
+    return None
+
+
 def _ner_net(source, destinations, machine):
     """ Produce a shortest path tree for a given net using NER.
 
@@ -105,32 +193,32 @@ def _ner_net(source, destinations, machine):
     radius = 20
     # Map from (x, y) to RoutingTree objects
     route = {source: RoutingTree(source)}
+    # Map from (x, y) to the order in which the node was added to the route
+    order = {source: 0}
 
     # Handle each destination, sorted by distance from the source, closest
-    # first.
-    sorted_dest = sorted(
-        destinations, key=(lambda destination: machine.get_vector_length(
+    # first.  Large nets are measured in one array operation; the sort is
+    # stable either way, so equally distant destinations stay in order.
+    destinations = list(destinations)
+    if len(destinations) < _MIN_ARRAY_SORT:
+        sorted_dest = sorted(
+            destinations, key=(lambda destination: machine.get_vector_length(
                 source, destination)))
+    else:
+        topology = MachineTopology.of(machine)
+        distances = topology.vector_lengths(
+            source, topology.coordinates_of(destinations))
+        sorted_dest = [
+            destinations[index]
+            for index in numpy.argsort(distances, kind="mergesort").tolist()]
     for destination in sorted_dest:
         # We shall attempt to find our nearest neighbouring placed node.
         neighbour = None
 
         # Try to find a nearby (within radius hops) node in the routing tree
         # that we can route to (falling back on just routing to the source).
-        #
-        # This implementation scans the list of all route nodes created so far
-        # and finds the closest node which is < radius hops
-        # (falling back on the origin if no node is closer than radius hops).
-
-        neighbour = None
-        neighbour_distance = None
-        for candidate_neighbour in route:
-            distance = machine.get_vector_length(
-                candidate_neighbour, destination)
-            if distance <= radius and (
-                    neighbour is None or distance < neighbour_distance):
-                neighbour = candidate_neighbour
-                neighbour_distance = distance
+        neighbour = _nearest_route_node(
+            route, order, destination, radius, machine)
 
         # Fall back on routing directly to the source if no nodes within radius
         # hops of the destination was found.
@@ -163,6 +251,7 @@ def _ner_net(source, destinations, machine):
         for direction, (x, y) in ldf:
             this_node = RoutingTree((x, y))
             route[(x, y)] = this_node
+            order.setdefault((x, y), len(order))
 
             last_node.append_child((direction, this_node))
             last_node = this_node
@@ -461,37 +550,138 @@ def _do_route(source_vertex, post_vertexes, machine, placements):
     :return:
     :rtype: RoutingTree
     """
-    source_xy = _vertex_xy(source_vertex, placements, machine)
-    destinations = set(_vertex_xy(post_vertex, placements, machine)
-                       for post_vertex in post_vertexes)
-    # Generate routing tree (assuming a perfect machine)
-    root, lookup = _ner_net(source_xy, destinations, machine)
+    source_xy, sinks = _net_of(
+        source_vertex, post_vertexes, machine, placements)
+    return _route_net(
+        source_xy, [(xy, route, post_vertex)
+                    for (xy, route), post_vertex in zip(sinks, post_vertexes)],
+        machine)
 
-    # Fix routes to avoid dead chips/links
-    if _route_has_dead_links(root, machine):
-        root, lookup = _avoid_dead_links(root, machine)
 
-    # Add the sinks in the net to the RoutingTree
+def _net_of(source_vertex, post_vertexes, machine, placements):
+    """ Find where a net starts, and where and how it ends
+
+    :param MachineVertex source_vertex:
+    :param iterable(MachineVertex) post_vertexes:
+    :param ~spinn_machine.Machine machine:
+    :param Placements placements:
+    :return: The (x, y) coordinates of the source, and the (x, y)\
+        coordinates of each sink with the route from that chip to the sink
+    :rtype: tuple(tuple(int,int), list(tuple(tuple(int,int),int)))
+    """
+    source_xy = _vertex_xy(source_vertex, placements, machine)
+    sinks = list()
     for post_vertex in post_vertexes:
-        tree_node = lookup[_vertex_xy(post_vertex, placements, machine)]
+        xy = _vertex_xy(post_vertex, placements, machine)
         if isinstance(post_vertex, AbstractVirtual):
             # Sinks with route-to-endpoint constraints must be routed
             # in the according directions.
-            route = _route_to_endpoint(post_vertex, machine)
-            tree_node.append_child((route, post_vertex))
+            sinks.append((xy, _route_to_endpoint(post_vertex, machine)))
         else:
             core = placements.get_placement_of_vertex(post_vertex).p
             if core is not None:
                 #  Offset the core by 6 as first 6 are the links
-                tree_node.append_child((core + 6, post_vertex))
+                sinks.append((xy, core + 6))
             else:
                 # Sinks without that resource are simply included without
                 # an associated route
-                tree_node.append_child((None, post_vertex))
+                sinks.append((xy, None))
+    return source_xy, sinks
+
+
+def _route_net(source_xy, sinks, machine):
+    """ Route a net from a chip to some sinks
+
+    :param tuple(int,int) source_xy: The coordinates of the source chip
+    :param list(tuple(tuple(int,int),int,object)) sinks:
+        The coordinates of the chip of each sink, the route from that chip to
+        the sink, and the object to put in the tree for the sink
+    :param ~spinn_machine.Machine machine:
+    :rtype: RoutingTree
+    """
+    destinations = set(xy for xy, _, _ in sinks)
+    # Generate routing tree (assuming a perfect machine)
+    root, lookup = _ner_net(source_xy, destinations, machine)
+
+    # Fix routes to avoid dead chips/links
+    if _route_has_dead_links(root, machine):
+        root, lookup = _avoid_dead_links(root, machine)
+
+    # Add the sinks in the net to the RoutingTree
+    for xy, route, sink in sinks:
+        lookup[xy].append_child((route, sink))
 
     return root
 
 
+def _init_worker(machine):
+    """ Set up a worker process of a parallel NerRoute
+
+    :param ~spinn_machine.Machine machine: The machine to route over
+    """
+    global _worker_machine  # pylint: disable=global-statement
+    _worker_machine = machine
+
+
+def _route_net_in_worker(net):
+    """ Route a net in a worker process of a parallel NerRoute
+
+    :param tuple(tuple(int,int),list(tuple(tuple(int,int),int))) net:
+        The coordinates of the source, and the coordinates and route of each
+        sink, as given by :py:func:`_net_of`
+    :return: The routing tree, flattened by :py:func:`_flatten_tree`, with
+        each sink given by its index in the net
+    :rtype: list(tuple(tuple(int,int),list(tuple(int,int))))
+    """
+    source_xy, sinks = net
+    return _flatten_tree(_route_net(
+        source_xy, [(xy, route, index)
+                    for index, (xy, route) in enumerate(sinks)],
+        _worker_machine))
+
+
+def _flatten_tree(root):
+    """ Flatten a routing tree whose sinks are integers into a list which can\
+        be passed between processes without deep recursion
+
+    :param RoutingTree root: The tree, with integer sinks
+    :return: The (x, y) coordinates and children of each node of the tree,\
+        root first, where each child is a (route, reference) pair, and the\
+        reference is the index of a node, or -1 - the sink if it is a sink
+    :rtype: list(tuple(tuple(int,int),list(tuple(int,int))))
+    """
+    nodes = [root]
+    flat = list()
+    for node in nodes:
+        children = list()
+        for route, child in node.children:
+            if isinstance(child, RoutingTree):
+                children.append((route, len(nodes)))
+                nodes.append(child)
+            else:
+                children.append((route, -1 - child))
+        flat.append((node.chip, children))
+    return flat
+
+
+def _unflatten_tree(flat, sinks):
+    """ Rebuild a routing tree flattened by :py:func:`_flatten_tree`
+
+    :param list(tuple(tuple(int,int),list(tuple(int,int)))) flat:
+        The flattened tree
+    :param list sinks: The object to put in the tree for each sink
+    :rtype: RoutingTree
+    """
+    nodes = [RoutingTree(chip) for chip, _ in flat]
+    for node, (_, children) in zip(nodes, flat):
+        for route, reference in children:
+            if reference >= 0:
+                node.append_child((route, nodes[reference]))
+            else:
+                node.append_child((route, sinks[-1 - reference]))
+    return nodes[0]
+
+
 def _vertex_xy(vertex, placements, machine):
     """
     :param MachineVertex vertex:
@@ -591,14 +781,23 @@ class NerRoute(object):
 
     __slots__ = []
 
-    def __call__(self, machine_graph, machine, placements):
+    def __call__(self, machine_graph, machine, placements, n_processes=1):
         """
         :param MachineGraph machine_graph:
         :param ~spinn_machine.Machine machine:
         :param Placements placements:
+        :param int n_processes:
+            The number of processes to route in.  If more than one, the\
+            partitions are routed in a pool of worker processes, each with\
+            its own copy of the machine; the result is the same as routing\
+            in one process.
         :return:
         :rtype: MulticastRoutingTableByPartition
         """
+        if n_processes is not None and n_processes > 1:
+            return self._route_in_parallel(
+                machine_graph, machine, placements, n_processes)
+
         routing_tables = MulticastRoutingTableByPartition()
 
         progress_bar = ProgressBar(len(machine_graph.vertices), "Routing")
@@ -619,3 +818,45 @@ class NerRoute(object):
         progress_bar.end()
 
         return routing_tables
+
+    @staticmethod
+    def _route_in_parallel(machine_graph, machine, placements, n_processes):
+        """
+        :param MachineGraph machine_graph:
+        :param ~spinn_machine.Machine machine:
+        :param Placements placements:
+        :param int n_processes: The number of worker processes
+        :rtype: MulticastRoutingTableByPartition
+        """
+        # Only the coordinates and routes of each net go to the workers
+        partitions = list()
+        nets = list()
+        for source_vertex in machine_graph.vertices:
+            for partition in machine_graph.\
+                    get_outgoing_edge_partitions_starting_at_vertex(
+                        source_vertex):
+                if partition.traffic_type == EdgeTrafficType.MULTICAST:
+                    post_vertexes = list(
+                        e.post_vertex for e in partition.edges)
+                    partitions.append((partition, post_vertexes))
+                    nets.append(_net_of(
+                        source_vertex, post_vertexes, machine, placements))
+
+        # The pool returns the trees in the order of the nets, so the tables
+        # are built in the same order as when routing in one process
+        routing_tables = MulticastRoutingTableByPartition()
+        progress_bar = ProgressBar(len(nets), "Routing")
+        pool = multiprocessing.Pool(
+            n_processes, initializer=_init_worker, initargs=(machine,))
+        try:
+            chunk_size = max(1, len(nets) // (n_processes * 4))
+            for (partition, post_vertexes), flat in progress_bar.over(zip(
+                    partitions, pool.imap(
+                        _route_net_in_worker, nets, chunk_size))):
+                _convert_a_route(
+                    routing_tables, partition, 0, None,
+                    _unflatten_tree(flat, post_vertexes))
+        finally:
+            pool.terminate()
+            pool.join()
+        return routing_tables
@@ -15,9 +15,13 @@
 
 from .abstract_compressor import AbstractCompressor
 from .checked_unordered_compressor import CheckedUnorderedCompressor
+from .compression_cache import CompressionCache
 from .entry import Entry
 from .pair_compressor import PairCompressor
+from .portfolio_compressor import PortfolioCompressor, portfolio_compress
 from .unordered_compressor import UnorderedCompressor
 
 __all__ = ['AbstractCompressor', 'CheckedUnorderedCompressor',
-           'Entry', 'PairCompressor', 'UnorderedCompressor']
+           'CompressionCache', 'Entry', 'PairCompressor',
+           'PortfolioCompressor', 'UnorderedCompressor',
+           'portfolio_compress']
@@ -19,13 +19,63 @@ based on https://github.com/project-rig/
 
 from abc import abstractmethod
 import logging
+import multiprocessing
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.model.routing_tables import (
-    CompressedMulticastRoutingTable, MulticastRoutingTables)
+    ArrayMulticastRoutingTable, CompressedMulticastRoutingTable,
+    MulticastRoutingTables)
 from pacman.exceptions import MinimisationFailedError
+from .compression_cache import CompressionCache
+from .entry import Entry
 
 logger = logging.getLogger(__name__)
 
+#: The compressor in a worker process of a parallel compression
+_worker_compressor = None
+
+
+def _init_worker(compressor, max_supported_length):
+    """ Set up a worker process of a parallel compression
+
+    :param AbstractCompressor compressor: The compressor to compress with
+    :param int max_supported_length:
+        The MAX_SUPPORTED_LENGTH of the compressor in the main process
+    """
+    global _worker_compressor  # pylint: disable=global-statement
+    _worker_compressor = compressor
+    type(compressor).MAX_SUPPORTED_LENGTH = max_supported_length
+
+
+def _table_to_arrays(table):
+    """ Reduce a routing table to what a worker process needs to compress it
+
+    :param AbsractMulticastRoutingTable table:
+    :return: The table with its entries held in arrays, which are compact\
+        to send to a worker
+    :rtype: ArrayMulticastRoutingTable
+    """
+    if isinstance(table, ArrayMulticastRoutingTable):
+        return table
+    return ArrayMulticastRoutingTable.from_routing_table(table)
+
+
+def _compress_in_worker(table):
+    """ Compress a routing table in a worker process
+
+    :param ArrayMulticastRoutingTable table:
+        The table, as made by :py:func:`_table_to_arrays`
+    :return: The key, mask, route and defaultable flag of each entry of the\
+        compressed table, any problems found while compressing it, and\
+        anything else the compressor noted while compressing it
+    :rtype: tuple(list(tuple(int, int, int, bool)), str, object)
+    """
+    _worker_compressor._problems = ""
+    compressed = _worker_compressor.compress_table(table)
+    return [
+        (entry.key, entry.mask, entry.spinnaker_route, entry.defaultable)
+        for entry in compressed], _worker_compressor._problems, \
+        _worker_compressor._take_notes()
+
 
 class AbstractCompressor(object):
 
@@ -43,10 +93,20 @@ class AbstractCompressor(object):
     def __init__(self, ordered=True):
         self._ordered = ordered
 
-    def __call__(self, router_tables, target_length=None):
+    def __call__(self, router_tables, target_length=None, n_processes=1,
+                 cache_directory=None,
+                 cache_size=CompressionCache.DEFAULT_MAX_BYTES):
         """
         :param MulticastRoutingTables router_tables:
         :param int target_length:
+        :param int n_processes:
+            The number of processes to compress in; see\
+            :py:meth:`compress_tables`
+        :param cache_directory:
+            The directory of a :py:class:`CompressionCache` to reuse the\
+            compressed tables of, or None to compress every table
+        :type cache_directory: str or None
+        :param int cache_size: The number of bytes the cache may take
         :rtype: MulticastRoutingTables
         """
         if target_length is None:
@@ -58,7 +118,21 @@ class AbstractCompressor(object):
             router_tables.routing_tables,
             "Compressing routing Tables using {}".format(
                 self.__class__.__name__))
-        return self.compress_tables(router_tables, progress)
+        return self.compress_tables(
+            router_tables, progress, n_processes,
+            self._cache(cache_directory, cache_size))
+
+    @staticmethod
+    def _cache(cache_directory, cache_size):
+        """
+        :param cache_directory:
+        :type cache_directory: str or None
+        :param int cache_size:
+        :rtype: CompressionCache or None
+        """
+        if cache_directory is None:
+            return None
+        return CompressionCache(cache_directory, cache_size)
 
     @staticmethod
     def intersect(key_a, mask_a, key_b, mask_b):
@@ -117,7 +191,8 @@ class AbstractCompressor(object):
         :rtype: MulticastRoutingTable
         """
 
-    def compress_tables(self, router_tables, progress):
+    def compress_tables(self, router_tables, progress, n_processes=1,
+                        cache=None):
         """ Compress all the unordered routing tables
 
         Tables who start of smaller than target_length are not compressed
@@ -125,28 +200,88 @@ class AbstractCompressor(object):
         :param MulticastRoutingTables router_tables: Routing tables
         :param ~spinn_utilities.progress_bar.ProgressBar progress:
             Progress bar to show while working
+        :param int n_processes:
+            The number of processes to compress in.  If more than one, the\
+            tables are compressed in a pool of worker processes, each with\
+            its own copy of this compressor, and are sent to the workers\
+            as arrays and back as tuples of integers; the result is the same\
+            as compressing in one process.
+        :param cache:
+            Where to look for tables compressed before, and to put the\
+            tables compressed now; tables found are not compressed again
+        :type cache: CompressionCache or None
         :return: The compressed but still unordered routing tables
         :rtype: MulticastRoutingTables
         :raises MinimisationFailedError: on failure
         """
         compressed_tables = MulticastRoutingTables()
         self._problems = ""
-        for table in progress.over(router_tables.routing_tables):
-            if table.number_of_entries < self._target_length:
-                new_table = table
+        to_compress = [
+            _table_to_arrays(table) for table in router_tables.routing_tables
+            if table.number_of_entries >= self._target_length]
+        cached = dict()
+        cache_keys = dict()
+        if cache is not None:
+            for table in to_compress:
+                cache_key = cache.key(table, self, self._target_length)
+                cache_keys[table.x, table.y] = cache_key
+                entries = cache.get(cache_key)
+                if entries is not None:
+                    cached[table.x, table.y] = entries
+                    self._note_cached(table)
+            to_compress = [
+                table for table in to_compress
+                if (table.x, table.y) not in cached]
+        pool = None
+        if n_processes is not None and n_processes > 1 and to_compress:
+            pool = multiprocessing.Pool(
+                n_processes, initializer=_init_worker,
+                initargs=(self, self.MAX_SUPPORTED_LENGTH))
+        try:
+            if pool is None:
+                compressed = (
+                    self._compress_checking_problems(table)
+                    for table in to_compress)
             else:
-                compressed_table = self.compress_table(table)
+                # The pool returns the tables in the order they were sent
+                chunk_size = max(1, len(to_compress) // (n_processes * 4))
+                compressed = (
+                    self._from_worker(result) for result in pool.imap(
+                        _compress_in_worker, to_compress, chunk_size))
+
+            for table in progress.over(router_tables.routing_tables):
+                if table.number_of_entries < self._target_length:
+                    new_table = table
+                else:
+                    compressed_table = cached.get((table.x, table.y))
+                    if compressed_table is None:
+                        compressed_table, problems = next(compressed)
+                        # Tables with problems are compressed again, so
+                        # that the problems are found again
+                        if cache is not None and not problems:
+                            cache.put(
+                                cache_keys[table.x, table.y],
+                                compressed_table)
 
-                new_table = CompressedMulticastRoutingTable(table.x, table.y)
+                    new_table = CompressedMulticastRoutingTable(
+                        table.x, table.y)
 
-                for entry in compressed_table:
-                    new_table.add_multicast_routing_entry(
-                        entry.to_MulticastRoutingEntry())
-                if new_table.number_of_entries > self.MAX_SUPPORTED_LENGTH:
-                    self._problems += "(x:{},y:{})={} ".format(
-                        new_table.x, new_table.y, new_table.number_of_entries)
+                    for entry in compressed_table:
+                        new_table.add_multicast_routing_entry(
+                            entry.to_MulticastRoutingEntry())
+                    if (new_table.number_of_entries >
+                            self.MAX_SUPPORTED_LENGTH):
+                        self._problems += "(x:{},y:{})={} ".format(
+                            new_table.x, new_table.y,
+                            new_table.number_of_entries)
 
-            compressed_tables.add_routing_table(new_table)
+                compressed_tables.add_routing_table(new_table)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            if cache is not None:
+                cache.trim()
 
         if len(self._problems) > 0:
             if self._ordered:
@@ -157,6 +292,64 @@ class AbstractCompressor(object):
                 logger.warning(self._problems)
         return compressed_tables
 
+    def _compress_checking_problems(self, router_table):
+        """ Compress a table, noting whether any problems were found
+
+        :param MulticastRoutingTable router_table:
+        :return: The entries of the compressed table, and whether any\
+            problems were found while compressing it
+        :rtype: tuple(list(~pacman.operations.router_compressors.Entry), bool)
+        """
+        n_problems = len(self._problems)
+        compressed = self.compress_table(router_table)
+        return compressed, len(self._problems) > n_problems
+
+    def _from_worker(self, result):
+        """ Get the entries of a table compressed in a worker process
+
+        :param tuple(list(tuple(int, int, int, bool)), str, object) result:
+            The result of :py:func:`_compress_in_worker`
+        :return: The entries of the compressed table, and whether any\
+            problems were found while compressing it
+        :rtype: tuple(list(~pacman.operations.router_compressors.Entry), bool)
+        """
+        entries, problems, notes = result
+        self._problems += problems
+        self._add_notes(notes)
+        return [Entry(key, mask, defaultable, route)
+                for key, mask, route, defaultable in entries], bool(problems)
+
+    def _cache_salt(self):
+        """ Get how this compressor is set up, where that changes the tables\
+            it makes, so that a :py:class:`CompressionCache` keeps the tables\
+            of differently set up compressors of the same class apart
+
+        :rtype: str
+        """
+        return ""
+
+    def _note_cached(self, router_table):
+        """ Note that a table was found in the cache, and so is not compressed
+
+        :param MulticastRoutingTable router_table: The table found
+        """
+
+    def _take_notes(self):
+        """ Get, and forget, anything other than the compressed table that\
+            this compressor noted while compressing tables in a worker\
+            process
+
+        :return: Whatever :py:meth:`_add_notes` accepts
+        """
+        return None
+
+    def _add_notes(self, notes):
+        """ Add what a copy of this compressor noted in a worker process to\
+            what this compressor has noted
+
+        :param notes: The result of :py:meth:`_take_notes` in the worker
+        """
+
     @property
     def ordered(self):
         return self._ordered
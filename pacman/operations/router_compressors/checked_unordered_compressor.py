@@ -15,16 +15,27 @@
 
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.exceptions import PacmanElementAllocationException
+from .compression_cache import CompressionCache
 from .unordered_compressor import UnorderedCompressor
 
 
 class CheckedUnorderedCompressor(UnorderedCompressor):
     __slots__ = []
 
-    def __call__(self, router_tables, target_length=None):
+    def __call__(self, router_tables, target_length=None, n_processes=1,
+                 cache_directory=None,
+                 cache_size=CompressionCache.DEFAULT_MAX_BYTES):
         """
         :param MulticastRoutingTables router_tables:
         :param int target_length:
+        :param int n_processes:
+            The number of processes to compress in; see\
+            :py:meth:`compress_tables`
+        :param cache_directory:
+            The directory of a :py:class:`CompressionCache` to reuse the\
+            compressed tables of, or None to compress every table
+        :type cache_directory: str or None
+        :param int cache_size: The number of bytes the cache may take
         :rtype: MulticastRoutingTables
         :raises PacmanElementAllocationException:
             if the compressed table won't fit
@@ -37,7 +48,9 @@ class CheckedUnorderedCompressor(UnorderedCompressor):
         # create progress bar
         progress = ProgressBar(
             router_tables.routing_tables, "Compressing routing Tables")
-        compressed = self.compress_tables(router_tables, progress)
+        compressed = self.compress_tables(
+            router_tables, progress, n_processes,
+            self._cache(cache_directory, cache_size))
         self.verify_lengths(compressed)
         return compressed
 
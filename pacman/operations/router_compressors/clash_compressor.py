@@ -81,8 +81,7 @@ class ClashCompressor(AbstractCompressor):
         """
         while True:
             self._all_entries = defaultdict(list)
-            for mcr_entry in router_table.multicast_routing_entries:
-                entry = Entry.from_MulticastRoutingEntry(mcr_entry)
+            for entry in Entry.from_routing_table(router_table):
                 if entry not in top_entries:
                     self._all_entries[entry.spinnaker_route].append(entry)
 
@@ -0,0 +1,197 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+import tempfile
+import time
+import numpy
+from pacman.model.routing_tables import ArrayMulticastRoutingTable
+from .entry import Entry
+
+#: The extension of the files in the cache
+_EXTENSION = ".entries"
+#: The extension of the files being written, before they are renamed
+_TEMP_EXTENSION = ".partial"
+#: Seconds after which a file still being written is taken to be left over
+_STALE_SECONDS = 60 * 60
+
+
+def _replace(source, destination):
+    """ Rename a file, replacing any file already at the destination
+
+    :param str source: The file to rename
+    :param str destination: The new name of the file
+    """
+    try:
+        # Replaces the destination in one step on POSIX
+        os.rename(source, destination)
+    except OSError:
+        # Windows will not rename over an existing file
+        _remove(destination)
+        os.rename(source, destination)
+
+
+def _remove(path):
+    """ Delete a file, if it is still there
+
+    :param str path: The file to delete
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class CompressionCache(object):
+    """ A directory of compressed routing tables, named by a hash of the\
+        table that was compressed and of how it was compressed.
+
+    Each file holds the key, mask, route and defaultable flag of each entry\
+    of a compressed table as little-endian 32-bit numbers.  The files used\
+    least recently are deleted when the files take more than the size of\
+    the cache.
+    """
+
+    __slots__ = [
+        # The directory holding the files
+        "_directory",
+
+        # The number of bytes the files may take in total
+        "_max_bytes"
+    ]
+
+    #: The number of bytes the files may take by default
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        :param str directory:
+            The directory to keep the files in, which is made if needed
+        :param int max_bytes: The number of bytes the files may take in total
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._directory = directory
+        self._max_bytes = max_bytes
+
+    @staticmethod
+    def key(table, compressor, target_length):
+        """ Get the name of the cached result of compressing a table
+
+        :param AbsractMulticastRoutingTable table: The table to compress
+        :param AbstractCompressor compressor: The compressor used
+        :param int target_length: The length the compressor aims for
+        :return: A hash of the entries of the table (but not of its chip),\
+            the class and :py:meth:`~AbstractCompressor._cache_salt` of the\
+            compressor and the lengths
+        :rtype: str
+        """
+        if not isinstance(table, ArrayMulticastRoutingTable):
+            table = ArrayMulticastRoutingTable.from_routing_table(table)
+        digest = hashlib.sha256()
+        compressor_type = type(compressor)
+        digest.update("{}.{} {} {} {}".format(
+            compressor_type.__module__, compressor_type.__name__,
+            target_length, compressor.MAX_SUPPORTED_LENGTH,
+            compressor._cache_salt()).encode("utf-8"))
+        for column in (table.keys, table.masks, table.routes,
+                       table.defaultable.astype(numpy.uint32)):
+            digest.update(column.astype("<u4").tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        """
+        :param str key:
+        :rtype: str
+        """
+        return os.path.join(self._directory, key + _EXTENSION)
+
+    def get(self, key):
+        """ Get a cached compressed table, marking it as recently used
+
+        :param str key: The name from :py:meth:`key`
+        :return: The entries of the compressed table, or None if not cached
+        :rtype: list(Entry) or None
+        """
+        path = self._path(key)
+        try:
+            data = numpy.fromfile(path, dtype="<u4")
+            os.utime(path, None)
+        except (IOError, OSError):
+            return None
+        if len(data) % 4:
+            return None
+        return [Entry(entry_key, mask, bool(defaultable), route)
+                for entry_key, mask, route, defaultable in
+                data.reshape(-1, 4).tolist()]
+
+    def put(self, key, entries):
+        """ Add a compressed table to the cache
+
+        :param str key: The name from :py:meth:`key`
+        :param list(Entry) entries: The entries of the compressed table
+        """
+        data = numpy.array(
+            [(entry.key, entry.mask, entry.spinnaker_route,
+              entry.defaultable) for entry in entries],
+            dtype="<u4").reshape(-1, 4)
+
+        # Write to a new file and then rename it, so that the file is
+        # never seen half written
+        fd, temp_path = tempfile.mkstemp(
+            suffix=_TEMP_EXTENSION, dir=self._directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data.tobytes())
+            _replace(temp_path, self._path(key))
+        except (IOError, OSError):
+            _remove(temp_path)
+            raise
+
+    def trim(self):
+        """ Delete the files used least recently until the files take no\
+            more than the size of the cache, and any files left half written
+
+        Other processes may be using the cache at the same time, so files\
+        may vanish while this looks at them.
+        """
+        files = list()
+        total = 0
+        stale = time.time() - _STALE_SECONDS
+        for name in os.listdir(self._directory):
+            path = os.path.join(self._directory, name)
+            if name.endswith(_TEMP_EXTENSION):
+                try:
+                    if os.stat(path).st_mtime < stale:
+                        os.remove(path)
+                except OSError:
+                    pass
+            elif name.endswith(_EXTENSION):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, name, stat.st_size))
+                total += stat.st_size
+        files.sort()
+        for _, name, size in files:
+            if total <= self._max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self._directory, name))
+            except OSError:
+                continue
+            total -= size
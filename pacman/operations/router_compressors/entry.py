@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from spinn_machine import MulticastRoutingEntry
+from pacman.model.routing_tables import ArrayMulticastRoutingTable
 
 
 class Entry(object):
@@ -51,6 +52,27 @@ class Entry(object):
             mre._routing_entry_key, mre._mask, mre._defaultable,
             mre._spinnaker_route)
 
+    @staticmethod
+    def from_routing_table(router_table):
+        """ Get the entries of a routing table
+
+        The entries of an :py:class:`~.ArrayMulticastRoutingTable` are made\
+        straight from its arrays, without making\
+        :py:class:`MulticastRoutingEntry` objects first.
+
+        :param AbsractMulticastRoutingTable router_table:
+        :rtype: list(Entry)
+        """
+        if isinstance(router_table, ArrayMulticastRoutingTable):
+            return [
+                Entry(key, mask, defaultable, route)
+                for key, mask, route, defaultable in zip(
+                    router_table.keys.tolist(), router_table.masks.tolist(),
+                    router_table.routes.tolist(),
+                    router_table.defaultable.tolist())]
+        return [Entry.from_MulticastRoutingEntry(mre)
+                for mre in router_table.multicast_routing_entries]
+
     def to_MulticastRoutingEntry(self):
         """
         :rtype: MulticastRoutingEntry
@@ -142,6 +142,9 @@ As a heuristic:
 based on
 https://github.com/project-rig/rig/blob/master/rig/routing_table/ordered_covering.py
 """
+import heapq
+from bisect import bisect_left
+import numpy
 from pacman.operations.router_compressors import Entry
 from pacman.exceptions import MinimisationFailedError
 from .remove_default_routes import minimise as remove_default_routes
@@ -256,9 +259,12 @@ def ordered_covering(
         key=lambda entry: get_generality(entry.key, entry.mask)
     )
 
+    # The refined merges of each route, kept between iterations
+    merges = _MergeCache()
+
     while target_length is None or len(routing_table) > target_length:
         # Get the best merge
-        merge = _get_best_merge(routing_table, aliases)
+        merge = merges.get_best_merge(routing_table, aliases)
 
         # If there is no merge then stop
         if merge.goodness <= 0:
@@ -267,6 +273,7 @@ def ordered_covering(
         # Otherwise apply the merge, this returns a new routing table and a new
         # aliases dictionary.
         routing_table, aliases = merge.apply(aliases)
+        merges.merge_applied(merge)
 
         # control for limiting the search
         if use_timer_cut_off:
@@ -301,8 +308,8 @@ def get_generality(key, mask):
     :param int mask:
     :rtype: int
     """
-    xs = (~key) & (~mask)
-    return sum(1 for i in range(32) if xs & (1 << i))
+    xs = (~key) & (~mask) & FULL_MASK
+    return bin(xs).count("1")
 
 
 def _get_best_merge(routing_table, aliases):
@@ -348,6 +355,94 @@ def _get_best_merge(routing_table, aliases):
     return best_merge
 
 
+class _MergeCache(object):
+    """ Finds the same best merge as :py:func:`_get_best_merge`, but keeps\
+        the refined merge of each route from one merge to the next.
+
+    Only the merges of routes whose entries, taken together, match a key of\
+    the entry made by the last merge are refined again; refining checks\
+    only entries which match a key of the merge being refined, or which\
+    are aliases of entries which do, and the aliases of an entry never\
+    match keys that the entry does not.  The routes are then taken in order\
+    of goodness, using the size of an unrefined merge as an upper bound, so\
+    only routes which could beat the best merge are refined.
+    """
+
+    __slots__ = [
+        # The refined merge of each route, as a tuple of (goodness, indices
+        # of the entries of the refined merge, key and mask of the merge of
+        # all the entries of the route)
+        "_refined"
+    ]
+
+    def __init__(self):
+        self._refined = dict()
+
+    def get_best_merge(self, routing_table, aliases):
+        """ Get the merge which would combine the greatest number of\
+            entries; of equally good merges, that of the route which comes\
+            first in the table is chosen.
+
+        :param list(Entry) routing_table: Routing entries to be merged.
+        :param aliases:
+            Dictionary of which keys and masks in the routing table are
+            combinations of other (now removed) keys and masks.
+        :type aliases: dict(tuple(int, int), set(tuple(int, int))
+        :return: Merge
+        :rtype: _Merge
+        """
+        routes = dict()
+        for i, entry in enumerate(routing_table):
+            routes.setdefault(entry.spinnaker_route, list()).append(i)
+
+        # A heap of (-goodness, first index, route, exact); unrefined merges
+        # have the goodness of the merge of all the entries of the route
+        heap = list()
+        for route, indices in routes.items():
+            if len(indices) < 2:
+                continue
+            refined = self._refined.get(route)
+            if refined is None:
+                heap.append((1 - len(indices), indices[0], route, False))
+            else:
+                heap.append((-refined[0], indices[0], route, True))
+        heapq.heapify(heap)
+
+        while heap:
+            negative_goodness, first, route, exact = heapq.heappop(heap)
+            if exact:
+                if negative_goodness >= 0:
+                    break
+                return _Merge(routing_table, self._refined[route][1])
+            merge = _Merge(routing_table, routes[route])
+            refined = _refine_merge(merge, aliases, min_goodness=0)
+            self._refined[route] = (
+                refined.goodness, refined.entries, merge.key, merge.mask)
+            heapq.heappush(heap, (-refined.goodness, first, route, True))
+
+        # There is no merge which would make the table smaller
+        return _Merge(routing_table)
+
+    def merge_applied(self, merge):
+        """ Update the merges after a merge has been applied to the table
+
+        :param _Merge merge: The merge which was applied
+        """
+        removed = sorted(merge.entries)
+        merged_route = merge.routing_table[removed[0]].spinnaker_route
+        for route, (goodness, entries, key, mask) in list(
+                self._refined.items()):
+            if route == merged_route or intersect(
+                    key, mask, merge.key, merge.mask):
+                del self._refined[route]
+            else:
+                # Work out where the entries have moved to
+                self._refined[route] = (goodness, frozenset(
+                    i - bisect_left(removed, i) +
+                    (1 if i >= merge.insertion_index else 0)
+                    for i in entries), key, mask)
+
+
 def _get_all_merges(routing_table):
     """ Get possible sets of entries to merge.
 
@@ -416,6 +511,26 @@ def _get_insertion_index(routing_table, generality):
     return pos
 
 
+#: The value of each bit of a key or mask
+_ALL_BITS = tuple(1 << i for i in range(32))
+
+
+def _merged_key_mask(any_ones, all_ones, all_selected):
+    """ Get the key and mask of the entry which merges some entries
+
+    :param int any_ones: Where there is a 1 in *any* of the keys
+    :param int all_ones: Where there is a 1 in *all* of the keys
+    :param int all_selected: Where there is a 1 in *all* of the masks
+    :return: The key and mask
+    :rtype: tuple(int, int)
+    """
+    any_zeros = ~all_ones
+    new_xs = any_ones ^ any_zeros
+    mask = all_selected & new_xs  # Combine existing and new Xs
+    key = all_ones & mask
+    return key, mask
+
+
 class _Merge(object):
     """Represents a potential merge of routing table entries. """
 
@@ -466,10 +581,8 @@ class _Merge(object):
             self.defaultable = self.defaultable and entry.defaultable
 
         # Compute the new mask, key and generality
-        any_zeros = ~all_ones
-        new_xs = any_ones ^ any_zeros
-        self.mask = all_selected & new_xs  # Combine existing and new Xs
-        self.key = all_ones & self.mask
+        self.key, self.mask = _merged_key_mask(
+            any_ones, all_ones, all_selected)
 
         self.generality = get_generality(self.key, self.mask)
         self.insertion_index = _get_insertion_index(
@@ -604,27 +717,49 @@ def _refine_upcheck(merge, min_goodness):
     :rtype: tuple(_Merge, bool)
     """
     # Remove any entries which would be covered by entries above the merge
-    # position.
+    # position.  The keys and masks of the table are checked as arrays, and
+    # the insertion index is worked out again after each removal without
+    # making a new merge.
+    routing_table = merge.routing_table
+    keys = numpy.array(
+        [entry.key for entry in routing_table], dtype=numpy.int64)
+    masks = numpy.array(
+        [entry.mask for entry in routing_table], dtype=numpy.int64)
+    in_merge = numpy.zeros(len(routing_table), dtype=bool)
+    in_merge[list(merge.entries)] = True
+    entries = set(merge.entries)
+    insertion_index = merge.insertion_index
     changed = False
     for i in sorted(merge.entries, reverse=True):
         # Get all the entries that are between the entry we're looking at the
         # insertion index of the proposed merged index. If this entry would be
         # covered up by any of them then we remove it from the merge.
-        entry = merge.routing_table[i]
+        entry = routing_table[i]
         key, mask = entry.key, entry.mask
-        if any(intersect(key, mask, other.key, other.mask) for other in
-               merge.routing_table[i+1:merge.insertion_index]):
+        between = slice(i + 1, insertion_index)
+        if numpy.any((key & masks[between]) == (keys[between] & mask)):
             # The entry would be partially or wholly covered by another entry,
-            # remove it from the merge and return a new merge.
-            merge = _Merge(merge.routing_table, merge.entries - {i})
+            # remove it from the merge.
+            entries.remove(i)
+            in_merge[i] = False
             changed = True
 
             # Check if the merge is sufficiently good
-            if merge.goodness <= min_goodness:
-                merge = _Merge(merge.routing_table)  # Replace with empty merge
-                break
+            if len(entries) - 1 <= min_goodness:
+                # Replace with empty merge
+                return _Merge(routing_table), changed
+
+            # Find where the smaller merge would be inserted
+            merged_key, merged_mask = _merged_key_mask(
+                int(numpy.bitwise_or.reduce(keys[in_merge])),
+                int(numpy.bitwise_and.reduce(keys[in_merge])),
+                int(numpy.bitwise_and.reduce(masks[in_merge])))
+            insertion_index = _get_insertion_index(
+                routing_table, get_generality(merged_key, merged_mask))
 
     # Return the final merge
+    if changed:
+        merge = _Merge(routing_table, entries)
     return merge, changed
 
 
@@ -753,9 +888,6 @@ def _refine_downcheck(merge, aliases, min_goodness):
     #     generality and is therefore nearer the top of the table so new
     #     entries may be have become covered
 
-    # Set of bit positions
-    all_bits = tuple(1 << i for i in range(32))
-
     # While the merge is still worth considering continue to perform the
     # down-check.
     while merge.goodness > min_goodness:
@@ -769,28 +901,36 @@ def _refine_downcheck(merge, aliases, min_goodness):
         # For each covered entry work out which bits in the key-mask pair which
         # are not Xs are not covered by Xs in the merge key-mask pair. Only
         # keep track of the entries which have the fewest bits that we could
-        # set.
+        # set, and of those, which bits are 1 and which are 0 in any entry.
         most_stringent = 33  # Not at all stringent
-        bits_and_vals = set()
+        any_ones = 0
+        any_zeros = 0
         for key, mask in covered:
             # Get the bit positions where there ISN'T an X in the covered entry
             # but there IS an X in the merged entry.
-            settable = mask & ~merge.mask
+            settable = mask & ~merge.mask & FULL_MASK
 
             # Count the number of settable bits, if this is a more stringent
             # constraint than the previous constraint then ensure that we
             # record the new stringency and store which bits we need to set to
             # meet the constraint.
-            n_settable = sum(1 for bit in all_bits if bit & settable)
+            n_settable = bin(settable).count("1")
             if n_settable <= most_stringent:
                 if n_settable < most_stringent:
                     most_stringent = n_settable
-                    bits_and_vals = set()
+                    any_ones = 0
+                    any_zeros = 0
+                any_ones |= key & settable
+                any_zeros |= ~key & settable
 
-                # Add this settable mask and the required values to the
-                # settables list.
-                bits_and_vals.update((bit, not (key & bit)) for bit in
-                                     all_bits if bit & settable)
+        # Make the settables list: a 1 in a bit must be removed by setting the
+        # bit to 0, and a 0 by setting it to 1
+        bits_and_vals = set()
+        for bit in _ALL_BITS:
+            if any_ones & bit:
+                bits_and_vals.add((bit, False))
+            if any_zeros & bit:
+                bits_and_vals.add((bit, True))
 
         if most_stringent == 0:
             # If are there any instances where we could not possibly change a
@@ -802,29 +942,31 @@ def _refine_downcheck(merge, aliases, min_goodness):
             # Get the smallest number of entries to remove to modify the
             # resultant key-mask to avoid covering a lower entry. Prefer to
             # modify more significant bits of the key mask.
-            remove = set()  # Entries to remove
+            # The entries are looked at as arrays, one bit at a time.
+            entries = numpy.array(sorted(merge.entries), dtype=numpy.intp)
+            keys = numpy.array(
+                [merge.routing_table[i].key for i in entries],
+                dtype=numpy.int64)
+            masks = numpy.array(
+                [merge.routing_table[i].mask for i in entries],
+                dtype=numpy.int64)
+            remove = entries[:0]  # Entries to remove
             for bit, val in sorted(bits_and_vals, reverse=True):
-                working_remove = set()  # Holder for working remove set
-
-                for i in merge.entries:
-                    entry = merge.routing_table[i]
-
-                    if ((not entry.mask & bit) or
-                            (bool(entry.key & bit) is (not val))):
-                        # If the entry has an X in this position then it will
-                        # need to be removed regardless of whether we want to
-                        # set a 0 or a 1 in this position, likewise it will
-                        # need to be removed if it is a 0 and we want a 1 or
-                        # vice-versa.
-                        working_remove.add(i)
+                # If the entry has an X in this position then it will need to
+                # be removed regardless of whether we want to set a 0 or a 1
+                # in this position, likewise it will need to be removed if it
+                # is a 0 and we want a 1 or vice-versa.
+                working_remove = entries[
+                    ((masks & bit) == 0) | (((keys & bit) != 0) != val)]
 
                 # If the current remove set is empty or the new remove set is
                 # smaller update the remove set.
-                if not remove or len(working_remove) < len(remove):
+                if not len(remove) or len(working_remove) < len(remove):
                     remove = working_remove
 
             # Remove the selected entries from the merge
-            merge = _Merge(merge.routing_table, merge.entries - remove)
+            merge = _Merge(
+                merge.routing_table, merge.entries.difference(remove.tolist()))
     else:
         # NOTE: If there are no covered entries, that is, if the merge is
         # better than min goodness AND valid this `else` clause is not reached.
@@ -33,12 +33,7 @@ class MundyRouterCompressor(AbstractCompressor):
         :rtype: list(RoutingTableEntry)
         """
         # convert to rig inspired format
-        entries = list()
-
-        # handle entries
-        for router_entry in router_table.multicast_routing_entries:
-            # Add the new entry
-            entries.append(Entry.from_MulticastRoutingEntry(router_entry))
+        entries = Entry.from_routing_table(router_table)
 
         compressed_router_table_entries = \
             rigs_compressor.minimise(entries, self._target_length)
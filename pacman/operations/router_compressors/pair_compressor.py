@@ -337,9 +337,8 @@ class PairCompressor(AbstractCompressor):
         self._routes = self.MAX_SUPPORTED_LENGTH * [None]
         self._routes_frequency = self.MAX_SUPPORTED_LENGTH * [None]
 
-        for entry in router_table.multicast_routing_entries:
-            self._all_entries.append(
-                Entry.from_MulticastRoutingEntry(entry))
+        for entry in Entry.from_routing_table(router_table):
+            self._all_entries.append(entry)
             self.update_frequency(entry.spinnaker_route)
 
         self._quicksort_routes(0, self._routes_count - 1)
@@ -0,0 +1,322 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+import multiprocessing
+from spinn_utilities.overrides import overrides
+from spinn_utilities.timer import Timer
+from pacman.exceptions import MinimisationFailedError
+from .abstract_compressor import AbstractCompressor
+from .compression_cache import CompressionCache
+from .mundys_router_compressor.routing_table_condenser import (
+    MundyRouterCompressor)
+from .pair_compressor import PairCompressor
+
+
+def _run_strategy(strategy, target_length, router_table):
+    """ Compress a table with one of the strategies of a portfolio
+
+    :param AbstractCompressor strategy: The compressor to use
+    :param int target_length: The length the compressor aims for
+    :param MulticastRoutingTable router_table: The table to compress
+    :return: The entries of the compressed table, or None if the\
+        compressor failed, any problems it found, and how long it took
+    :rtype: tuple(list(Entry) or None, str, ~datetime.timedelta)
+    """
+    strategy._target_length = target_length
+    strategy._problems = ""
+    with Timer() as timer:
+        try:
+            entries = strategy.compress_table(router_table)
+        except MinimisationFailedError as e:
+            entries = None
+            strategy._problems += str(e)
+    return entries, strategy._problems, timer.measured_interval
+
+
+class PortfolioCompressor(AbstractCompressor):
+    """ A compressor which compresses each table with several other\
+        compressors, the cheapest first, keeping the smallest result.
+
+    A table is only compressed with the next compressor if the result of\
+    those before is still longer than the target length, or than\
+    :py:attr:`MAX_SUPPORTED_LENGTH` if there is no target length.  If the\
+    compressors are raced, they all compress each table at the same time\
+    in a pool of processes, and only the results of those that finish\
+    within the time budget are kept (or that of the first to finish, if\
+    none do).  The compressor chosen for each chip and how long each took\
+    are in :py:attr:`records`; tables found in a cache are recorded as won\
+    by :py:attr:`FROM_CACHE`.
+    """
+
+    __slots__ = [
+        # The compressors to try, cheapest first
+        "_strategies",
+
+        # Whether to run the compressors at the same time
+        "_race",
+
+        # Seconds to wait for raced compressors, or None to wait for all
+        "_time_budget",
+
+        # The pool of processes racing the compressors, when racing
+        "_pool",
+
+        # The winner and timings of each chip compressed, by (x, y)
+        "_records"
+    ]
+
+    #: The compressors used when none are given, cheapest first
+    DEFAULT_STRATEGIES = (PairCompressor, MundyRouterCompressor)
+
+    #: The name recorded as the winner for tables found in a cache
+    FROM_CACHE = "cache"
+
+    def __init__(self, strategies=DEFAULT_STRATEGIES):
+        """
+        :param iterable(type) strategies:
+            The classes of the compressors to try, cheapest first
+        """
+        super(PortfolioCompressor, self).__init__(True)
+        self._strategies = [strategy() for strategy in strategies]
+        self._race = False
+        self._time_budget = None
+        self._pool = None
+        self._records = dict()
+
+    @overrides(AbstractCompressor.__call__, extend_defaults=True,
+               additional_arguments=["race", "time_budget"])
+    def __call__(self, router_tables, target_length=None, n_processes=1,
+                 cache_directory=None,
+                 cache_size=CompressionCache.DEFAULT_MAX_BYTES,
+                 race=False, time_budget=None):
+        """
+        :param MulticastRoutingTables router_tables:
+        :param int target_length:
+        :param int n_processes:
+            The number of processes to compress in; see\
+            :py:meth:`compress_tables`.  Not used if racing.
+        :param cache_directory:
+            The directory of a :py:class:`CompressionCache` to reuse the\
+            compressed tables of, or None to compress every table
+        :type cache_directory: str or None
+        :param int cache_size: The number of bytes the cache may take
+        :param bool race:
+            Whether to compress each table with all the compressors at the\
+            same time, each in its own process, one table at a time
+        :param time_budget:
+            When racing, the seconds to wait for the compressors to finish\
+            a table, or None to wait for them all
+        :type time_budget: float or None
+        :rtype: MulticastRoutingTables
+        """
+        # pylint: disable=too-many-arguments, arguments-differ
+        self._race = race
+        self._time_budget = time_budget
+        if race:
+            n_processes = 1
+        return super(PortfolioCompressor, self).__call__(
+            router_tables, target_length, n_processes, cache_directory,
+            cache_size)
+
+    @overrides(AbstractCompressor.compress_tables)
+    def compress_tables(self, router_tables, progress, n_processes=1,
+                        cache=None):
+        self._records = dict()
+        if self._race:
+            self._pool = multiprocessing.Pool(len(self._strategies))
+        try:
+            return super(PortfolioCompressor, self).compress_tables(
+                router_tables, progress, n_processes, cache)
+        finally:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
+
+    @property
+    def records(self):
+        """ For each chip compressed, by (x, y), the name of the compressor\
+            whose result was kept (None if all failed, or\
+            :py:attr:`FROM_CACHE` if the table was found in a cache), and how\
+            long each compressor took by name (or None if it was not run or\
+            did not finish in time)
+
+        :rtype: dict(tuple(int,int),
+            tuple(str or None, dict(str, ~datetime.timedelta or None)))
+        """
+        return self._records
+
+    def _good_enough(self, entries):
+        """
+        :param list(Entry) entries:
+        :return: Whether there is no need to try another compressor
+        :rtype: bool
+        """
+        return len(entries) <= (
+            self._target_length or self.MAX_SUPPORTED_LENGTH)
+
+    def _usable(self, result):
+        """
+        :param result: The result of :py:func:`_run_strategy`, or None
+        :type result: tuple or None
+        :return: Whether the result is a table that fits in a router
+        :rtype: bool
+        """
+        if result is None:
+            return False
+        entries, problems, _ = result
+        return (entries is not None and not problems and
+                len(entries) <= self.MAX_SUPPORTED_LENGTH)
+
+    @overrides(AbstractCompressor.compress_table)
+    def compress_table(self, router_table):
+        """
+        :param MulticastRoutingTable router_table:
+        :rtype: list(Entry)
+        """
+        if self._race:
+            results = self._race_strategies(router_table)
+        else:
+            results = list()
+            for strategy in self._strategies:
+                result = _run_strategy(
+                    strategy, self._target_length, router_table)
+                results.append(result)
+                entries, problems, _ = result
+                if (entries is not None and not problems and
+                        self._good_enough(entries)):
+                    break
+            results += [None] * (len(self._strategies) - len(results))
+
+        # Keep the shortest result without problems, or failing that the
+        # shortest result, with the cheapest compressor winning ties
+        best = None
+        timings = OrderedDict()
+        for strategy, result in zip(self._strategies, results):
+            name = type(strategy).__name__
+            timings[name] = None
+            if result is None:
+                continue
+            entries, problems, timings[name] = result
+            if entries is None:
+                continue
+            rank = (bool(problems), len(entries))
+            if best is None or rank < best[0]:
+                best = (rank, name, entries, problems)
+        if best is None:
+            self._records[router_table.x, router_table.y] = (None, timings)
+            raise MinimisationFailedError(
+                "No compressor could compress the table of chip {}, {}: "
+                "{}".format(router_table.x, router_table.y, " ".join(
+                    result[1] for result in results if result is not None)))
+        _, name, entries, problems = best
+        self._problems += problems
+        self._records[router_table.x, router_table.y] = (name, timings)
+        return entries
+
+    def _race_strategies(self, router_table):
+        """ Compress a table with all the compressors at the same time
+
+        :param MulticastRoutingTable router_table:
+        :return: The result of :py:func:`_run_strategy` for each\
+            compressor, or None for those that did not finish in time
+        :rtype: list(tuple or None)
+        """
+        timer = Timer()
+        timer.start_timing()
+        pending = [
+            self._pool.apply_async(
+                _run_strategy, (strategy, self._target_length, router_table))
+            for strategy in self._strategies]
+        results = [None] * len(pending)
+        for i, result in enumerate(pending):
+            timeout = None
+            if self._time_budget is not None:
+                timeout = max(0.0, self._time_budget -
+                              timer.take_sample().total_seconds())
+            try:
+                results[i] = result.get(timeout)
+            except multiprocessing.TimeoutError:
+                pass
+
+        # Out of time; wait on only until a result fits in a router
+        while (not any(self._usable(result) for result in results) and
+               any(result is None for result in results)):
+            for i, result in enumerate(pending):
+                if results[i] is None and result.ready():
+                    results[i] = result.get()
+            if None in results:
+                pending[results.index(None)].wait(0.01)
+
+        if any(result is None for result in results):
+            # Stop the compressors still running
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = multiprocessing.Pool(len(self._strategies))
+        return results
+
+    @overrides(AbstractCompressor._cache_salt)
+    def _cache_salt(self):
+        return "{} {} {}".format(
+            ["{}.{}".format(type(strategy).__module__, type(strategy).__name__)
+             for strategy in self._strategies],
+            self._race, self._time_budget)
+
+    @overrides(AbstractCompressor._note_cached)
+    def _note_cached(self, router_table):
+        self._records[router_table.x, router_table.y] = (
+            self.FROM_CACHE, OrderedDict(
+                (type(strategy).__name__, None)
+                for strategy in self._strategies))
+
+    @overrides(AbstractCompressor._take_notes)
+    def _take_notes(self):
+        records = self._records
+        self._records = dict()
+        return records
+
+    @overrides(AbstractCompressor._add_notes)
+    def _add_notes(self, notes):
+        self._records.update(notes)
+
+
+def portfolio_compress(
+        router_tables, target_length=None, n_processes=1,
+        cache_directory=None, cache_size=CompressionCache.DEFAULT_MAX_BYTES,
+        race=False, time_budget=None):
+    """ Compress tables with a :py:class:`PortfolioCompressor` of the\
+        default compressors, also giving what it recorded, so that the\
+        records can be passed on by the algorithm executor
+
+    :param MulticastRoutingTables router_tables:
+    :param int target_length:
+    :param int n_processes:
+    :param cache_directory:
+    :type cache_directory: str or None
+    :param int cache_size:
+    :param bool race:
+    :param time_budget:
+    :type time_budget: float or None
+    :return: The compressed tables, and\
+        :py:attr:`PortfolioCompressor.records`
+    :rtype: tuple(MulticastRoutingTables, dict)
+    """
+    # pylint: disable=too-many-arguments
+    compressor = PortfolioCompressor()
+    compressed = compressor(
+        router_tables, target_length, n_processes, cache_directory,
+        cache_size, race, time_budget)
+    return compressed, compressor.records
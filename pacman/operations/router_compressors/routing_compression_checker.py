@@ -13,160 +13,213 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from collections import OrderedDict
 import logging
 import os
+import numpy
 from spinn_utilities.log import FormatAdapter
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.exceptions import PacmanRoutingException
+from pacman.model.routing_tables import ArrayMulticastRoutingTable
 from pacman.operations.algorithm_reports import reports
 
 logger = FormatAdapter(logging.getLogger(__name__))
-WILDCARD = "*"
 LINE_FORMAT = "0x{:08X} 0x{:08X} 0x{:08X} {: <7s} {}\n"
+#: The number of original routes checked together by :py:func:`compare_tables`
+_BATCH_SIZE = 256
+#: The bits of a spinnaker_route which are links rather than processors
+_LINK_BITS = 0x3F
 
 
-def codify(route, length=32):
+def covers(o_key, o_mask, c_key, c_mask):
+    """ Determine if any key is matched by both of two key-mask pairs
+
+    :param int o_key:
+    :param int o_mask:
+    :param int c_key:
+    :param int c_mask:
+    :rtype: bool
     """
-    This method discovers all the routing keys covered by this route.
+    # The keys only need to agree where both masks are set
+    return (o_key ^ c_key) & o_mask & c_mask == 0
 
-    Starts of with the assumption that the key is always covered.
 
-    Whenever a mask bit is zero the list of covered keys is doubled to\
-    include both the key with a zero and a one at that place.
-
-    :param ~spinn_machine.MulticastRoutingEntry route: single routing Entry
-    :param int length: length in bits of the key and mask (defaults to 32)
-    :return: set of routing_keys covered by this route
-    :rtype: str
-    """
-    mask = route.mask
-    key = route.routing_entry_key
-    code = ""
-    # Check each bit in the mask
-    for i in range(length):
-        bit_value = 2**i
-        # If the mask bit is zero then both zero and one acceptable
-        if mask & bit_value:
-            code = str(int(key & bit_value != 0)) + code
-        else:
-            # Safety key 1 with mask 0 is an error
-            assert key & bit_value == 0, \
-                "Bit {} on the mask:{} is 0 but 1 in the key:{}".format(
-                    i, bin(mask), bin(key))
-            code = WILDCARD + code
-    return code
-
-
-def codify_table(table, length=32):
-    """
-    :param MulticastRoutingTable table:
-    :param int length:
-    :rtype: dict(str, ~spinn_machine.MulticastRoutingEntry)
-    """
-    code_dict = OrderedDict()
-    for route in table.multicast_routing_entries:
-        code_dict[codify(route, length)] = route
-    return code_dict
+def calc_remainders(o_key, o_mask, c_key, c_mask):
+    """ Split the keys matched by a key-mask pair but not by another into\
+        key-mask pairs which match none of the same keys
 
+    The pairs are split bit by bit, starting with the least significant bit\
+    which is set in the second mask but not in the first.
 
-def covers(o_code, c_code):
+    :param int o_key:
+    :param int o_mask:
+    :param int c_key:
+    :param int c_mask:
+    :rtype: list(tuple(int, int))
     """
-    :param str o_code:
-    :param str c_code:
-    :rtype: bool
-    """
-    if o_code == c_code:
-        return True
-    for o_char, c_char in zip(o_code, c_code):
-        if o_char == "1" and c_char == "0":
-            return False
-        if o_char == "0" and c_char == "1":
-            return False
-        # o_char = c_char or either wildcard is some cover
-    return True
-
-
-def calc_remainders(o_code, c_code):
-    """
-    :param str o_code:
-    :param str c_code:
-    :rtype: list(str)
-    """
-    if o_code == c_code:
-        # "" = "" so also the terminator case
-        return []
     remainders = []
-    for tail in calc_remainders(o_code[1:], c_code[1:]):
-        remainders.append(o_code[0] + tail)
-    if o_code[0] == WILDCARD:
-        if c_code[0] == "0":
-            remainders.append("1" + o_code[1:])
-        if c_code[0] == "1":
-            remainders.append("0" + o_code[1:])
+    split = c_mask & ~o_mask
+    while split:
+        bit = split & -split
+        # Keys with the other value to c_key at this bit are not matched
+        remainders.append(((o_key & ~bit) | (~c_key & bit), o_mask | bit))
+        # The rest have the same value as c_key
+        o_key = (o_key & ~bit) | (c_key & bit)
+        o_mask |= bit
+        split &= ~bit
     return remainders
 
 
-def compare_route(o_route, compressed_dict, o_code=None, start=0, f=None):
+class CompressedTable(object):
+    """ The entries of a compressed routing table, with their keys, masks,\
+        routes and defaultable flags in arrays so that they can be compared\
+        with many keys and masks at once.
+    """
+
+    __slots__ = [
+        # The entries of the table, in order
+        "entries",
+
+        # The keys of the entries
+        "keys",
+
+        # The masks of the entries
+        "masks",
+
+        # The spinnaker_route of each entry
+        "routes",
+
+        # Whether each entry is defaultable
+        "defaultable"
+    ]
+
+    def __init__(self, table):
+        """
+        :param MulticastRoutingTable table: The table, which is searched\
+            in order
+        """
+        if not isinstance(table, ArrayMulticastRoutingTable):
+            table = ArrayMulticastRoutingTable.from_routing_table(table)
+        self.entries = table.multicast_routing_entries
+        self.keys = table.keys
+        self.masks = table.masks
+        self.routes = table.routes
+        self.defaultable = table.defaultable
+
+    def first_covering(self, key, mask, start=0):
+        """ Find the first entry that matches any of the keys of a key-mask\
+            pair
+
+        :param int key:
+        :param int mask:
+        :param int start: The index of the first entry to look at
+        :return: The index of the entry, or None if there is none
+        :rtype: int or None
+        """
+        found = numpy.flatnonzero(
+            (self.keys[start:] ^ key) & self.masks[start:] & mask == 0)
+        if not len(found):
+            return None
+        return start + int(found[0])
+
+    def first_covering_many(self, keys, masks):
+        """ Find the first entry that matches any of the keys of each of\
+            several key-mask pairs
+
+        :param ~numpy.ndarray keys:
+        :param ~numpy.ndarray masks:
+        :return: The index of the entry for each pair, or -1 if there is none
+        :rtype: ~numpy.ndarray
+        """
+        hits = ((keys[:, numpy.newaxis] ^ self.keys) & self.masks &
+                masks[:, numpy.newaxis]) == 0
+        return numpy.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+
+
+def compare_route(o_route, compressed, o_key=None, o_mask=None, start=0,
+                  f=None):
     """
     :param ~spinn_machine.MulticastRoutingEntry o_route: the original route
-    :param dict compressed_dict:
-    :param str o_code:
+    :param CompressedTable compressed:
+    :param int o_key: The key of the part of the route still to check
+    :param int o_mask: The mask of the part of the route still to check
     :param int start:
     :param ~io.FileIO f:
     :rtype: None
     """
-    if o_code is None:
-        o_code = codify(o_route)
-    keys = list(compressed_dict.keys())
-    for i in range(start, len(keys)):
-        c_code = keys[i]
-        if covers(o_code, c_code):
-            c_route = compressed_dict[c_code]
-            if f is not None:
-                f.write("\t\t{}\n".format(reports.format_route(c_route)))
-            if o_route.processor_ids != c_route.processor_ids:
-                if set(o_route.processor_ids) != set(c_route.processor_ids):
-                    raise PacmanRoutingException(
-                        "Compressed route {} covers original route {} but has "
-                        "a different processor_ids.".format(c_route, o_route))
-            if o_route.link_ids != c_route.link_ids:
-                if set(o_route.link_ids) != set(c_route.link_ids):
-                    raise PacmanRoutingException(
-                        "Compressed route {} covers original route {} but has "
-                        "a different link_ids.".format(c_route, o_route))
-            if not o_route.defaultable and c_route.defaultable:
-                if o_route == c_route:
-                    raise PacmanRoutingException(
-                        "Compressed route {} while original route {} but has "
-                        "a different defaultable value.".format(
-                            c_route, o_route))
-                else:
-                    compare_route(o_route, compressed_dict, o_code=o_code,
-                                  start=i + 1, f=f)
-            else:
-                remainders = calc_remainders(o_code, c_code)
-                for remainder in remainders:
-                    compare_route(o_route, compressed_dict, o_code=remainder,
-                                  start=i + 1, f=f)
-            return
-    if not o_route.defaultable:
-        # print("No route found {}".format(o_route))
-        raise PacmanRoutingException("No route found {}".format(o_route))
+    if o_key is None:
+        o_key = o_route.routing_entry_key
+        o_mask = o_route.mask
+    i = compressed.first_covering(o_key, o_mask, start)
+    if i is None:
+        if not o_route.defaultable:
+            raise PacmanRoutingException("No route found {}".format(o_route))
+        return
+
+    c_route = compressed.entries[i]
+    if f is not None:
+        f.write("\t\t{}\n".format(reports.format_route(c_route)))
+    difference = o_route.spinnaker_route ^ c_route.spinnaker_route
+    if difference & ~_LINK_BITS:
+        raise PacmanRoutingException(
+            "Compressed route {} covers original route {} but has "
+            "a different processor_ids.".format(c_route, o_route))
+    if difference:
+        raise PacmanRoutingException(
+            "Compressed route {} covers original route {} but has "
+            "a different link_ids.".format(c_route, o_route))
+    if not o_route.defaultable and c_route.defaultable:
+        if o_route == c_route:
+            raise PacmanRoutingException(
+                "Compressed route {} while original route {} but has "
+                "a different defaultable value.".format(c_route, o_route))
+        compare_route(o_route, compressed, o_key, o_mask, i + 1, f)
+    else:
+        for r_key, r_mask in calc_remainders(
+                o_key, o_mask, c_route.routing_entry_key, c_route.mask):
+            compare_route(o_route, compressed, r_key, r_mask, i + 1, f)
 
 
 def compare_tables(original, compressed):
     """ Compares the two tables without generating any output
 
+    The original routes are compared with the compressed table many at a\
+    time; only those that are not wholly covered by the first compressed\
+    route they meet are checked one at a time.
+
     :param MulticastRoutingTable original: The original routing tables
     :param MulticastRoutingTable compressed: The compressed routing tables.
         Which will be considered in order.
     :rtype: None
     :raises: PacmanRoutingException if there is any error
     """
-    compressed_dict = codify_table(compressed)
-    for o_route in original.multicast_routing_entries:
-        compare_route(o_route, compressed_dict)
+    compressed = CompressedTable(compressed)
+    if not isinstance(original, ArrayMulticastRoutingTable):
+        original = ArrayMulticastRoutingTable.from_routing_table(original)
+    o_entries = None
+    for start in range(0, original.number_of_entries, _BATCH_SIZE):
+        end = start + _BATCH_SIZE
+        keys = original.keys[start:end]
+        masks = original.masks[start:end]
+        first = compressed.first_covering_many(keys, masks)
+        found = first >= 0
+        c_keys = compressed.keys[first[found]]
+        c_masks = compressed.masks[first[found]]
+
+        # Done if the compressed route matches all the keys of the original
+        # with the same route, and the original need not be checked against
+        # later compressed routes
+        done = numpy.zeros(len(keys), dtype=bool)
+        done[found] = (
+            (c_masks & ~masks[found] == 0) &
+            (keys[found] & c_masks == c_keys) &
+            (compressed.routes[first[found]] ==
+             original.routes[start:end][found]) &
+            (original.defaultable[start:end][found] |
+             ~compressed.defaultable[first[found]]))
+        for i in numpy.flatnonzero(~done):
+            if o_entries is None:
+                o_entries = original.multicast_routing_entries
+            compare_route(o_entries[start + i], compressed)
 
 
 def generate_routing_compression_checker_report(
@@ -202,10 +255,10 @@ def generate_routing_compression_checker_report(
 
                 compressed_table = compressed_routing_tables.\
                     get_routing_table_for_chip(x, y)
-                compressed_dict = codify_table(compressed_table)
+                compressed = CompressedTable(compressed_table)
                 for o_route in original.multicast_routing_entries:
                     f.write("\t{}\n".format(reports.format_route(o_route)))
-                    compare_route(o_route, compressed_dict, f=f)
+                    compare_route(o_route, compressed, f=f)
     except IOError:
         logger.exception("Generate_router_comparison_reports: Can't open file"
                          " {} for writing.", file_name)
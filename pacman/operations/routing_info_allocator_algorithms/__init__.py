@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .basic_routing_info_allocator import BasicRoutingInfoAllocator
+from .compression_aware_routing_info_allocator import (
+    CompressionAwareRoutingInfoAllocator)
 from .destination_based_key_allocator import (
     DestinationBasedRoutingInfoAllocator)
 from pacman.operations.routing_info_allocator_algorithms.\
@@ -27,5 +29,6 @@ from pacman.operations.routing_info_allocator_algorithms.\
 
 __all__ = ['BasicRoutingInfoAllocator',
            'CompressibleMallocBasedRoutingInfoAllocator',
+           'CompressionAwareRoutingInfoAllocator',
            'DestinationBasedRoutingInfoAllocator',
            'MallocBasedRoutingInfoAllocator']
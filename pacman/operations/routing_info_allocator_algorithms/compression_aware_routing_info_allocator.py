@@ -0,0 +1,339 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import defaultdict, OrderedDict
+import logging
+from spinn_utilities.log import FormatAdapter
+from spinn_utilities.progress_bar import ProgressBar
+from pacman.exceptions import PacmanRouteInfoAllocationException
+from pacman.model.constraints.key_allocator_constraints import (
+    AbstractKeyAllocatorConstraint, ContiguousKeyRangeContraint)
+from pacman.model.graphs.common import EdgeTrafficType
+from pacman.model.routing_info import (
+    BaseKeyAndMask, PartitionRoutingInfo, RoutingInfo)
+from pacman.operations.router_compressors import AbstractCompressor
+from pacman.utilities.constants import BITS_IN_KEY, FULL_MASK
+from pacman.utilities.utility_calls import (
+    check_algorithm_can_support_constraints, spinnaker_route)
+
+logger = FormatAdapter(logging.getLogger(__name__))
+
+
+#: The most blocks sharing a route on a router that are looked at when
+#: choosing which block to pair with another
+_MAX_CANDIDATES = 32
+
+
+def _block_size(n_keys):
+    """ The size of the smallest aligned block holding a number of keys
+
+    :param int n_keys:
+    :rtype: int
+    """
+    return 1 << (max(n_keys, 1) - 1).bit_length()
+
+
+class _KeyBlock(object):
+    """ An aligned block of keys, holding either the keys of partitions\
+        which take the same route on every router, or two blocks of half\
+        the size (the second of which may be missing).
+    """
+
+    __slots__ = [
+        # The number of keys in the block
+        "size",
+
+        # The route on each router, by (x, y), of the entry covering the
+        # keys of the block, or None if no single entry can cover them
+        "routes",
+
+        # The partitions whose keys are in the block, each with the size of
+        # its keys, the largest first; or None if the block is split
+        "partitions",
+
+        # The two halves of the block, or None if it holds partitions
+        "halves",
+
+        # The first key of the block
+        "key"
+    ]
+
+    def __init__(self, size, routes, partitions=None, halves=None):
+        """
+        :param int size:
+        :param dict(tuple(int,int),int) routes:
+        :param partitions:
+        :type partitions: list(tuple(OutgoingEdgePartition,int)) or None
+        :param halves:
+        :type halves: tuple(_KeyBlock, _KeyBlock or None) or None
+        """
+        self.size = size
+        self.routes = routes
+        self.partitions = partitions
+        self.halves = halves
+        self.key = None
+
+
+class CompressionAwareRoutingInfoAllocator(object):
+    """ A routing key allocator which gives keys to partitions so that the\
+        routing tables they make are easy to compress.
+
+    Partitions whose entries have the same route on every router are given\
+    keys from one aligned block, so that a single entry on each router can\
+    cover them all.  Blocks of the same size are then paired up into\
+    blocks of twice the size, each with the block that takes the same\
+    route on the most routers, until one block holds all the keys.  On\
+    each router, the entries of a pair of blocks with the same route can\
+    then be merged into one, as can an entry with the keys of a block\
+    which does not go through the router at all.  The number of entries\
+    each table is expected to compress to is worked out from these merges\
+    as the blocks are paired, before any compression runs; as compressors\
+    such as :py:class:`PairCompressor` can also merge entries whose keys\
+    differ in more than one bit, tables usually end up shorter still.
+
+    Only :py:class:`ContiguousKeyRangeContraint` is supported, as all the\
+    keys of each partition are contiguous anyway.
+
+    :param MachineGraph machine_graph:
+        The graph to allocate the routing info for
+    :param AbstractMachinePartitionNKeysMap n_keys_map:
+        A map between the partitions and the number of keys they need
+    :param MulticastRoutingTableByPartition routing_tables:
+        The routes of the partitions
+    :param int target_length:
+        The length the tables should compress to, used only to report how\
+        many tables are expected to be too long
+    :return: The routing information, and the expected length of each\
+        compressed table by (x, y) of the chip
+    :rtype: tuple(RoutingInfo, dict(tuple(int,int),int))
+    :raise PacmanRouteInfoAllocationException:
+        If there are not enough keys for all the partitions
+    """
+
+    __slots__ = []
+
+    def __call__(self, machine_graph, n_keys_map, routing_tables,
+                 target_length=None):
+        """
+        :param MachineGraph machine_graph:
+        :param AbstractMachinePartitionNKeysMap n_keys_map:
+        :param MulticastRoutingTableByPartition routing_tables:
+        :param int target_length:
+        :rtype: tuple(RoutingInfo, dict(tuple(int,int),int))
+        :raise PacmanRouteInfoAllocationException:
+        """
+        check_algorithm_can_support_constraints(
+            constrained_vertices=machine_graph.outgoing_edge_partitions,
+            supported_constraints=[ContiguousKeyRangeContraint],
+            abstract_constraint_type=AbstractKeyAllocatorConstraint)
+        if target_length is None:
+            target_length = AbstractCompressor.MAX_SUPPORTED_LENGTH
+
+        blocks = self._group_partitions(
+            machine_graph, n_keys_map, routing_tables)
+        routing_infos = RoutingInfo()
+        estimates = defaultdict(int)
+        if not blocks:
+            return routing_infos, dict(estimates)
+
+        root = self._pair_all_blocks(blocks, estimates)
+        if root.size > 1 << BITS_IN_KEY:
+            raise PacmanRouteInfoAllocationException(
+                "The partitions need {} keys once aligned, which is more "
+                "than the {} available".format(root.size, 1 << BITS_IN_KEY))
+
+        progress = ProgressBar(len(blocks), "Allocating routing keys")
+        for block in progress.over(self._assign_keys(root)):
+            key = block.key
+            for partition, size in block.partitions:
+                routing_infos.add_partition_info(PartitionRoutingInfo(
+                    [BaseKeyAndMask(key, FULL_MASK - (size - 1))], partition))
+                key += size
+
+        too_long = sum(
+            1 for length in estimates.values() if length > target_length)
+        if too_long:
+            logger.warning(
+                "{} of {} routing tables are expected to compress to more "
+                "than {} entries", too_long, len(estimates), target_length)
+        return routing_infos, dict(estimates)
+
+    @staticmethod
+    def _group_partitions(machine_graph, n_keys_map, routing_tables):
+        """ Make a block for each set of multicast partitions which take the\
+            same route on every router
+
+        :param MachineGraph machine_graph:
+        :param AbstractMachinePartitionNKeysMap n_keys_map:
+        :param MulticastRoutingTableByPartition routing_tables:
+        :rtype: list(_KeyBlock)
+        """
+        routes = defaultdict(list)
+        for x, y in sorted(routing_tables.get_routers()):
+            for partition, entry in routing_tables.get_entries_for_router(
+                    x, y).items():
+                routes[partition].append(((x, y), spinnaker_route(
+                    entry.link_ids, entry.processor_ids)))
+
+        by_signature = OrderedDict()
+        for partition in machine_graph.outgoing_edge_partitions:
+            if partition.traffic_type != EdgeTrafficType.MULTICAST:
+                continue
+            signature = tuple(routes.get(partition, ()))
+            by_signature.setdefault(signature, list()).append((
+                partition,
+                _block_size(n_keys_map.n_keys_for_partition(partition))))
+
+        blocks = list()
+        for signature, partitions in by_signature.items():
+            partitions.sort(key=lambda partition: -partition[1])
+            blocks.append(_KeyBlock(
+                _block_size(sum(size for _, size in partitions)),
+                dict(signature), partitions=partitions))
+        return blocks
+
+    @classmethod
+    def _pair_all_blocks(cls, blocks, estimates):
+        """ Pair up blocks of the same size, smallest first, until there is\
+            only one block
+
+        :param list(_KeyBlock) blocks:
+        :param dict(tuple(int,int),int) estimates:
+            The number of entries on each router which cannot be merged any\
+            more, which is added to
+        :return: The block holding all the others
+        :rtype: _KeyBlock
+        """
+        by_size = defaultdict(list)
+        for block in blocks:
+            by_size[block.size].append(block)
+        while True:
+            size = min(by_size)
+            same_size = by_size.pop(size)
+            if not by_size and len(same_size) == 1:
+                break
+            by_size[size << 1].extend(cls._pair_blocks(same_size, estimates))
+
+        # What is left of each table can be covered by one entry per route
+        root = same_size[0]
+        for router, route in root.routes.items():
+            if route is not None:
+                estimates[router] += 1
+        return root
+
+    @classmethod
+    def _pair_blocks(cls, blocks, estimates):
+        """ Pair each block with the block of the same size which takes the\
+            same route on the most routers, or failing that the next block
+
+        :param list(_KeyBlock) blocks: The blocks, all of the same size
+        :param dict(tuple(int,int),int) estimates:
+        :return: The blocks of twice the size
+        :rtype: list(_KeyBlock)
+        """
+        # The blocks by each router and route they take
+        by_route = defaultdict(list)
+        for index, block in enumerate(blocks):
+            for item in block.routes.items():
+                if item[1] is not None:
+                    by_route[item].append(index)
+
+        paired = [False] * len(blocks)
+        next_unpaired = 0
+        pairs = list()
+        for index, block in enumerate(blocks):
+            if paired[index]:
+                continue
+            paired[index] = True
+
+            # Count the routers on which each other block has the same route
+            shared = defaultdict(int)
+            for item in block.routes.items():
+                if item[1] is None:
+                    continue
+                candidates = by_route[item]
+                while candidates and paired[candidates[-1]]:
+                    candidates.pop()
+                n_candidates = 0
+                for other in reversed(candidates):
+                    if not paired[other]:
+                        shared[other] += 1
+                        n_candidates += 1
+                        if n_candidates == _MAX_CANDIDATES:
+                            break
+
+            if shared:
+                partner = max(
+                    shared, key=lambda other: (shared[other], -other))
+            else:
+                while next_unpaired < len(blocks) and paired[next_unpaired]:
+                    next_unpaired += 1
+                partner = (
+                    next_unpaired if next_unpaired < len(blocks) else None)
+            if partner is None:
+                pairs.append(_KeyBlock(
+                    block.size << 1, block.routes, halves=(block, None)))
+            else:
+                paired[partner] = True
+                pairs.append(cls._merge(block, blocks[partner], estimates))
+        return pairs
+
+    @staticmethod
+    def _merge(low, high, estimates):
+        """ Make a block of two blocks of the same size
+
+        :param _KeyBlock low: The block with the lower keys
+        :param _KeyBlock high: The block with the higher keys
+        :param dict(tuple(int,int),int) estimates:
+        :rtype: _KeyBlock
+        """
+        # Add the routes of the block on fewer routers to those of the other
+        small, large = sorted((low, high), key=lambda b: len(b.routes))
+        routes = large.routes
+        for router, route in small.routes.items():
+            if router not in routes:
+                routes[router] = route
+            elif routes[router] != route:
+                # Neither entry can be merged with anything any more
+                estimates[router] += (
+                    (route is not None) + (routes[router] is not None))
+                routes[router] = None
+        small.routes = None
+        large.routes = None
+        return _KeyBlock(low.size << 1, routes, halves=(low, high))
+
+    @staticmethod
+    def _assign_keys(root):
+        """ Give each block the first key of its keys
+
+        :param _KeyBlock root: The block holding all the others
+        :return: The blocks holding partitions
+        :rtype: list(_KeyBlock)
+        """
+        root.key = 0
+        leaves = list()
+        blocks = [root]
+        while blocks:
+            block = blocks.pop()
+            if block.halves is None:
+                leaves.append(block)
+                continue
+            low, high = block.halves
+            low.key = block.key
+            blocks.append(low)
+            if high is not None:
+                high.key = block.key + (block.size >> 1)
+                blocks.append(high)
+        return leaves
@@ -296,33 +296,7 @@ class MallocBasedRoutingInfoAllocator(ElementAllocatorAlgorithm):
             logger.debug("Trying mask {} for {} keys",
                          hex(mask), partition_n_keys)
 
-            key_found = None
-            key_generator = KeyFieldGenerator(
-                mask, fields, self._free_space_tracker)
-            for key in key_generator:
-                logger.debug("Trying key {}", hex(key))
-
-                # Check if all the key ranges can be allocated
-                matched_all = True
-                index = 0
-                for (base_key, n_keys) in self._get_key_ranges(key, mask):
-                    logger.debug("Finding slot for {}, n_keys={}",
-                                 hex(base_key), n_keys)
-                    index = self._find_slot(base_key, lo=index)
-                    logger.debug("Slot for {} is {}", hex(base_key), index)
-                    if index is None:
-                        matched_all = False
-                        break
-                    space = self._check_allocation(index, base_key, n_keys)
-                    logger.debug("Space for {} is {}", hex(base_key), space)
-                    if space is None:
-                        matched_all = False
-                        break
-
-                if matched_all:
-                    logger.debug("Matched key {}", hex(key))
-                    key_found = key
-                    break
+            key_found = self._find_key(mask, fields)
 
             # If we found a matching key, store the mask that worked
             if key_found is not None:
@@ -341,3 +315,44 @@ class MallocBasedRoutingInfoAllocator(ElementAllocatorAlgorithm):
 
         raise PacmanRouteInfoAllocationException(
             "Could not find space to allocate keys")
+
+    def _find_key(self, mask, fields):
+        """ Find the first key with a given mask whose keys are all free
+
+        :param int mask: The mask of the keys
+        :param fields:
+        :type fields: iterable(Field) or None
+        :rtype: int or None
+        """
+        # If the keys of the mask are a single aligned range, the first
+        # free range of that size is the key that would be found first
+        n_mask_keys = (~mask & 0xFFFFFFFF) + 1
+        if not fields and n_mask_keys & (n_mask_keys - 1) == 0:
+            return self._find_aligned_space(n_mask_keys)
+
+        key_generator = KeyFieldGenerator(
+            mask, fields, self._free_space_tracker)
+        for key in key_generator:
+            logger.debug("Trying key {}", hex(key))
+
+            # Check if all the key ranges can be allocated
+            matched_all = True
+            index = 0
+            for (base_key, n_keys) in self._get_key_ranges(key, mask):
+                logger.debug("Finding slot for {}, n_keys={}",
+                             hex(base_key), n_keys)
+                index = self._find_slot(base_key, lo=index)
+                logger.debug("Slot for {} is {}", hex(base_key), index)
+                if index is None:
+                    matched_all = False
+                    break
+                space = self._check_allocation(index, base_key, n_keys)
+                logger.debug("Space for {} is {}", hex(base_key), space)
+                if space is None:
+                    matched_all = False
+                    break
+
+            if matched_all:
+                logger.debug("Matched key {}", hex(key))
+                return key
+        return None
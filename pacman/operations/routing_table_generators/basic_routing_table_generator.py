@@ -14,9 +14,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from spinn_utilities.progress_bar import ProgressBar
-from spinn_machine import MulticastRoutingEntry
 from pacman.model.routing_tables import (
-    UnCompressedMulticastRoutingTable, MulticastRoutingTables)
+    ArrayMulticastRoutingTable, MulticastRoutingTables)
+from pacman.utilities.utility_calls import spinnaker_route
 
 
 class BasicRoutingTableGenerator(object):
@@ -57,23 +57,18 @@ class BasicRoutingTableGenerator(object):
         :param RoutingInfo routing_infos:
         :rtype: MulticastRoutingTable
         """
-        table = UnCompressedMulticastRoutingTable(chip.x, chip.y)
+        keys = list()
+        masks = list()
+        routes = list()
+        defaultable = list()
         for partition in partitions_in_table:
             r_info = routing_infos.get_routing_info_from_partition(partition)
             entry = partitions_in_table[partition]
+            route = spinnaker_route(entry.link_ids, entry.processor_ids)
             for key_and_mask in r_info.keys_and_masks:
-                table.add_multicast_routing_entry(
-                    self.__create_entry(key_and_mask, entry))
-        return table
-
-    @staticmethod
-    def __create_entry(key_and_mask, entry):
-        """
-        :param BaseKeyAndMask key_and_mask:
-        :param MulticastRoutingTableByPartitionEntry entry:
-        :rtype: MulticastRoutingEntry
-        """
-        return MulticastRoutingEntry(
-            routing_entry_key=key_and_mask.key_combo,
-            defaultable=entry.defaultable, mask=key_and_mask.mask,
-            link_ids=entry.link_ids, processor_ids=entry.processor_ids)
+                keys.append(key_and_mask.key_combo)
+                masks.append(key_and_mask.mask)
+                routes.append(route)
+                defaultable.append(entry.defaultable)
+        return ArrayMulticastRoutingTable(
+            chip.x, chip.y, keys, masks, routes, defaultable)
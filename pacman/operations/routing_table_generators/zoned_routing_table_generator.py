@@ -15,9 +15,9 @@
 
 from spinn_utilities.progress_bar import ProgressBar
 from spinn_utilities.default_ordered_dict import DefaultOrderedDict
-from spinn_machine import MulticastRoutingEntry
 from pacman.model.routing_tables import (
-    UnCompressedMulticastRoutingTable, MulticastRoutingTables)
+    ArrayMulticastRoutingTable, MulticastRoutingTables)
+from pacman.utilities.utility_calls import spinnaker_route
 
 
 class SharedEntry(object):
@@ -87,7 +87,8 @@ class ZonedRoutingTableGenerator(object):
         :param dict(ApplicationVertex,BaseKeyAndMask) info_by_app_vertex:
         :rtype: MulticastRoutingTable
         """
-        table = UnCompressedMulticastRoutingTable(chip.x, chip.y)
+        # The key, mask, route and defaultable flag of each entry
+        table = list()
         partitions_by_app_vertex = DefaultOrderedDict(set)
         for partition in partitions_in_table:
             partitions_by_app_vertex[partition.pre_vertex.app_vertex].add(
@@ -105,7 +106,7 @@ class ZonedRoutingTableGenerator(object):
             else:
                 self.__add_key_and_mask(
                     info_by_app_vertex[app_vertex], shared_entry, table)
-        return table
+        return ArrayMulticastRoutingTable(chip.x, chip.y, *zip(*table))
 
     def _find_shared_entry(self, partitions, partitions_in_table):
         """
@@ -136,7 +137,8 @@ class ZonedRoutingTableGenerator(object):
         :param partitions_in_table:
         :type partitions_in_table:
             dict(OutgoingEdgePartition, MulticastRoutingTableByPartitionEntry)
-        :param MulticastRoutingTable table:
+        :param list(tuple(int,int,int,bool)) table:
+            The entries of the table being made
         """
         for partition in partitions:
             r_info = routing_infos.get_routing_info_from_partition(partition)
@@ -148,11 +150,12 @@ class ZonedRoutingTableGenerator(object):
     def __add_key_and_mask(key_and_mask, entry, table):
         """
         :param BaseKeyAndMask key_and_mask:
-        :param MulticastRoutingTableByPartitionEntry entry:
-        :param MulticastRoutingTable table:
+        :param entry:
+        :type entry: MulticastRoutingTableByPartitionEntry or SharedEntry
+        :param list(tuple(int,int,int,bool)) table:
+            The entries of the table being made
         """
-        table.add_multicast_routing_entry(MulticastRoutingEntry(
-            routing_entry_key=key_and_mask.key_combo,
-            defaultable=entry.defaultable, mask=key_and_mask.mask,
-            link_ids=entry.link_ids,
-            processor_ids=entry.processor_ids))
+        route = spinnaker_route(entry.link_ids, entry.processor_ids)
+        table.append((
+            key_and_mask.key_combo, key_and_mask.mask, route,
+            entry.defaultable))
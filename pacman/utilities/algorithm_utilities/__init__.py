@@ -14,5 +14,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .element_allocator_algorithm import ElementAllocatorAlgorithm
+from .machine_topology import MachineTopology
 
-__all__ = ["ElementAllocatorAlgorithm"]
+__all__ = ["ElementAllocatorAlgorithm", "MachineTopology"]
@@ -13,8 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import math
 from six import add_metaclass
+from sortedcollections import SortedList
 from spinn_utilities.abstract_base import AbstractBase
 from pacman.model.resources import ElementFreeSpace
 from pacman.exceptions import PacmanElementAllocationException
@@ -27,8 +27,12 @@ class ElementAllocatorAlgorithm(object):
     """
 
     __slots__ = [
-        # the space object for memory allocation
-        "_free_space_tracker"
+        # the space object for memory allocation, sorted by start address
+        "_free_space_tracker",
+
+        # for each number of elements looked for by _find_aligned_space, the
+        # start address of the first free space that might hold them
+        "_aligned_space_hints"
     ]
 
     def __init__(self, size_begin, size_end):
@@ -36,8 +40,10 @@ class ElementAllocatorAlgorithm(object):
         :param int size_begin:
         :param int size_end:
         """
-        self._free_space_tracker = list()
-        self._free_space_tracker.append(ElementFreeSpace(size_begin, size_end))
+        self._free_space_tracker = SortedList(
+            [ElementFreeSpace(size_begin, size_end)],
+            key=_start_address)
+        self._aligned_space_hints = dict()
 
     def _allocate_elements(self, base_element_id, n_elements):
         """ Handle the allocating of space for a given set of elements
@@ -58,28 +64,46 @@ class ElementAllocatorAlgorithm(object):
         self.__do_allocation(index, base_element_id, n_elements)
 
     def _find_slot(self, base_element_id, lo=0):
-        """ Find the free slot with the closest
-            base element ID  <= base element using a binary search
+        """ Find the free slot with the closest\
+            base element ID <= base element using a binary search
 
         :param int base_element_id:
         :param int lo:
         :rtype: int or None
         """
-        hi = len(self._free_space_tracker) - 1
-        while lo < hi:
-            mid = int(math.ceil(float(lo + hi) / 2.0))
-            free_space_slot = self._free_space_tracker[mid]
-
-            if free_space_slot.start_address > base_element_id:
-                hi = mid - 1
-            else:
-                lo = mid
-
-        # If we have gone off the end of the array, we haven't found a slot
-        if (lo >= len(self._free_space_tracker) or hi < 0 or
-                self._free_space_tracker[lo].start_address > base_element_id):
+        index = self._free_space_tracker.bisect_key_right(base_element_id) - 1
+        if index < lo:
             return None
-        return lo
+        return index
+
+    def _find_aligned_space(self, n_elements):
+        """ Find the first free block of elements of a given size that\
+            starts at a multiple of that size
+
+        As free space is only ever taken away, no block of a given size can\
+        be found in a space that had none before, so each search starts\
+        from where the last search for that size found its block.
+
+        :param int n_elements: The number of elements; must be a power of 2
+        :return: The first element ID of the block, or None if there is no\
+            such block
+        :rtype: int or None
+        """
+        tracker = self._free_space_tracker
+        index = self._find_slot(self._aligned_space_hints.get(n_elements, 0))
+        if index is None:
+            index = 0
+        for free_space_slot in tracker.islice(index):
+            base_element_id = -(-free_space_slot.start_address //
+                                n_elements) * n_elements
+            if (base_element_id + n_elements <=
+                    free_space_slot.start_address + free_space_slot.size):
+                self._aligned_space_hints[n_elements] = \
+                    free_space_slot.start_address
+                return base_element_id
+        if tracker:
+            self._aligned_space_hints[n_elements] = tracker[-1].start_address
+        return None
 
     def __do_allocation(self, index, base_element_id, n_elements):
         """ Allocate a given base element ID and number of elements into the\
@@ -105,35 +129,16 @@ class ElementAllocatorAlgorithm(object):
                 "Not enough space to allocate {} elements starting at {}"
                 .format(n_elements, hex(base_element_id)))
 
-        if (free_space_slot.start_address == base_element_id and
-                free_space_slot.size == n_elements):
-            # If the slot exactly matches the space, remove it
-            del self._free_space_tracker[index]
-
-        elif free_space_slot.start_address == base_element_id:
-            # If the slot starts with the element ID, reduce the size
-            self._free_space_tracker[index] = ElementFreeSpace(
-                free_space_slot.start_address + n_elements,
-                free_space_slot.size - n_elements)
-
-        elif space == n_elements:
-            # If the space at the end exactly matches the spot, reduce the size
-            self._free_space_tracker[index] = ElementFreeSpace(
-                free_space_slot.start_address,
-                free_space_slot.size - n_elements)
-
-        else:
-            # Otherwise, the allocation lies in the middle of the region:
-            # First, reduce the size of the space before the allocation
-            self._free_space_tracker[index] = ElementFreeSpace(
+        # The slot is replaced by what is left of it either side of the
+        # allocation
+        del self._free_space_tracker[index]
+        if free_space_slot.start_address < base_element_id:
+            self._free_space_tracker.add(ElementFreeSpace(
                 free_space_slot.start_address,
-                base_element_id - free_space_slot.start_address)
-
-            # Then add a new space after the allocation
-            self._free_space_tracker.insert(index + 1, ElementFreeSpace(
-                base_element_id + n_elements,
-                free_space_slot.start_address + free_space_slot.size -
-                (base_element_id + n_elements)))
+                base_element_id - free_space_slot.start_address))
+        if space > n_elements:
+            self._free_space_tracker.add(ElementFreeSpace(
+                base_element_id + n_elements, space - n_elements))
 
     def _check_allocation(self, index, base_element_id, n_elements):
         """ Check if there is enough space for a given set of element IDs\
@@ -159,3 +164,12 @@ class ElementAllocatorAlgorithm(object):
         if space < n_elements:
             return None
         return space
+
+
+def _start_address(free_space_slot):
+    """ The key by which free space is sorted
+
+    :param ElementFreeSpace free_space_slot:
+    :rtype: int
+    """
+    return free_space_slot.start_address
@@ -0,0 +1,212 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+import weakref
+import numpy
+
+#: The dimensions which wrap around for each type of machine, as given by
+#: :py:attr:`~spinn_machine.Machine.wrap`
+_WRAPS = {
+    "NoWrap": (False, False),
+    "HorWrap": (True, False),
+    "VerWrap": (False, True),
+    "Wrapped": (True, True)
+}
+
+
+class MachineTopology(object):
+    """ The coordinates of the chips of a machine as an array, with the\
+        wrap-around aware shortest vectors between chips worked out for\
+        whole arrays of chips at once.
+
+    The vectors and lengths are those of\
+    :py:meth:`~spinn_machine.Machine.get_vector` and\
+    :py:meth:`~spinn_machine.Machine.get_vector_length`, including which of\
+    several equally short vectors is chosen.  Use :py:meth:`of` to get the\
+    topology of a machine, which is only worked out again if chips are added\
+    to the machine.
+    """
+
+    __slots__ = [
+        # The width of the machine, which x coordinates wrap around
+        "_width",
+
+        # The height of the machine, which y coordinates wrap around
+        "_height",
+
+        # Whether the x coordinates wrap around
+        "_wrap_x",
+
+        # Whether the y coordinates wrap around
+        "_wrap_y",
+
+        # Array of (x, y) coordinates of the chips, in machine order
+        "_coordinates",
+
+        # The index of each chip in the coordinates array, by (x, y)
+        "_ids"
+    ]
+
+    #: The topology of each machine seen, indexed by machine
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, machine):
+        """
+        :param ~spinn_machine.Machine machine: The machine to describe
+        """
+        self._width = machine.width
+        self._height = machine.height
+        self._wrap_x, self._wrap_y = _WRAPS[machine.wrap]
+        keys = [(chip.x, chip.y) for chip in machine.chips]
+        self._coordinates = self.coordinates_of(keys)
+        self._ids = {key: index for index, key in enumerate(keys)}
+
+    @classmethod
+    def of(cls, machine):
+        """ Get the topology of a machine, reusing the one made before if\
+            the machine has the same chips
+
+        :param ~spinn_machine.Machine machine:
+        :rtype: MachineTopology
+        """
+        topology = cls._cache.get(machine)
+        if topology is None or len(topology._ids) != machine.n_chips:
+            topology = cls(machine)
+            cls._cache[machine] = topology
+        return topology
+
+    @property
+    def coordinates(self):
+        """ The (x, y) coordinates of the chips, in the order of the machine
+
+        :rtype: ~numpy.ndarray
+        """
+        return self._coordinates
+
+    @property
+    def ids(self):
+        """ The index of each chip in :py:attr:`coordinates`, by (x, y)
+
+        :rtype: dict(tuple(int,int),int)
+        """
+        return self._ids
+
+    @staticmethod
+    def _lengths(x, y):
+        """ The lengths of (x, y, 0) vectors
+
+        :param ~numpy.ndarray x:
+        :param ~numpy.ndarray y:
+        :rtype: ~numpy.ndarray
+        """
+        # Where x and y have the same sign, a z step can replace an x step
+        # and a y step, so the length is the larger; otherwise it is the sum
+        return numpy.where(
+            (x > 0) == (y > 0),
+            numpy.maximum(numpy.abs(x), numpy.abs(y)),
+            numpy.abs(x) + numpy.abs(y))
+
+    def _options(self, sources, destinations):
+        """ The candidate (x, y) vectors between chips, in the order that\
+            the machine prefers them when they are the same length
+
+        :param ~numpy.ndarray sources: (x, y) coordinates of sources
+        :param ~numpy.ndarray destinations: (x, y) coordinates of destinations
+        :return: (x, y) pairs of arrays, one pair for each option
+        :rtype: list(tuple(~numpy.ndarray, ~numpy.ndarray))
+        """
+        sources = numpy.asarray(sources)
+        destinations = numpy.asarray(destinations)
+        x = destinations[..., 0] - sources[..., 0]
+        y = destinations[..., 1] - sources[..., 1]
+        if self._wrap_x:
+            x_up = x % self._width
+            x_options = [x_up, x_up - self._width]
+        else:
+            x_options = [x]
+        if self._wrap_y:
+            y_up = y % self._height
+            y_options = [y_up, y_up - self._height]
+        else:
+            y_options = [y]
+
+        # Fully wrapped machines keep the first of the shortest of (up, up),
+        # (down, up), (up, down), (down, down); partly wrapped ones only
+        # choose up when it is strictly shorter than down
+        if self._wrap_x and self._wrap_y:
+            return [(x_options[0], y_options[0]),
+                    (x_options[1], y_options[0]),
+                    (x_options[0], y_options[1]),
+                    (x_options[1], y_options[1])]
+        return [(x_option, y_option)
+                for x_option in reversed(x_options)
+                for y_option in reversed(y_options)]
+
+    @staticmethod
+    def coordinates_of(keys):
+        """ Convert (x, y) coordinates into an array
+
+        :param list(tuple(int,int)) keys: The coordinates
+        :return: An array of shape (len(keys), 2)
+        :rtype: ~numpy.ndarray
+        """
+        return numpy.fromiter(
+            itertools.chain.from_iterable(keys), dtype=numpy.int64,
+            count=2 * len(keys)).reshape((len(keys), 2))
+
+    def vector_lengths(self, sources, destinations):
+        """ Get the lengths of the shortest vectors between chips
+
+        :param sources: (x, y) coordinates of the sources; the last axis\
+            holds x and y, and the others broadcast against destinations
+        :type sources: ~numpy.ndarray or tuple(int,int)
+        :param destinations: (x, y) coordinates of the destinations
+        :type destinations: ~numpy.ndarray or tuple(int,int)
+        :return: The number of hops from each source to each destination
+        :rtype: ~numpy.ndarray
+        """
+        options = self._options(sources, destinations)
+        lengths = self._lengths(*options[0])
+        for x, y in options[1:]:
+            numpy.minimum(lengths, self._lengths(x, y), out=lengths)
+        return lengths
+
+    def vectors(self, sources, destinations):
+        """ Get the shortest vectors between chips
+
+        :param sources: (x, y) coordinates of the sources; the last axis\
+            holds x and y, and the others broadcast against destinations
+        :type sources: ~numpy.ndarray or tuple(int,int)
+        :param destinations: (x, y) coordinates of the destinations
+        :type destinations: ~numpy.ndarray or tuple(int,int)
+        :return: The minimal (x, y, z) vectors, with x, y and z in the last\
+            axis
+        :rtype: ~numpy.ndarray
+        """
+        options = self._options(sources, destinations)
+        x = numpy.array([option[0] for option in options])
+        y = numpy.array([option[1] for option in options])
+        best = numpy.argmin(self._lengths(x, y), axis=0)
+        x = numpy.choose(best, x)
+        y = numpy.choose(best, y)
+
+        # Minimise by adding or taking away (1, 1, 1) so that at most two
+        # of x, y and z are not zero
+        same_sign = (x > 0) == (y > 0)
+        keep_y = same_sign & ((x > y) != (x > 0))
+        keep_x = same_sign & ~keep_y
+        shift = numpy.where(keep_x, y, numpy.where(keep_y, x, 0))
+        return numpy.stack([x - shift, y - shift, -shift], axis=-1)
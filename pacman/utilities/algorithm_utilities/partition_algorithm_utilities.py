@@ -20,6 +20,7 @@ from spinn_utilities.progress_bar import ProgressBar
 from spinn_utilities.ordered_set import OrderedSet
 from pacman.utilities import utility_calls as utils
 from pacman.exceptions import PacmanPartitionException
+from pacman.model.graphs.machine import ImplicitMachineEdgePartition
 from pacman.model.constraints.partitioner_constraints import (
     AbstractPartitionerConstraint, SameAtomsAsVertexConstraint,
     MaxVertexAtomsConstraint, FixedVertexAtomsConstraint)
@@ -52,12 +53,17 @@ def determine_max_atoms_for_vertex(vertex):
         return vertex.n_atoms
 
 
-def generate_machine_edges(machine_graph, application_graph):
+def generate_machine_edges(machine_graph, application_graph, implicit=False):
     """ Generate the machine edges for the vertices in the graph
 
     :param MachineGraph machine_graph: the machine graph to add edges to
     :param ApplicationGraph application_graph:
         the application graph to work with
+    :param bool implicit:
+        Whether to add an\
+        :py:class:`~pacman.model.graphs.machine.ImplicitMachineEdgePartition`\
+        for each machine vertex and application partition instead of the\
+        edges themselves, so that the edges are only made when asked for
     """
 
     # start progress bar
@@ -72,6 +78,12 @@ def generate_machine_edges(machine_graph, application_graph):
         application_outgoing_partitions = application_graph.\
             get_outgoing_edge_partitions_starting_at_vertex(vertex)
         for application_partition in application_outgoing_partitions:
+            if implicit:
+                machine_graph.add_outgoing_edge_partition(
+                    ImplicitMachineEdgePartition(
+                        source_vertex, application_partition))
+                continue
+
             for edge in application_partition.edges:
                 # create new partitions
                 for dest_vertex in edge.post_vertex.machine_vertices:
@@ -81,12 +93,13 @@ def generate_machine_edges(machine_graph, application_graph):
                     machine_graph.add_edge(
                         machine_edge, application_partition.identifier)
 
-                    # add constraints from the application partition
-                    machine_partition = machine_graph.\
-                        get_outgoing_edge_partition_starting_at_vertex(
-                            source_vertex, application_partition.identifier)
-                    machine_partition.add_constraints(
-                        application_partition.constraints)
+            # add constraints from the application partition
+            machine_partition = machine_graph.\
+                get_outgoing_edge_partition_starting_at_vertex(
+                    source_vertex, application_partition.identifier)
+            if machine_partition is not None:
+                machine_partition.add_constraints(
+                    application_partition.constraints)
 
 
 def get_remaining_constraints(vertex):
@@ -15,6 +15,7 @@
 
 import hashlib
 import numpy
+from spinn_machine import Router
 from pacman.exceptions import (
     PacmanInvalidParameterException, PacmanValueError)
 
@@ -142,6 +143,36 @@ def compress_bits_from_bit_array(bit_array, bit_positions):
     return compress_from_bit_array(expanded_value)
 
 
+def spinnaker_route(link_ids, processor_ids):
+    """ Get the route of a routing entry in the form used by the machine,\
+        as given by\
+        :py:attr:`~spinn_machine.MulticastRoutingEntry.spinnaker_route`,\
+        without making the entry
+
+    :param iterable(int) link_ids: The links the route goes down
+    :param iterable(int) processor_ids: The processors the route goes to
+    :rtype: int
+    :raise PacmanInvalidParameterException:
+        If a link or processor ID is out of range
+    """
+    route = 0
+    for processor_id in processor_ids:
+        if not 0 <= processor_id < Router.MAX_CORES_PER_ROUTER:
+            raise PacmanInvalidParameterException(
+                "processor_ids", str(processor_ids),
+                "Processor IDs must be between 0 and {}".format(
+                    Router.MAX_CORES_PER_ROUTER - 1))
+        route |= 1 << (Router.MAX_LINKS_PER_ROUTER + processor_id)
+    for link_id in link_ids:
+        if not 0 <= link_id < Router.MAX_LINKS_PER_ROUTER:
+            raise PacmanInvalidParameterException(
+                "link_ids", str(link_ids),
+                "Link IDs must be between 0 and {}".format(
+                    Router.MAX_LINKS_PER_ROUTER - 1))
+        route |= 1 << link_id
+    return route
+
+
 def is_equal_or_None(a, b):
     """ If a and b are both not None, return True iff they are equal,\
         otherwise return True
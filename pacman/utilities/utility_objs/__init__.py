@@ -13,7 +13,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from .array_resource_tracker import ArrayResourceTracker
+from .chip_capacity_index import ChipCapacityIndex, ChipSelection
 from .field import Field
 from .resource_tracker import ResourceTracker
 
-__all__ = ["Field", "ResourceTracker"]
+__all__ = ["ArrayResourceTracker", "ChipCapacityIndex", "ChipSelection",
+           "Field", "ResourceTracker"]
@@ -0,0 +1,223 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+from spinn_utilities.overrides import overrides
+from pacman.exceptions import PacmanValueError
+from .chip_capacity_index import ChipSelection
+from .resource_tracker import ResourceTracker
+
+#: The number of cores held in each word of a core bitmask
+_BITS_PER_WORD = 32
+#: A word of a core bitmask with every bit set
+_ALL_BITS = 0xFFFFFFFF
+
+
+class ArrayResourceTracker(ResourceTracker):
+    """ Tracks the usage of resources of a machine, keeping the free SDRAM\
+        and free cores of the chips in NumPy arrays indexed by a dense chip\
+        ID.
+
+    The free cores of each chip are a bitmask of one or more 32-bit words,\
+    so choosing a core is a bit scan, and questions about many chips at\
+    once, such as which chips of a board are usable, are answered with\
+    array operations.  The behaviour is otherwise that of\
+    :py:class:`ResourceTracker`.
+    """
+
+    __slots__ = [
+        # The dense ID of each chip, indexed by (x, y) tuple of coordinates
+        "_chip_ids",
+
+        # The (x, y) tuple of coordinates of each chip, indexed by ID
+        "_chip_keys",
+
+        # The SDRAM available on each chip, indexed by ID
+        "_sdram",
+
+        # Bitmask of the processor IDs available on each chip, as an array of
+        # (chip ID, word) where bit b of word w is processor 32 * w + b
+        "_free_cores",
+
+        # The number of bits set in the bitmask of each chip, indexed by ID
+        "_n_free",
+
+        # The number of cores preallocated on each chip, indexed by ID
+        "_n_preallocated",
+
+        # Array of IDs of the chips on each board, indexed by board address
+        "_board_chip_ids"
+    ]
+
+    def __init__(self, machine, plan_n_timesteps, chips=None,
+                 preallocated_resources=None,
+                 chip_selection=ChipSelection.ORDERED):
+        """
+        :param ~spinn_machine.Machine machine:
+            The machine to track the usage of
+        :param int plan_n_timesteps: number of timesteps to plan for
+        :param chips: If specified, this list of chips will be used instead\
+            of the list from the machine; see :py:class:`ResourceTracker`
+        :type chips: iterable(tuple(int, int)) or None
+        :param preallocated_resources:
+        :type preallocated_resources: PreAllocatedResourceContainer or None
+        :param ChipSelection chip_selection:
+            How to choose the chip for an unrestricted allocation; see\
+            :py:class:`ResourceTracker`
+        """
+        super(ArrayResourceTracker, self).__init__(
+            machine, plan_n_timesteps, chips, preallocated_resources,
+            chip_selection)
+        self._n_preallocated = numpy.zeros(len(self._chip_keys), numpy.int32)
+        for key, n_cores in self._n_cores_preallocated.items():
+            if key in self._chip_ids:
+                self._n_preallocated[self._chip_ids[key]] = n_cores
+        self._board_chip_ids = dict()
+
+    @overrides(ResourceTracker._init_chip_state)
+    def _init_chip_state(self, machine):
+        chips = list(machine.chips)
+        self._chip_keys = [(chip.x, chip.y) for chip in chips]
+        self._chip_ids = {
+            key: chip_id for chip_id, key in enumerate(self._chip_keys)}
+        self._sdram = numpy.array(
+            [chip.sdram.size for chip in chips], dtype=numpy.int64)
+
+        n_words = 1
+        for chip in chips:
+            for processor in chip.processors:
+                n_words = max(
+                    n_words, processor.processor_id // _BITS_PER_WORD + 1)
+        self._free_cores = numpy.zeros((len(chips), n_words), numpy.uint32)
+        self._n_free = numpy.zeros(len(chips), numpy.int32)
+        for chip_id, chip in enumerate(chips):
+            for processor in chip.processors:
+                if not processor.is_monitor:
+                    word, bit = divmod(processor.processor_id, _BITS_PER_WORD)
+                    self._free_cores[chip_id, word] |= numpy.uint32(1 << bit)
+            self._n_free[chip_id] = chip.n_user_processors
+
+    def _lowest_free_core(self, chip_id):
+        """ Find the lowest numbered free core of a chip by a bit scan
+
+        :param int chip_id: The ID of the chip
+        :return: The processor ID, or None if no core is free
+        :rtype: int or None
+        """
+        for word_index, word in enumerate(self._free_cores[chip_id]):
+            if word:
+                word = int(word)
+                bit = (word & -word).bit_length() - 1
+                return word_index * _BITS_PER_WORD + bit
+        return None
+
+    def _ids_of(self, keys):
+        """ Get the IDs of some chips
+
+        :param iterable(tuple(int,int)) keys: The coordinates of the chips
+        :rtype: ~numpy.ndarray
+        """
+        return numpy.fromiter(
+            (self._chip_ids[key] for key in keys), dtype=numpy.intp)
+
+    @overrides(ResourceTracker._chip_available)
+    def _chip_available(self, x, y):
+        chip_id = self._chip_ids.get((x, y))
+        return (chip_id is not None and
+                self._n_free[chip_id] > self._n_preallocated[chip_id])
+
+    @overrides(ResourceTracker._usable_chips_on_board)
+    def _usable_chips_on_board(self, eth_chip):
+        board = eth_chip.ip_address
+        if board not in self._board_chip_ids:
+            self._board_chip_ids[board] = self._ids_of(
+                self._machine.get_existing_xys_on_board(eth_chip))
+        ids = self._board_chip_ids[board]
+        usable = ids[self._n_free[ids] > self._n_preallocated[ids]]
+        return [self._chip_keys[chip_id] for chip_id in usable]
+
+    @overrides(ResourceTracker._sdram_available)
+    def _sdram_available(self, chip):
+        return int(self._sdram[self._chip_ids[chip.x, chip.y]])
+
+    @overrides(ResourceTracker._change_sdram)
+    def _change_sdram(self, key, amount):
+        self._sdram[self._chip_ids[key]] += amount
+
+    @overrides(ResourceTracker._best_core_available)
+    def _best_core_available(self, chip):
+        return self._lowest_free_core(self._chip_ids[chip.x, chip.y])
+
+    @overrides(ResourceTracker._n_free_cores)
+    def _n_free_cores(self, chip, key):
+        return int(self._n_free[self._chip_ids[key]])
+
+    @overrides(ResourceTracker._is_core_free)
+    def _is_core_free(self, chip, key, processor_id):
+        word, bit = divmod(processor_id, _BITS_PER_WORD)
+        if processor_id < 0 or word >= self._free_cores.shape[1]:
+            return False
+        word_value = int(self._free_cores[self._chip_ids[key], word])
+        return bool(word_value >> bit & 1)
+
+    @overrides(ResourceTracker._take_core)
+    def _take_core(self, chip, key, processor_id):
+        chip_id = self._chip_ids[key]
+        if processor_id is None:
+            processor_id = self._lowest_free_core(chip_id)
+            if processor_id is None:
+                raise PacmanValueError(
+                    "No cores are free on chip {}, {}".format(*key))
+        elif not self._is_core_free(chip, key, processor_id):
+            raise PacmanValueError(
+                "Core {}:{}:{} is not free".format(
+                    key[0], key[1], processor_id))
+        word, bit = divmod(processor_id, _BITS_PER_WORD)
+        self._free_cores[chip_id, word] &= numpy.uint32(
+            _ALL_BITS ^ (1 << bit))
+        self._n_free[chip_id] -= 1
+        return processor_id
+
+    @overrides(ResourceTracker._return_core)
+    def _return_core(self, chip, key, processor_id):
+        chip_id = self._chip_ids[key]
+        word, bit = divmod(processor_id, _BITS_PER_WORD)
+        self._free_cores[chip_id, word] |= numpy.uint32(1 << bit)
+        self._n_free[chip_id] += 1
+
+    @overrides(ResourceTracker._available_resources)
+    def _available_resources(self, usable_chips=None):
+        if usable_chips is None:
+            return super(ArrayResourceTracker, self)._available_resources()
+        ids = self._ids_of(usable_chips)
+        if not len(ids):
+            return 0, 0, 0, self._n_tags_free
+        n_cores = int(numpy.sum(self._n_free[ids] - self._n_preallocated[ids]))
+        max_sdram = max(int(numpy.max(self._sdram[ids])), 0)
+        return n_cores, len(ids), max_sdram, self._n_tags_free
+
+    @overrides(ResourceTracker._chip_with_most_sdram)
+    def _chip_with_most_sdram(self, area_code):
+        if area_code is None:
+            return super(ArrayResourceTracker, self)._chip_with_most_sdram(
+                area_code)
+        in_area = numpy.zeros(len(self._chip_keys), dtype=bool)
+        in_area[self._ids_of(
+            key for key in area_code if key in self._chip_ids)] = True
+        usable = in_area & (self._n_free > self._n_preallocated)
+        if not usable.any():
+            return None
+        sdram = numpy.where(usable, self._sdram, -1)
+        return self._chip_keys[int(numpy.argmax(sdram))]
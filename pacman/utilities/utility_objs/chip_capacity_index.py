@@ -0,0 +1,197 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import defaultdict
+from enum import Enum
+from sortedcollections import SortedList
+
+
+class ChipSelection(Enum):
+    """ How a resource tracker chooses the chip for an allocation when the\
+        caller has not restricted the chips, board or processor to use.
+    """
+    #: Walk the available chips in order, checking each one in turn.
+    #: This is the original behaviour.
+    ORDERED = 0
+    #: Use the first chip in the original chip order that fits, located
+    #: through a :py:class:`ChipCapacityIndex`
+    FIRST_FIT = 1
+    #: Use the chip that fits with the fewest free cores, and of those the
+    #: one with the least free SDRAM, located through a
+    #: :py:class:`ChipCapacityIndex`
+    BEST_FIT = 2
+
+
+class ChipCapacityIndex(object):
+    """ An index of the free cores and free SDRAM of a fixed, ordered\
+        collection of chips.
+
+    The chips are the leaves of a segment tree holding the maximum free\
+    cores and free SDRAM of each subtree, so the first chip in order that\
+    fits a request can be found by descending the tree.  The chips are\
+    also bucketed by free core count, each bucket being sorted by free\
+    SDRAM, so the tightest fit can be found by bisection.  Chips with no\
+    free cores are never returned.
+    """
+
+    __slots__ = [
+        # The (x, y) coordinates of the chips, in order
+        "_keys",
+
+        # The position of each chip in the order, indexed by (x, y)
+        "_positions",
+
+        # The number of leaves in the segment tree (a power of two)
+        "_size",
+
+        # The maximum free cores of each node of the segment tree
+        "_max_cores",
+
+        # The maximum free SDRAM of each node of the segment tree; chips with
+        # no free cores count as having no SDRAM at all
+        "_max_sdram",
+
+        # The free cores of each chip, by position
+        "_n_cores",
+
+        # The free SDRAM of each chip, by position
+        "_sdram",
+
+        # Sorted lists of (free SDRAM, position) indexed by free core count
+        "_by_cores"
+    ]
+
+    #: Free SDRAM value used for a chip that has no free cores
+    _NO_SPACE = -1
+
+    def __init__(self, keys):
+        """
+        :param iterable(tuple(int,int)) keys:
+            The coordinates of the chips to index, in first-fit order.
+            All chips start with no free cores until :py:meth:`update` is
+            called for them.
+        """
+        self._keys = list(keys)
+        self._positions = {
+            key: position for position, key in enumerate(self._keys)}
+        self._size = 1
+        while self._size < len(self._keys):
+            self._size *= 2
+        self._max_cores = [0] * (2 * self._size)
+        self._max_sdram = [self._NO_SPACE] * (2 * self._size)
+        self._n_cores = [0] * len(self._keys)
+        self._sdram = [0] * len(self._keys)
+        self._by_cores = defaultdict(SortedList)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, key, n_cores, sdram):
+        """ Record the free resources of a chip.  Chips which are not in\
+            the index are ignored.
+
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        :param int n_cores: The number of cores free on the chip
+        :param int sdram: The SDRAM free on the chip
+        """
+        position = self._positions.get(key)
+        if position is None:
+            return
+        n_cores = max(n_cores, 0)
+        old_n_cores = self._n_cores[position]
+        old_sdram = self._sdram[position]
+        if old_n_cores == n_cores and old_sdram == sdram:
+            return
+
+        # Move the chip between buckets
+        if old_n_cores:
+            self._by_cores[old_n_cores].remove((old_sdram, position))
+        if n_cores:
+            self._by_cores[n_cores].add((sdram, position))
+        self._n_cores[position] = n_cores
+        self._sdram[position] = sdram
+
+        # Update the segment tree from the leaf upwards
+        node = position + self._size
+        self._max_cores[node] = n_cores
+        self._max_sdram[node] = sdram if n_cores else self._NO_SPACE
+        node //= 2
+        while node:
+            left = 2 * node
+            self._max_cores[node] = max(
+                self._max_cores[left], self._max_cores[left + 1])
+            self._max_sdram[node] = max(
+                self._max_sdram[left], self._max_sdram[left + 1])
+            node //= 2
+
+    def first_fit(self, sdram, n_cores=1):
+        """ Find the first chip in order with enough free cores and SDRAM.
+
+        This takes logarithmic time when only one core is requested; for\
+        more cores the search may have to back out of some subtrees which\
+        have enough cores and enough SDRAM, but not on the same chip.
+
+        :param int sdram: The SDRAM required
+        :param int n_cores: The number of cores required
+        :return: The (x, y) coordinates of the chip, or None if none fit
+        :rtype: tuple(int,int) or None
+        """
+        n_cores = max(n_cores, 1)
+        stack = [1]
+        while stack:
+            node = stack.pop()
+            if (self._max_cores[node] < n_cores or
+                    self._max_sdram[node] < sdram):
+                continue
+            if node >= self._size:
+                return self._keys[node - self._size]
+            stack.append(2 * node + 1)
+            stack.append(2 * node)
+        return None
+
+    def best_fit(self, sdram, n_cores=1):
+        """ Find the chip with enough free cores and SDRAM which has the\
+            fewest free cores, and of those the least free SDRAM.  Ties are\
+            broken by the order of the chips.
+
+        :param int sdram: The SDRAM required
+        :param int n_cores: The number of cores required
+        :return: The (x, y) coordinates of the chip, or None if none fit
+        :rtype: tuple(int,int) or None
+        """
+        for bucket_cores in range(max(n_cores, 1), self._max_cores[1] + 1):
+            bucket = self._by_cores.get(bucket_cores)
+            if not bucket:
+                continue
+            index = bucket.bisect_left((sdram, -1))
+            if index < len(bucket):
+                return self._keys[bucket[index][1]]
+        return None
+
+    def find(self, selection, sdram, n_cores=1):
+        """ Find a chip using the given selection strategy.
+
+        :param ChipSelection selection: How to choose between chips that fit
+        :param int sdram: The SDRAM required
+        :param int n_cores: The number of cores required
+        :return: The (x, y) coordinates of the chip, or None if none fit
+        :rtype: tuple(int,int) or None
+        """
+        if selection == ChipSelection.BEST_FIT:
+            return self.best_fit(sdram, n_cores)
+        return self.first_fit(sdram, n_cores)
@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from collections import defaultdict
+import itertools
 from spinn_utilities.ordered_set import OrderedSet
 from pacman.model.constraints.placer_constraints import (
     RadialPlacementFromChipConstraint, BoardConstraint, ChipAndCoreConstraint,
@@ -26,8 +27,9 @@ from pacman.utilities.utility_calls import (
 from pacman.exceptions import (
     PacmanCanNotFindChipException, PacmanInvalidParameterException,
     PacmanValueError, PacmanException)
-from sortedcollections import ValueSortedDict
+from sortedcollections import SortedList, ValueSortedDict
 from pacman.utilities import constants
+from .chip_capacity_index import ChipCapacityIndex, ChipSelection
 
 
 class ResourceTracker(object):
@@ -100,12 +102,47 @@ class ResourceTracker(object):
         "_real_chips_with_n_cores_available",
 
         # the number of virtual chips with the n cores currently available
-        "_virtual_chips_with_n_cores_available"
+        "_virtual_chips_with_n_cores_available",
 
+        # How to choose between chips when the chips are not restricted
+        "_chip_selection",
+
+        # Index of the free cores and SDRAM of the chips available at the
+        # start, or None if allocation is done by walking the chips in order
+        "_chip_index",
+
+        # List of (method, arguments) which undo the changes made since the
+        # oldest open checkpoint, or None if there are no open checkpoints
+        "_undo_log",
+
+        # The positions in the undo log of the open checkpoints
+        "_checkpoints",
+
+        # The number of cores counted in _n_cores_free for each usable chip,
+        # indexed by the (x, y) tuple of coordinates of the chip
+        "_counted_cores",
+
+        # The number of cores available over all the usable chips
+        "_n_cores_free",
+
+        # The (-SDRAM, sequence number, (x, y)) entry of each usable chip,
+        # with the most SDRAM first and ties in the order they were made
+        "_usable_sdram",
+
+        # The entry in _usable_sdram of each usable chip, indexed by the
+        # (x, y) tuple of coordinates of the chip
+        "_usable_sdram_entries",
+
+        # The source of the sequence numbers of _usable_sdram
+        "_usable_sdram_sequence",
+
+        # The number of tags available over all the boards
+        "_n_tags_free"
     ]
 
     def __init__(self, machine, plan_n_timesteps, chips=None,
-                 preallocated_resources=None):
+                 preallocated_resources=None,
+                 chip_selection=ChipSelection.ORDERED):
         """
         :param ~spinn_machine.Machine machine:
             The machine to track the usage of
@@ -118,19 +155,16 @@ class ResourceTracker(object):
         :type chips: iterable(tuple(int, int)) or None
         :param preallocated_resources:
         :type preallocated_resources: PreAllocatedResourceContainer or None
+        :param ChipSelection chip_selection:
+            How to choose the chip for an allocation that is not restricted\
+            to particular chips, a board or a processor.  The default walks\
+            the available chips in order; the other options use an index of\
+            the free capacity of the chips, in which case the order of the\
+            chips when they were passed in is kept even after deallocation.
         """
 
-        # The amount of SDRAM available on each chip,
-        # indexed by the (x, y) tuple of coordinates of the chip
-        # Items are sorted in reverse order so highest comes out first
-        self._sdram_tracker = ValueSortedDict(lambda x: -x)
-        for chip in machine.chips:
-            self._sdram_tracker[chip.x, chip.y] = chip.sdram.size
-
-        # The set of processor IDs available on each chip,
-        # indexed by the (x, y) tuple of coordinates of the chip
-        # Note that entries are only added when a core is first used
-        self._core_tracker = dict()
+        # The free SDRAM and cores of each chip
+        self._init_chip_state(machine)
 
         # The machine object
         self._machine = machine
@@ -176,9 +210,11 @@ class ResourceTracker(object):
         # (x, y) tuple of coordinates of Ethernet connected chip indexed by
         # board address
         self._ethernet_chips = dict()
+        self._n_tags_free = 0
         for chip in self._machine.ethernet_connected_chips:
             self._ethernet_chips[chip.ip_address] = (chip.x, chip.y)
             self._boards_with_ip_tags.add(chip.ip_address)
+            self._n_tags_free += len(chip.tag_ids)
 
         # set of resources that have been pre allocated and therefore need to
         # be taken account of when allocating resources
@@ -212,6 +248,46 @@ class ResourceTracker(object):
             for x, y in chips:
                 self._chips_available.add((x, y))
 
+        # Nothing to undo until a checkpoint is made
+        self._undo_log = None
+        self._checkpoints = list()
+
+        # Summary of the free resources of the usable chips, and index of
+        # free capacity, both filled in with the current state
+        self._counted_cores = dict()
+        self._n_cores_free = 0
+        self._usable_sdram = SortedList()
+        self._usable_sdram_entries = dict()
+        self._usable_sdram_sequence = itertools.count()
+        self._chip_selection = chip_selection
+        self._chip_index = None
+        if chip_selection != ChipSelection.ORDERED:
+            self._chip_index = ChipCapacityIndex(
+                key for key in self._chips_available
+                if machine.is_chip_at(*key))
+        for key in self._chips_available:
+            if machine.is_chip_at(*key):
+                self._chip_changed(machine.get_chip_at(*key), key)
+
+    def _init_chip_state(self, machine):
+        """ Set up the record of the free SDRAM and free cores of each\
+            chip.  Subclasses which store these differently override this\
+            along with the other methods that read and change them.
+
+        :param ~spinn_machine.Machine machine: The machine being tracked
+        """
+        # The amount of SDRAM available on each chip,
+        # indexed by the (x, y) tuple of coordinates of the chip
+        # Items are sorted in reverse order so highest comes out first
+        self._sdram_tracker = ValueSortedDict(lambda x: -x)
+        for chip in machine.chips:
+            self._sdram_tracker[chip.x, chip.y] = chip.sdram.size
+
+        # The set of processor IDs available on each chip,
+        # indexed by the (x, y) tuple of coordinates of the chip
+        # Note that entries are only added when a core is first used
+        self._core_tracker = dict()
+
     def _convert_preallocated_resources(self, preallocated_resources):
         """ Allocates preallocated SDRAM and specific cores to the trackers.\
             Also builds an arbitrary core map for use throughout resource\
@@ -232,16 +308,13 @@ class ResourceTracker(object):
             chip = sdram_pre_allocated.chip
             sdram = sdram_pre_allocated.sdram_usage.get_total_sdram(
                 self._plan_n_timesteps)
-            self._sdram_tracker[chip.x, chip.y] -= sdram
+            self._change_sdram((chip.x, chip.y), -sdram)
 
         # remove specific cores from the tracker
         for specific_core in preallocated_resources.specific_core_resources:
             chip = specific_core.chip
-            processor_ids = specific_core.cores
-            if not (chip.x, chip.y) in self._core_tracker:
-                self._fill_in_core_tracker_for_chip((chip.x, chip.y), chip)
-            for processor_id in processor_ids:
-                self._core_tracker[chip.x, chip.y].remove(processor_id)
+            for processor_id in specific_core.cores:
+                self._take_core(chip, (chip.x, chip.y), processor_id)
 
         # create random_core_map
         chip_to_arbitrary_core_requirement = defaultdict(lambda: 0)
@@ -364,11 +437,63 @@ class ResourceTracker(object):
         """
         if not self._machine.is_chip_at(x, y):
             return False
-        if (x, y) in self._core_tracker:
-            projected_id = len(self._core_tracker[x, y])
-        else:
-            projected_id = self._machine.get_chip_at(x, y).n_user_processors
-        return projected_id > self._n_cores_preallocated[x, y]
+        n_free = self._n_free_cores(self._machine.get_chip_at(x, y), (x, y))
+        return n_free > self._n_cores_preallocated[x, y]
+
+    def _chip_changed(self, chip, key):
+        """ Update the summary of the free resources of the usable chips,\
+            and the index of free capacity if there is one, after the cores\
+            or SDRAM of a chip have changed
+
+        :param ~spinn_machine.Chip chip: The chip that has changed
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        """
+        n_cores = 0
+        if key in self._chips_available:
+            n_cores = max(self._n_cores_available(chip, key, None), 0)
+        self._n_cores_free += n_cores - self._counted_cores.pop(key, 0)
+        entry = self._usable_sdram_entries.pop(key, None)
+        if entry is not None:
+            self._usable_sdram.remove(entry)
+        if n_cores:
+            self._counted_cores[key] = n_cores
+            entry = (-self._sdram_available(chip),
+                     next(self._usable_sdram_sequence), key)
+            self._usable_sdram.add(entry)
+            self._usable_sdram_entries[key] = entry
+
+        if self._chip_index is not None:
+            self._chip_index.update(
+                key, self._n_cores_available(chip, key, None),
+                self._sdram_available(chip))
+
+    def _get_candidate_chips(
+            self, chips, board_address, processor_ids, sdram, n_cores):
+        """ Get the chips to try for an allocation, using the index of free\
+            capacity where the allocation is unrestricted.
+
+        :param chips: The chips that may be used, or None for any chip
+        :type chips: iterable(tuple(int, int)) or None
+        :param board_address: The board that must be used, or None
+        :type board_address: str or None
+        :param list(int or None) processor_ids:
+            The specific processors required, which may be None
+        :param int sdram: The total SDRAM required on the chip
+        :param int n_cores: The number of cores required on the chip
+        :return: iterable of tuples of (x, y) coordinates of chips to try
+        :rtype: iterable(tuple(int, int))
+        """
+        if (self._chip_index is None or chips is not None or
+                board_address is not None or
+                any(p is not None for p in processor_ids or [])):
+            return self._get_usable_chips(chips, board_address)
+
+        # Only the chip found can fit; if it then fails the tag checks, no
+        # other chip would pass them either
+        key = self._chip_index.find(self._chip_selection, sdram, n_cores)
+        if key is None:
+            return []
+        return [key]
 
     def _get_usable_chips(self, chips, board_address):
         """ Get all chips that are available on a board given the constraints
@@ -413,14 +538,24 @@ class ResourceTracker(object):
                     "{} and {}".format(chips, board_address),
                     "No valid chips found on the specified board")
         elif board_address is not None:
-            for (x, y) in self._machine.get_existing_xys_on_board(eth_chip):
-                if self._chip_available(x, y):
-                    yield (x, y)
+            for (x, y) in self._usable_chips_on_board(eth_chip):
+                yield (x, y)
         else:
             for (x, y) in self._chips_available:
                 if self._chip_available(x, y):
                     yield (x, y)
 
+    def _usable_chips_on_board(self, eth_chip):
+        """ Get the chips of a board which have cores available
+
+        :param ~spinn_machine.Chip eth_chip: The Ethernet chip of the board
+        :return: iterable of tuples of (x, y) coordinates of usable chips
+        :rtype: iterable(tuple(int, int))
+        """
+        for (x, y) in self._machine.get_existing_xys_on_board(eth_chip):
+            if self._chip_available(x, y):
+                yield (x, y)
+
     def _check_chip_not_used(self, chips):
         """
         Check to see if any of the candidates chip have already been used.
@@ -457,7 +592,7 @@ class ResourceTracker(object):
         :return: True if there is enough SDRAM available, or False otherwise
         :rtype: bool
         """
-        return (self._sdram_tracker[chip.x, chip.y] >=
+        return (self._sdram_available(chip) >=
                 resources.sdram.get_total_sdram(self._plan_n_timesteps))
 
     def _sdram_available(self, chip):
@@ -469,6 +604,14 @@ class ResourceTracker(object):
         """
         return self._sdram_tracker[chip.x, chip.y]
 
+    def _change_sdram(self, key, amount):
+        """ Change the amount of SDRAM available on a chip
+
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        :param int amount: The amount to add; negative to take SDRAM away
+        """
+        self._sdram_tracker[key] += amount
+
     def sdram_avilable_on_chip(self, chip_x, chip_y):
         """ Get the available SDRAM on the chip at coordinates chip_x, chip_y
 
@@ -494,6 +637,59 @@ class ResourceTracker(object):
                     return processor.processor_id
         return next(iter(self._core_tracker[key]))
 
+    def _n_free_cores(self, chip, key):
+        """ Get the number of non-monitor cores of a chip that have not\
+            been allocated, including any set aside for preallocation
+
+        :param ~spinn_machine.Chip chip: The chip to check
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        :rtype: int
+        """
+        if key in self._core_tracker:
+            return len(self._core_tracker[key])
+        return chip.n_user_processors
+
+    def _is_core_free(self, chip, key, processor_id):
+        """ Check if a specific core of a chip has not been allocated
+
+        :param ~spinn_machine.Chip chip: The chip to check
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        :param int processor_id: The processor to check
+        :rtype: bool
+        """
+        if key in self._core_tracker:
+            return processor_id in self._core_tracker[key]
+        processor = chip.get_processor_with_id(processor_id)
+        return processor is not None and not processor.is_monitor
+
+    def _take_core(self, chip, key, processor_id):
+        """ Remove a core from those free on a chip
+
+        :param ~spinn_machine.Chip chip: The chip to take the core from
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        :param processor_id:
+            The ID of the processor to take, or None to pick any free one
+        :type processor_id: int or None
+        :return: The ID of the processor taken
+        :rtype: int
+        """
+        if key not in self._core_tracker:
+            self._fill_in_core_tracker_for_chip(key, chip)
+        if processor_id is not None:
+            self._core_tracker[key].remove(processor_id)
+            return processor_id
+        # TODO: Find a core that meets the resource requirements
+        return self._core_tracker[key].pop()
+
+    def _return_core(self, chip, key, processor_id):
+        """ Put a core back into those free on a chip
+
+        :param ~spinn_machine.Chip chip: The chip the core is on
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        :param int processor_id: The ID of the processor
+        """
+        self._core_tracker[key].add(processor_id)
+
     def _is_core_available(self, chip, key, processor_id):
         """ Check if there is a core available on a given chip given the\
             constraints
@@ -521,38 +717,18 @@ class ResourceTracker(object):
         :rtype: int
         """
 
-        # If a specific processor has been requested, perform special checks
-        if processor_id is not None:
-
-            # If the chip has already had cores allocated...
-            if key in self._core_tracker:
-
-                # Check if there is enough space for preallocated cores,
-                # and that the processor specified is available
-                return int(
-                    len(self._core_tracker[key]) -
-                    self._n_cores_preallocated[key] > 0
-                    and processor_id in self._core_tracker[key])
-
-            # If here, the chip has no cores allocated, so check that there
-            # are enough cores on the chip for preallocated cores
-            elif chip.n_user_processors - self._n_cores_preallocated[key] > 0:
-
-                # Check that the processor is not a monitor core
-                processor = chip.get_processor_with_id(processor_id)
-                return int(processor is not None and not processor.is_monitor)
-
-            # If we get here, the core has been allocated
-            return 0
-
-        # Check how many cores are available
         # TODO: Check the resources can be met with the processor
         # Currently assumes all processors are equal
-        if key in self._core_tracker:
-            n_cores = len(self._core_tracker[key])
-        else:
-            n_cores = sum(not proc.is_monitor for proc in chip.processors)
-        return n_cores - self._n_cores_preallocated[key]
+        n_cores = (self._n_free_cores(chip, key) -
+                   self._n_cores_preallocated[key])
+
+        # If a specific processor has been requested, check that there is
+        # enough space for preallocated cores, and that the processor
+        # specified is available
+        if processor_id is not None:
+            return int(
+                n_cores > 0 and self._is_core_free(chip, key, processor_id))
+        return n_cores
 
     def _get_matching_ip_tag(
             self, chip, board_address, tag_id, ip_address, port, strip_sdp,
@@ -770,8 +946,28 @@ class ResourceTracker(object):
         :param ResourceContainer resources:
             the resources containing the SDRAM required
         """
-        self._sdram_tracker[chip.x, chip.y] -= \
-            resources.sdram.get_total_sdram(self._plan_n_timesteps)
+        self._use_sdram(
+            chip, resources.sdram.get_total_sdram(self._plan_n_timesteps))
+
+    def _use_sdram(self, chip, sdram):
+        """ Takes an amount of SDRAM from a chip
+
+        :param ~spinn_machine.Chip chip: The chip to take the SDRAM from
+        :param int sdram: The amount of SDRAM
+        """
+        self._change_sdram((chip.x, chip.y), -sdram)
+        self._chip_changed(chip, (chip.x, chip.y))
+        self._record(self._free_sdram, chip, sdram)
+
+    def _free_sdram(self, chip, sdram):
+        """ Gives an amount of SDRAM back to a chip
+
+        :param ~spinn_machine.Chip chip: The chip to give the SDRAM to
+        :param int sdram: The amount of SDRAM
+        """
+        self._change_sdram((chip.x, chip.y), sdram)
+        self._chip_changed(chip, (chip.x, chip.y))
+        self._record(self._use_sdram, chip, sdram)
 
     def _allocate_core(self, chip, key, processor_id):
         """ Allocates a core on the given chip
@@ -783,35 +979,54 @@ class ResourceTracker(object):
         :type processor_id: int or None
         :rtype: int
         """
-        if key not in self._core_tracker:
-            self._fill_in_core_tracker_for_chip(key, chip)
-        if processor_id is not None:
-            self._core_tracker[key].remove(processor_id)
-        else:
-            # TODO: Find a core that meets the resource requirements
-            processor_id = self._core_tracker[key].pop()
+        processor_id = self._take_core(chip, key, processor_id)
+        n_free = self._n_free_cores(chip, key)
 
         # update number tracker
         if chip.virtual:
-            self._virtual_chips_with_n_cores_available[
-                len(self._core_tracker[key])] -= 1
-            self._virtual_chips_with_n_cores_available[
-                len(self._core_tracker[key]) - 1] += 1
+            self._virtual_chips_with_n_cores_available[n_free] -= 1
+            self._virtual_chips_with_n_cores_available[n_free - 1] += 1
         else:
-            self._real_chips_with_n_cores_available[
-                len(self._core_tracker[key])] -= 1
-            self._real_chips_with_n_cores_available[
-                len(self._core_tracker[key]) - 1] += 1
+            self._real_chips_with_n_cores_available[n_free] -= 1
+            self._real_chips_with_n_cores_available[n_free - 1] += 1
 
-        if len(self._core_tracker[key]) == self._n_cores_preallocated[key]:
+        if n_free == self._n_cores_preallocated[key]:
             self._chips_available.remove(key)
 
         # update chip tracker
         self._chips_used.add(key)
+        self._chip_changed(chip, key)
+        self._record(self._free_core, chip, key, processor_id)
 
         # return processor ID
         return processor_id
 
+    def _free_core(self, chip, key, processor_id):
+        """ Gives an allocated core back to a chip
+
+        :param ~spinn_machine.Chip chip: The chip the core is on
+        :param tuple(int,int) key: The (x, y) coordinates of the chip
+        :param int processor_id: The ID of the processor
+        """
+        self._chips_available.add(key)
+
+        # update number tracker
+        n_free = self._n_free_cores(chip, key)
+        if chip.virtual:
+            self._virtual_chips_with_n_cores_available[n_free] -= 1
+            self._virtual_chips_with_n_cores_available[n_free + 1] += 1
+        else:
+            self._real_chips_with_n_cores_available[n_free] -= 1
+            self._real_chips_with_n_cores_available[n_free + 1] += 1
+
+        self._return_core(chip, key, processor_id)
+
+        # check if chip used needs updating
+        if self._n_free_cores(chip, key) == chip.n_user_processors:
+            self._chips_used.remove(key)
+        self._chip_changed(chip, key)
+        self._record(self._allocate_core, chip, key, processor_id)
+
     def _fill_in_core_tracker_for_chip(self, key, chip):
         """
         :param tuple(int,int) key:
@@ -882,8 +1097,10 @@ class ResourceTracker(object):
         :rtype: int
         """
         if tag_id is None:
-            return self._tags_by_board[board_address].pop()
-        self._tags_by_board[board_address].remove(tag_id)
+            tag_id = self._tags_by_board[board_address].pop()
+        else:
+            self._tags_by_board[board_address].remove(tag_id)
+        self._n_tags_free -= 1
         return tag_id
 
     def _allocate_ip_tags(self, chip, board_address, ip_tags):
@@ -900,6 +1117,7 @@ class ResourceTracker(object):
         if ip_tags is None or not ip_tags:
             return None
 
+        self._record_tag_state()
         allocations = list()
         for ip_tag in ip_tags:
 
@@ -975,6 +1193,7 @@ class ResourceTracker(object):
         if reverse_ip_tags is None or not reverse_ip_tags:
             return None
 
+        self._record_tag_state()
         allocations = list()
         for reverse_ip_tag in reverse_ip_tags:
             (board_address, tag) = self._allocate_tag(
@@ -1114,16 +1333,15 @@ class ResourceTracker(object):
             If there aren't chips available that can take the allocation.
         """
 
-        usable_chips = chips
-        for ip_tags, reverse_ip_tags in zip(
-                group_ip_tags, group_reverse_ip_tags):
-            usable_chips = self._get_usable_chips(usable_chips, board_address)
-
         total_sdram = 0
         for resources in group_resources:
             total_sdram += resources.sdram.get_total_sdram(
                 self._plan_n_timesteps)
 
+        usable_chips = self._get_candidate_chips(
+            chips, board_address, processor_ids, total_sdram,
+            len(group_resources))
+
         # Find the first usable chip which fits all the group resources
         tried_chips = list()
         for key in usable_chips:
@@ -1170,6 +1388,8 @@ class ResourceTracker(object):
                     return results
 
         # If no chip is available, raise an exception
+        if chips is None and board_address is None:
+            tried_chips = None
         n_cores, n_chips, max_sdram, n_tags = self._available_resources(
             tried_chips)
         raise PacmanValueError(
@@ -1206,7 +1426,9 @@ class ResourceTracker(object):
             If there isn't a chip available that can take the allocation.
         """
         # Find the first usable chip which fits the resources
-        for (chip_x, chip_y) in self._get_usable_chips(chips, board_address):
+        for (chip_x, chip_y) in self._get_candidate_chips(
+                chips, board_address, [processor_id],
+                resources.sdram.get_total_sdram(self._plan_n_timesteps), 1):
             chip = self._machine.get_chip_at(chip_x, chip_y)
             key = (chip_x, chip_y)
 
@@ -1235,12 +1457,13 @@ class ResourceTracker(object):
                 raise PacmanValueError(
                     "Processor id {} is not available on any of the chips"
                     "".format(processor_id))
-        tried_chips = self._get_usable_chips(chips, board_address)
+        tried_chips = None
+        if chips is not None or board_address is not None:
+            tried_chips = self._get_usable_chips(chips, board_address)
         n_cores, n_chips, max_sdram, n_tags = \
             self._available_resources(tried_chips)
-        all_chips = self._get_usable_chips(None, None)
         all_n_cores, all_n_chips, all_max_sdram, all_n_tags = \
-            self._available_resources(all_chips)
+            self._available_resources()
         raise PacmanValueError(
             "No resources available to allocate the given resources"
             " within the given constraints:\n"
@@ -1259,37 +1482,102 @@ class ResourceTracker(object):
                 n_cores, n_tags, n_chips, max_sdram,
                 all_n_cores, all_n_tags, all_n_chips, all_max_sdram))
 
-    def _available_resources(self, usable_chips):
+    def allocate_many(self, resources, count, chips=None, board_address=None):
+        """ Allocates the same resources a number of times, filling each\
+            chip in turn as far as its free cores and SDRAM allow.  The\
+            allocations made are the same as those of the same number of\
+            calls to :py:meth:`allocate_resources`, but each chip is only\
+            looked at once.  Either all the allocations are made or none are.
+
+        :param ResourceContainer resources:
+            The resources to be allocated each time; these must not include
+            any IP tags or reverse IP tags
+        :param int count: The number of times to allocate the resources
+        :param iterable(tuple(int,int)) chips:
+            An iterable of (x, y) tuples of chips that are to be used
+        :param str board_address:
+            The board address to allocate resources of a chip
+        :return: The x and y coordinates of the chip and the processor ID of
+            each allocation, in order
+        :rtype: list(tuple(int, int, int))
+        :raises PacmanInvalidParameterException:
+            If the resources include tags
+        :raises PacmanValueError:
+            If there is not space for all the allocations
+        """
+        if resources.iptags or resources.reverse_iptags:
+            raise PacmanInvalidParameterException(
+                "resources", str(resources),
+                "Only resources without tags can be allocated in bulk")
+        if chips is not None:
+            chips = list(chips)
+        sdram = resources.sdram.get_total_sdram(self._plan_n_timesteps)
+        token = self.checkpoint()
+        allocations = list()
+        while len(allocations) < count:
+            n_allocated = len(allocations)
+
+            # The chips are looked at before allocating on any of them, as
+            # the allocation changes the chips available
+            for key in list(self._get_candidate_chips(
+                    chips, board_address, [None], sdram, 1)):
+                chip = self._machine.get_chip_at(*key)
+                n_fit = min(self._n_cores_available(chip, key, None),
+                            count - len(allocations))
+                if sdram > 0:
+                    n_fit = min(n_fit, self._sdram_available(chip) // sdram)
+                for _ in range(n_fit):
+                    processor_id = self._allocate_core(chip, key, None)
+                    self._allocate_sdram(chip, resources)
+                    allocations.append((chip.x, chip.y, processor_id))
+                if len(allocations) == count:
+                    break
+
+            # If nothing more could be allocated, undo and fail
+            if len(allocations) == n_allocated:
+                self.rollback(token)
+                usable_chips = None
+                if chips is not None or board_address is not None:
+                    usable_chips = self._get_usable_chips(chips, board_address)
+                n_cores, n_chips, max_sdram, _ = self._available_resources(
+                    usable_chips)
+                raise PacmanValueError(
+                    "No resources available to allocate {} times the given"
+                    " resources within the given constraints:\n"
+                    "    Request for SDRAM: {} each\n"
+                    "    Resources available which meet constraints:\n"
+                    "      {} Cores on {} chips, largest SDRAM space: {}\n"
+                    .format(count, sdram, n_cores, n_chips, max_sdram))
+        self.commit(token)
+        return allocations
+
+    def _available_resources(self, usable_chips=None):
         """ Describe how much of the various resource types are available.
 
-        :param iterable(tuple(int,int)) usable_chips:
-            Coordinates of usable chips
+        :param usable_chips: Coordinates of usable chips, or None for all\
+            the usable chips, which is answered from running totals
+        :type usable_chips: iterable(tuple(int,int)) or None
         :return: returns #cores, #chips, amount of SDRAM, #tags
         :rtype: tuple(int,int,int,int)
         """
+        if usable_chips is None:
+            max_sdram = 0
+            if self._usable_sdram:
+                max_sdram = max(-self._usable_sdram[0][0], 0)
+            return (self._n_cores_free, len(self._counted_cores), max_sdram,
+                    self._n_tags_free)
         n_cores = 0
         max_sdram = 0
         n_chips = 0
-        n_tags = 0
         for x, y in usable_chips:
             chip = self._machine.get_chip_at(x, y)
-            if (x, y) in self._core_tracker:
-                n_cores += (len(self._core_tracker[x, y]) -
-                            self._n_cores_preallocated[x, y])
-            else:
-                n_cores += (chip.n_user_processors -
-                            self._n_cores_preallocated[x, y])
+            n_cores += (self._n_free_cores(chip, (x, y)) -
+                        self._n_cores_preallocated[x, y])
             sdram_available = self._sdram_available(chip)
             if sdram_available > max_sdram:
                 max_sdram = sdram_available
             n_chips += 1
-        for board_address in self._boards_with_ip_tags:
-            if board_address in self._tags_by_board:
-                n_tags += len(self._tags_by_board)
-            else:
-                eth_x, eth_y = self._ethernet_chips[board_address]
-                n_tags += len(self._machine.get_chip_at(eth_x, eth_y).tag_ids)
-        return n_cores, n_chips, max_sdram, n_tags
+        return n_cores, n_chips, max_sdram, self._n_tags_free
 
     def get_maximum_cores_available_on_a_chip(self):
         """ Returns the number of available cores of a real chip with the
@@ -1375,23 +1663,43 @@ class ResourceTracker(object):
         :return: a resource which shows max resources available
         :rtype: ResourceContainer
         """
+        key = self._chip_with_most_sdram(area_code)
+
+        # If nothing is available, return nothing
+        if key is None:
+            return ResourceContainer()
+
+        # Send the maximums
+        chip = self._machine.get_chip_at(*key)
+        best_processor_id = self._best_core_available(chip)
+        processor = chip.get_processor_with_id(best_processor_id)
+        max_dtcm_available = processor.dtcm_available
+        max_cpu_available = processor.cpu_cycles_available
+        return ResourceContainer(
+            DTCMResource(max_dtcm_available),
+            ConstantSDRAM(self._sdram_available(chip)),
+            CPUCyclesPerTickResource(max_cpu_available))
+
+    def _chip_with_most_sdram(self, area_code):
+        """ Find the chip with cores available with the most free SDRAM
+
+        :param area_code: A set of valid (x, y) coordinates to choose from
+        :type area_code: iterable(tuple(int,int)) or None
+        :return: The (x, y) coordinates of the chip, or None if no chip has
+            cores available
+        :rtype: tuple(int,int) or None
+        """
+        if area_code is None:
+            if not self._usable_sdram:
+                return None
+            return self._usable_sdram[0][2]
+
         # Go through the chips in order of sdram
-        for ((chip_x, chip_y), sdram_available) in self._sdram_tracker.items():
+        for (chip_x, chip_y) in self._sdram_tracker:
             if self._chip_available(chip_x, chip_y) and (
                     area_code is None or (chip_x, chip_y) in area_code):
-                chip = self._machine.get_chip_at(chip_x, chip_y)
-                best_processor_id = self._best_core_available(chip)
-                processor = chip.get_processor_with_id(best_processor_id)
-                max_dtcm_available = processor.dtcm_available
-                max_cpu_available = processor.cpu_cycles_available
-                return ResourceContainer(
-                    DTCMResource(max_dtcm_available),
-                    ConstantSDRAM(sdram_available),
-                    CPUCyclesPerTickResource(max_cpu_available))
-
-        # Send the maximums
-        # If nothing is available, return nothing
-        return ResourceContainer()
+                return chip_x, chip_y
+        return None
 
     def unallocate_resources(self, chip_x, chip_y, processor_id, resources,
                              ip_tags, reverse_ip_tags):
@@ -1408,27 +1716,12 @@ class ResourceTracker(object):
         :rtype: None
         """
 
-        self._chips_available.add((chip_x, chip_y))
-        self._sdram_tracker[chip_x, chip_y] += \
-            resources.sdram.get_total_sdram(self._plan_n_timesteps)
-        # update number tracker
-        if self._machine.get_chip_at(chip_x, chip_y).virtual:
-            self._virtual_chips_with_n_cores_available[
-                len(self._core_tracker[chip_x, chip_y])] -= 1
-            self._virtual_chips_with_n_cores_available[
-                len(self._core_tracker[chip_x, chip_y]) + 1] += 1
-        else:
-            self._real_chips_with_n_cores_available[
-                len(self._core_tracker[chip_x, chip_y])] -= 1
-            self._real_chips_with_n_cores_available[
-                len(self._core_tracker[chip_x, chip_y]) + 1] += 1
-
-        self._core_tracker[chip_x, chip_y].add(processor_id)
-
-        # check if chip used needs updating
-        if (len(self._core_tracker[chip_x, chip_y]) ==
-                self._machine.get_chip_at(chip_x, chip_y).n_user_processors):
-            self._chips_used.remove((chip_x, chip_y))
+        chip = self._machine.get_chip_at(chip_x, chip_y)
+        self._free_sdram(
+            chip, resources.sdram.get_total_sdram(self._plan_n_timesteps))
+        self._free_core(chip, (chip_x, chip_y), processor_id)
+        if ip_tags or reverse_ip_tags:
+            self._record_tag_state()
 
         # Deallocate the IP tags
         if ip_tags is not None:
@@ -1442,14 +1735,14 @@ class ResourceTracker(object):
                     self._ip_tags_address_traffic[key].remove(tag_key)
                     if not self._ip_tags_address_traffic[key]:
                         del self._ip_tags_address_traffic[key]
-                    self._tags_by_board[board_address].add(tag)
+                    self._return_tag(board_address, tag)
                     del self._ip_tags_strip_sdp_and_port[tag_key]
 
         # Deallocate the reverse IP tags
         if reverse_ip_tags is not None:
             for (board_address, tag) in reverse_ip_tags:
                 self._boards_with_ip_tags.add(board_address)
-                self._tags_by_board[board_address].add(tag)
+                self._return_tag(board_address, tag)
                 port = self._listen_port_reverse_ip_tag.get(
                     (board_address, tag), None)
                 if port is not None:
@@ -1457,6 +1750,114 @@ class ResourceTracker(object):
                     self._reverse_ip_tag_listen_port.remove(
                         (board_address, port))
 
+    def _return_tag(self, board_address, tag):
+        """ Make a tag available again
+
+        :param str board_address: The board address of the tag
+        :param int tag: The tag ID
+        """
+        if tag not in self._tags_by_board[board_address]:
+            self._tags_by_board[board_address].add(tag)
+            self._n_tags_free += 1
+
+    def checkpoint(self):
+        """ Start recording the changes made to the allocations, so that\
+            they can later be undone with :py:meth:`rollback` or kept with\
+            :py:meth:`commit`.  Checkpoints may be nested.
+
+        :return: A token identifying the checkpoint
+        :rtype: int
+        """
+        if self._undo_log is None:
+            self._undo_log = list()
+        token = len(self._undo_log)
+        self._checkpoints.append(token)
+        return token
+
+    def rollback(self, token):
+        """ Undo all the changes made since a checkpoint, in time\
+            proportional to the number of changes.  The checkpoint, and any\
+            made after it, are closed.
+
+        :param int token: The token returned by :py:meth:`checkpoint`
+        :raises PacmanInvalidParameterException:
+            If the checkpoint is not open
+        """
+        self._close_checkpoint(token)
+        undo_log = self._undo_log
+        self._undo_log = None
+        while len(undo_log) > token:
+            method, args = undo_log.pop()
+            method(*args)
+        if self._checkpoints:
+            self._undo_log = undo_log
+
+    def commit(self, token):
+        """ Keep all the changes made since a checkpoint.  The checkpoint,\
+            and any made after it, are closed; the changes can still be\
+            undone by rolling back to a checkpoint made before this one.
+
+        :param int token: The token returned by :py:meth:`checkpoint`
+        :raises PacmanInvalidParameterException:
+            If the checkpoint is not open
+        """
+        self._close_checkpoint(token)
+        if not self._checkpoints:
+            self._undo_log = None
+
+    def _close_checkpoint(self, token):
+        """ Close a checkpoint and any made after it
+
+        :param int token: The token returned by :py:meth:`checkpoint`
+        :raises PacmanInvalidParameterException:
+            If the checkpoint is not open
+        """
+        if token not in self._checkpoints:
+            raise PacmanInvalidParameterException(
+                "token", str(token), "No such checkpoint is open")
+        del self._checkpoints[self._checkpoints.index(token):]
+
+    def _record(self, method, *args):
+        """ Record how to undo a change if there is an open checkpoint
+
+        :param callable method: The method which undoes the change
+        :param args: The arguments to pass to the method
+        """
+        if self._undo_log is not None:
+            self._undo_log.append((method, args))
+
+    def _record_tag_state(self):
+        """ Record the state of the tags before they are changed, if there\
+            is an open checkpoint.  Tags are few, so copying them is cheaper\
+            than recording each change to the tag structures.
+        """
+        if self._undo_log is None:
+            return
+        self._record(self._restore_tag_state, (
+            {board: set(tags) for board, tags in self._tags_by_board.items()},
+            OrderedSet(self._boards_with_ip_tags),
+            {key: set(tags)
+             for key, tags in self._ip_tags_address_traffic.items()},
+            dict(self._address_and_traffic_ip_tag),
+            dict(self._ip_tags_strip_sdp_and_port),
+            set(self._reverse_ip_tag_listen_port),
+            dict(self._listen_port_reverse_ip_tag),
+            dict(self._n_ip_tag_allocations), self._n_tags_free))
+
+    def _restore_tag_state(self, state):
+        """ Put back the state of the tags recorded by\
+            :py:meth:`_record_tag_state`
+
+        :param tuple state: The recorded state
+        """
+        (self._tags_by_board, self._boards_with_ip_tags,
+         ip_tags_address_traffic, self._address_and_traffic_ip_tag,
+         self._ip_tags_strip_sdp_and_port, self._reverse_ip_tag_listen_port,
+         self._listen_port_reverse_ip_tag, self._n_ip_tag_allocations,
+         self._n_tags_free) = state
+        self._ip_tags_address_traffic = defaultdict(set)
+        self._ip_tags_address_traffic.update(ip_tags_address_traffic)
+
     def is_chip_available(self, chip_x, chip_y):
         """ Check if a given chip is available
 
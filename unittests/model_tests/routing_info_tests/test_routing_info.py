@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import unittest
+import numpy
 from pacman.model.resources import ResourceContainer
 from pacman.exceptions import (
     PacmanAlreadyExistsException, PacmanConfigurationException)
@@ -98,6 +99,36 @@ class TestRoutingInfo(unittest.TestCase):
         assert routing_info.get_routing_info_from_partition(
             partition3).get_keys().tolist() == [key, key * 2]
 
+    def test_partition_from_key(self):
+        partition1 = OutgoingEdgePartition("Test1", MachineEdge)
+        partition2 = OutgoingEdgePartition("Test2", MachineEdge)
+        routing_info = RoutingInfo([
+            PartitionRoutingInfo([
+                BaseKeyAndMask(0x100, FULL_MASK & ~0x3),
+                BaseKeyAndMask(0x200, FULL_MASK & ~0x11)], partition1),
+            PartitionRoutingInfo(
+                [BaseKeyAndMask(0x110, FULL_MASK & ~0xF)], partition2)])
+        assert routing_info.get_partition_and_atom_from_key(0x102) == (
+            partition1, 2)
+        assert routing_info.get_partition_and_atom_from_key(0x210) == (
+            partition1, 6)
+        assert routing_info.get_partition_and_atom_from_key(0x11F) == (
+            partition2, 15)
+        assert routing_info.get_partition_and_atom_from_key(0x202) is None
+
+        partitions, atoms = routing_info.get_partitions_and_atoms_from_keys(
+            numpy.array([0x102, 0x210, 0x11F, 0x202], dtype=">u4"))
+        assert partitions.tolist() == [partition1, partition1, partition2,
+                                       None]
+        assert atoms.tolist()[:3] == [2, 6, 15]
+
+        # Adding a partition makes the index again
+        partition3 = OutgoingEdgePartition("Test3", MachineEdge)
+        routing_info.add_partition_info(PartitionRoutingInfo(
+            [BaseKeyAndMask(0x202, FULL_MASK)], partition3))
+        assert routing_info.get_partition_and_atom_from_key(0x202) == (
+            partition3, 0)
+
     def test_base_key_and_mask(self):
         with self.assertRaises(PacmanConfigurationException):
             BaseKeyAndMask(0xF0, 0x40)
@@ -112,6 +143,24 @@ class TestRoutingInfo(unittest.TestCase):
         k, n = bkm2.get_keys()
         assert k.tolist() == [1073741824, 1073741825]
         assert n == 2
+        assert hash(bkm2) == hash(BaseKeyAndMask(0x40000000, FULL_MASK & ~1))
+
+    def test_get_keys_of_all(self):
+        # The zero bits of the mask need not be together
+        bkm1 = BaseKeyAndMask(0x100, FULL_MASK & ~0x11)
+        bkm2 = BaseKeyAndMask(0x200, FULL_MASK & ~0x11)
+        bkm3 = BaseKeyAndMask(0x300, FULL_MASK)
+        assert bkm1.n_keys == 4
+        k, n = bkm1.get_keys()
+        assert k.tolist() == [0x100, 0x101, 0x110, 0x111]
+        k, n = bkm1.get_keys(n_keys=3)
+        assert k.tolist() == [0x100, 0x101, 0x110]
+        assert n == 3
+        assert BaseKeyAndMask.get_keys_of_all([bkm1, bkm3, bkm2]).tolist() == [
+            0x100, 0x101, 0x110, 0x111, 0x300, 0x200, 0x201, 0x210, 0x211]
+        assert BaseKeyAndMask.get_keys_of_all(
+            [bkm1, bkm3, bkm2], 6).tolist() == [
+            0x100, 0x101, 0x110, 0x111, 0x300, 0x200]
 
     def test_dict_based_machine_partition_n_keys_map(self):
         pmap = DictBasedMachinePartitionNKeysMap()
@@ -0,0 +1,159 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from spinn_machine import MulticastRoutingEntry
+from pacman.model.routing_tables import (
+    ArrayMulticastRoutingTable, UnCompressedMulticastRoutingTable)
+from pacman.exceptions import (
+    PacmanAlreadyExistsException, PacmanRoutingException)
+from pacman.operations.router_compressors import Entry
+
+
+class TestArrayMulticastRoutingTable(unittest.TestCase):
+
+    def _entries(self):
+        return [MulticastRoutingEntry(
+                    0xff000 + i, 0xff000 + i, [i], [i % 6], i % 2 == 0)
+                for i in range(5)]
+
+    def test_same_as_uncompressed(self):
+        entries = self._entries()
+        table = UnCompressedMulticastRoutingTable(1, 2, entries)
+        array_table = ArrayMulticastRoutingTable.from_routing_table(table)
+        self.assertEqual(array_table.x, 1)
+        self.assertEqual(array_table.y, 2)
+        self.assertEqual(array_table.number_of_entries, 5)
+        self.assertEqual(array_table.number_of_defaultable_entries, 3)
+        self.assertEqual(
+            array_table.multicast_routing_entries, entries)
+        for entry in entries:
+            self.assertEqual(
+                array_table.get_multicast_routing_entry_by_routing_entry_key(
+                    entry.routing_entry_key, entry.mask), entry)
+            self.assertEqual(
+                array_table.get_entry_by_routing_entry_key(
+                    entry.routing_entry_key), entry)
+        self.assertIsNone(
+            array_table.get_multicast_routing_entry_by_routing_entry_key(
+                0xff005, 0xff005))
+        self.assertIsNone(array_table.get_entry_by_routing_entry_key(0))
+        self.assertEqual(
+            [(e.key, e.mask, e.spinnaker_route, e.defaultable)
+             for e in Entry.from_routing_table(array_table)],
+            [(e.key, e.mask, e.spinnaker_route, e.defaultable)
+             for e in Entry.from_routing_table(table)])
+
+    def test_add_one_at_a_time(self):
+        entries = self._entries()
+        array_table = ArrayMulticastRoutingTable(0, 0)
+        for entry in entries:
+            array_table.add_multicast_routing_entry(entry)
+        self.assertEqual(array_table.multicast_routing_entries, entries)
+        self.assertEqual(
+            array_table, ArrayMulticastRoutingTable(
+                0, 0, [e.routing_entry_key for e in entries],
+                [e.mask for e in entries],
+                [e.spinnaker_route for e in entries],
+                [e.defaultable for e in entries]))
+        with self.assertRaises(PacmanAlreadyExistsException):
+            array_table.add_multicast_routing_entry(entries[0])
+        self.assertEqual(array_table.number_of_entries, 5)
+
+    def test_entries_kept(self):
+        entries = self._entries()
+        array_table = ArrayMulticastRoutingTable(0, 0)
+        array_table.add_multicast_routing_entry(entries[0])
+        made = array_table.multicast_routing_entries
+        self.assertIs(array_table.multicast_routing_entries, made)
+
+        # Entries added either way are kept up to date
+        array_table.add_entries(
+            [e.routing_entry_key for e in entries[1:3]],
+            [e.mask for e in entries[1:3]],
+            [e.spinnaker_route for e in entries[1:3]],
+            [e.defaultable for e in entries[1:3]])
+        for entry in entries[3:]:
+            array_table.add_multicast_routing_entry(entry)
+        self.assertEqual(array_table.multicast_routing_entries, entries)
+        with self.assertRaises(PacmanAlreadyExistsException):
+            array_table.add_multicast_routing_entry(entries[1])
+
+    def test_lookups_after_adding(self):
+        entries = self._entries()
+        array_table = ArrayMulticastRoutingTable(0, 0)
+        array_table.add_multicast_routing_entry(entries[0])
+        self.assertEqual(
+            array_table.get_entry_by_routing_entry_key(0xff000), entries[0])
+        self.assertIsNone(
+            array_table.get_multicast_routing_entry_by_routing_entry_key(
+                0xff001, 0xff001))
+
+        # Lookups find entries added either way after they were first made
+        array_table.add_entries(
+            [e.routing_entry_key for e in entries[1:3]],
+            [e.mask for e in entries[1:3]],
+            [e.spinnaker_route for e in entries[1:3]],
+            [e.defaultable for e in entries[1:3]])
+        for entry in entries[3:]:
+            array_table.add_multicast_routing_entry(entry)
+        for entry in entries:
+            self.assertEqual(
+                array_table.get_multicast_routing_entry_by_routing_entry_key(
+                    entry.routing_entry_key, entry.mask), entry)
+            self.assertEqual(
+                array_table.get_entry_by_routing_entry_key(
+                    entry.routing_entry_key), entry)
+
+        # As in UnCompressedMulticastRoutingTable, the last entry wins
+        last = MulticastRoutingEntry(0xff000, 0xfff00, [1], [], False)
+        array_table.add_multicast_routing_entry(last)
+        self.assertEqual(
+            array_table.get_entry_by_routing_entry_key(0xff000), last)
+        self.assertEqual(
+            array_table.get_multicast_routing_entry_by_routing_entry_key(
+                0xff000, 0xff000), entries[0])
+
+    def test_equal_to_uncompressed(self):
+        entries = self._entries()
+        table = UnCompressedMulticastRoutingTable(1, 2, entries)
+        array_table = ArrayMulticastRoutingTable.from_routing_table(table)
+        self.assertEqual(array_table, table)
+        self.assertEqual(table, array_table)
+        other = UnCompressedMulticastRoutingTable(1, 2, entries[1:])
+        self.assertNotEqual(array_table, other)
+        self.assertNotEqual(other, array_table)
+
+    def test_duplicate_in_bulk(self):
+        with self.assertRaises(PacmanAlreadyExistsException):
+            ArrayMulticastRoutingTable(
+                0, 0, [1, 2, 1], [0xFF, 0xFF, 0xFF], [1, 2, 3],
+                [False] * 3)
+
+    def test_key_changed_by_mask(self):
+        with self.assertRaises(PacmanRoutingException):
+            ArrayMulticastRoutingTable(0, 0, [0x101], [0xFF00], [1], [False])
+
+    def test_read_only_views(self):
+        array_table = ArrayMulticastRoutingTable(
+            0, 0, [1, 2], [0xFF, 0xFF], [1, 2], [False, True])
+        self.assertEqual(array_table.keys.tolist(), [1, 2])
+        self.assertEqual(array_table.defaultable.tolist(), [False, True])
+        with self.assertRaises(ValueError):
+            array_table.keys[0] = 3
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from spinn_machine import MulticastRoutingEntry
+from pacman.exceptions import (
+    PacmanAlreadyExistsException, PacmanConfigurationException)
+from pacman.model.routing_tables import (
+    MulticastRoutingTables, UnCompressedMulticastRoutingTable)
+from pacman.model.routing_tables.multicast_routing_tables import to_json
+from pacman.model.routing_tables.mapped_multicast_routing_tables import (
+    from_binary, json_to_binary, to_binary)
+
+
+class TestMappedMulticastRoutingTables(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._tables = MulticastRoutingTables()
+        for x, y, n_entries in [(0, 0, 5), (1, 0, 0), (0, 1, 3)]:
+            self._tables.add_routing_table(UnCompressedMulticastRoutingTable(
+                x, y, [MulticastRoutingEntry(
+                    i << 4, 0xFFFFFFF0, [i], [x + y], i % 2 == 1)
+                    for i in range(n_entries)]))
+
+    def tearDown(self):
+        shutil.rmtree(self._folder)
+
+    def _check_same(self, mapped):
+        for table in self._tables:
+            mapped_table = mapped.get_routing_table_for_chip(
+                table.x, table.y)
+            self.assertEqual(mapped_table.multicast_routing_entries,
+                             table.multicast_routing_entries)
+        self.assertIsNone(mapped.get_routing_table_for_chip(1, 1))
+        self.assertEqual(len(mapped.routing_tables), 3)
+
+    def test_round_trip(self):
+        filename = os.path.join(self._folder, "tables.bin")
+        to_binary(self._tables, filename)
+        mapped = from_binary(filename)
+        self.assertEqual(len(list(mapped)), 3)
+        self._check_same(mapped)
+
+    def test_json_to_binary(self):
+        json_filename = os.path.join(self._folder, "tables.json")
+        with open(json_filename, "w") as f:
+            json.dump(to_json(self._tables), f)
+        filename = os.path.join(self._folder, "tables.bin")
+        json_to_binary(json_filename, filename)
+        self._check_same(from_binary(filename))
+
+    def test_add_existing_chip(self):
+        filename = os.path.join(self._folder, "tables.bin")
+        to_binary(self._tables, filename)
+        mapped = from_binary(filename)
+        with self.assertRaises(PacmanAlreadyExistsException):
+            mapped.add_routing_table(UnCompressedMulticastRoutingTable(0, 1))
+        mapped.add_routing_table(UnCompressedMulticastRoutingTable(1, 1))
+        self.assertEqual(len(mapped.routing_tables), 4)
+
+    def test_not_binary(self):
+        filename = os.path.join(self._folder, "tables.json")
+        with open(filename, "w") as f:
+            json.dump(to_json(self._tables), f)
+        with self.assertRaises(PacmanConfigurationException):
+            from_binary(filename)
+
+    def test_empty(self):
+        for size in (0, 2):
+            filename = os.path.join(self._folder, "empty.bin")
+            with open(filename, "wb") as f:
+                f.write(b"P" * size)
+            with self.assertRaises(PacmanConfigurationException):
+                from_binary(filename)
+
+    def test_truncated(self):
+        filename = os.path.join(self._folder, "tables.bin")
+        to_binary(self._tables, filename)
+        with open(filename, "rb") as f:
+            data = f.read()
+        # Cut into the index, into an entry and at the end of an entry
+        for size in (20, len(data) - 3, len(data) - 16):
+            with open(filename, "wb") as f:
+                f.write(data[:size])
+            with self.assertRaises(PacmanConfigurationException):
+                from_binary(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from spinn_machine import MulticastRoutingEntry, virtual_machine
+from pacman.exceptions import PacmanRoutingException
+from pacman.model.constraints.key_allocator_constraints import (
+    ContiguousKeyRangeContraint)
+from pacman.model.graphs.common import Slice
+from pacman.model.graphs.machine import (
+    MachineEdge, MachineGraph, SimpleMachineVertex)
+from pacman.model.placements import Placement, Placements
+from pacman.model.resources import ResourceContainer
+from pacman.model.routing_info import (
+    BaseKeyAndMask, PartitionRoutingInfo, RoutingInfo)
+from pacman.model.routing_tables import (
+    MulticastRoutingTables, UnCompressedMulticastRoutingTable)
+from pacman.operations.multi_cast_router_check_functionality import (
+    validate_routes, validate_routes_in_batches)
+
+
+class TestValidRoutesChecker(unittest.TestCase):
+
+    def setUp(self):
+        # A vertex on (0, 0) sends four keys to (1, 0) and (2, 0)
+        self.machine = virtual_machine(8, 8)
+        self.graph = MachineGraph("Test")
+        source = SimpleMachineVertex(
+            ResourceContainer(), "source", vertex_slice=Slice(0, 3))
+        targets = [SimpleMachineVertex(ResourceContainer(), str(i))
+                   for i in range(2)]
+        self.graph.add_vertices([source] + targets)
+        self.placements = Placements([
+            Placement(source, 0, 0, 1), Placement(targets[0], 1, 0, 2),
+            Placement(targets[1], 2, 0, 3)])
+        for target in targets:
+            self.graph.add_edge(MachineEdge(source, target), "Test")
+        partition = self.graph.get_outgoing_edge_partition_starting_at_vertex(
+            source, "Test")
+        partition.add_constraint(ContiguousKeyRangeContraint())
+        self.routing_infos = RoutingInfo([PartitionRoutingInfo(
+            [BaseKeyAndMask(0x40, 0xFFFFFFFC)], partition)])
+
+    @staticmethod
+    def _routing_tables(tables):
+        return MulticastRoutingTables([
+            UnCompressedMulticastRoutingTable(x, y, [
+                MulticastRoutingEntry(key, mask, processors, links, False)
+                for key, mask, processors, links in entries])
+            for (x, y), entries in tables])
+
+    def _check(self, *tables):
+        for check in (validate_routes, validate_routes_in_batches):
+            self._check_with(check, *tables)
+
+    def _check_with(self, check, *tables):
+        check(self.graph, self.placements, self.routing_infos,
+              self._routing_tables(tables), self.machine)
+
+    def test_valid(self):
+        self._check(
+            ((0, 0), [(0x40, 0xFFFFFFFC, [], [0])]),
+            ((1, 0), [(0x00, 0xFFFFFFC0, [], [4]),
+                      (0x40, 0xFFFFFFF0, [2], [0])]),
+            ((2, 0), [(0x40, 0xFFFFFFFC, [3], [])]))
+
+    def test_missed_destination(self):
+        with self.assertRaises(PacmanRoutingException) as e:
+            self._check(
+                ((0, 0), [(0x40, 0xFFFFFFFC, [], [0])]),
+                ((1, 0), [(0x40, 0xFFFFFFFC, [2, 4], [])]))
+        self.assertIn("failed to locate all destinations", str(e.exception))
+        self.assertIn("[2:0:3]", str(e.exception))
+        self.assertIn("[1:0:4]", str(e.exception))
+
+    def test_no_entry(self):
+        with self.assertRaises(PacmanRoutingException) as e:
+            self._check(
+                ((0, 0), [(0x40, 0xFFFFFFFC, [], [0])]),
+                ((1, 0), [(0x80, 0xFFFFFFFC, [2], [0])]))
+        self.assertEqual(str(e.exception), "no entry located")
+
+    def test_cycle(self):
+        with self.assertRaises(PacmanRoutingException) as e:
+            self._check(
+                ((0, 0), [(0x40, 0xFFFFFFFC, [], [0])]),
+                ((1, 0), [(0x40, 0xFFFFFFFC, [2], [0, 3])]),
+                ((2, 0), [(0x40, 0xFFFFFFFC, [3], [])]))
+        self.assertIn("there is a cycle here", str(e.exception))
+
+    def test_keys_not_covered(self):
+        # Only the first two keys reach (2, 0)
+        tables = (
+            ((0, 0), [(0x40, 0xFFFFFFFC, [], [0])]),
+            ((1, 0), [(0x40, 0xFFFFFFFC, [2], [0])]),
+            ((2, 0), [(0x40, 0xFFFFFFFE, [3], [])]))
+        with self.assertRaises(PacmanRoutingException) as e:
+            self._check_with(validate_routes, *tables)
+        self.assertIn("Full key range not covered", str(e.exception))
+        with self.assertRaises(PacmanRoutingException) as e:
+            self._check_with(validate_routes_in_batches, *tables)
+        self.assertIn("[2, 0, [66, 67], 4294967292]", str(e.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,8 +22,8 @@ from spinn_machine import (
     SDRAM, Link, Router, Chip, machine_from_chips, virtual_machine)
 from pacman.model.graphs.application import ApplicationEdge, ApplicationGraph
 from pacman.exceptions import (
-    PacmanInvalidParameterException, PacmanException,
-    PacmanValueError)
+    PacmanConfigurationException, PacmanInvalidParameterException,
+    PacmanException, PacmanValueError)
 from pacman.model.constraints.partitioner_constraints import (
     MaxVertexAtomsConstraint, FixedVertexAtomsConstraint)
 from pacman.operations.partition_algorithms import BasicPartitioner
@@ -110,6 +110,44 @@ class TestBasicPartitioner(unittest.TestCase):
         self.assertEqual(len(list(graph.vertices)), 3)
         self.assertEqual(len(list(graph.edges)), 4)
 
+    def test_partition_with_implicit_edges(self):
+        """
+        test that implicit edges are the edges that would have been added
+        """
+        self.setup()
+        self.vert1.add_constraint(MaxVertexAtomsConstraint(3))
+        self.vert2.add_constraint(MaxVertexAtomsConstraint(2))
+
+        def edges(edges):
+            return sorted(
+                (edge.pre_vertex.label, edge.post_vertex.label)
+                for edge in edges)
+
+        explicit, _ = self.bp(self.graph, self.machine, 3000)
+        expected_edges = edges(explicit.edges)
+        expected_ends = {
+            vertex.label: edges(explicit.get_edges_ending_at_vertex(vertex))
+            for vertex in explicit.vertices}
+
+        implicit, _ = self.bp(
+            self.graph, self.machine, 3000, implicit_edges=True)
+        self.assertEqual(edges(implicit.edges), expected_edges)
+        for vertex in implicit.vertices:
+            self.assertEqual(
+                edges(implicit.get_edges_ending_at_vertex(vertex)),
+                expected_ends[vertex.label])
+        for partition in implicit.outgoing_edge_partitions:
+            self.assertEqual(partition.n_edges, len(list(partition.edges)))
+            for edge in partition.edges:
+                self.assertIn(edge, partition)
+                self.assertIs(
+                    implicit.get_outgoing_partition_for_edge(edge), partition)
+                self.assertIn(
+                    edge, implicit.get_edges_starting_at_vertex(
+                        partition.pre_vertex))
+            with self.assertRaises(PacmanConfigurationException):
+                partition.add_edge(next(iter(partition.edges)))
+
     def test_partition_on_large_vertex_than_has_to_be_split(self):
         """
         test that partitioning 1 large vertex can make it into 2 small ones
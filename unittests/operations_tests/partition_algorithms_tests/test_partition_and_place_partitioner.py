@@ -29,6 +29,7 @@ from pacman.model.constraints.partitioner_constraints import (
     SameAtomsAsVertexConstraint)
 from pacman.model.resources import PreAllocatedResourceContainer
 from pacman.operations.partition_algorithms import PartitionAndPlacePartitioner
+from pacman.utilities.utility_objs import ResourceTracker
 from uinit_test_objects import NewPartitionerConstraint, SimpleTestVertex
 
 
@@ -393,6 +394,25 @@ class TestPartitionAndPlacePartitioner(unittest.TestCase):
                           self.graph, self.machine,
                           PreAllocatedResourceContainer())
 
+    def test_scale_down_resources_frees_on_failure(self):
+        """
+        test that the resources allocated to the vertices that fit are\
+        freed when a later vertex does not fit
+        """
+        machine = virtual_machine(width=2, height=2)
+        tracker = ResourceTracker(machine, 100)
+        chip = {(0, 0)}
+        before = tracker.get_maximum_resources_available(chip)
+        fits = SimpleTestVertex(1, "Fits", fixed_sdram_value=1000)
+        too_big = SimpleTestVertex(1, "Too big", fixed_sdram_value=2 ** 40)
+        partitioner = PartitionAndPlacePartitioner()
+        with self.assertRaises(PacmanPartitionException):
+            partitioner._scale_down_resources(
+                0, 0, [fits, too_big], 100, tracker, 1, fixed_n_atoms=True)
+        after = tracker.get_maximum_resources_available(chip)
+        self.assertEqual(after.sdram.get_total_sdram(100),
+                         before.sdram.get_total_sdram(100))
+
     def test_operation_with_same_size_as_vertex_constraint_chain(self):
         """ Test that a chain of same size constraints works even when the\
             order of vertices is not correct for the chain
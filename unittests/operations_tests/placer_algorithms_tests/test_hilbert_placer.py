@@ -0,0 +1,54 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+from spinn_machine.virtual_machine import virtual_machine
+from pacman.model.graphs.machine import MachineGraph, SimpleMachineVertex
+from pacman.model.resources import ResourceContainer
+from pacman.operations.rigged_algorithms import HilbertPlacer
+from pacman.operations.rigged_algorithms.hilbert_placer import (
+    hilbert_indices)
+
+
+def test_hilbert_indices():
+    """ Test that the indices are the positions along the curve
+    """
+    placer = HilbertPlacer()
+    for level in range(6):
+        x, y = zip(*placer._hilbert_curve(level))
+        assert numpy.array_equal(
+            hilbert_indices(x, y, level), numpy.arange(4 ** level))
+
+
+def test_hilbert_chips():
+    """ Test that the chips are in the order of the curve, and are reused
+    """
+    machine = virtual_machine(width=12, height=12)
+    placer = HilbertPlacer()
+    chips = placer._generate_hilbert_chips(machine)
+    assert chips == [
+        (x, y) for x, y in placer._hilbert_curve(4)
+        if machine.is_chip_at(x, y)]
+    assert placer._generate_hilbert_chips(machine) is chips
+
+
+def test_place():
+    machine_graph = MachineGraph("Test")
+    for i in range(50):
+        machine_graph.add_vertex(SimpleMachineVertex(
+            resources=ResourceContainer(), label="Vertex_{}".format(i)))
+    machine = virtual_machine(width=8, height=8)
+    placements = HilbertPlacer()(machine_graph, machine, plan_n_timesteps=1)
+    assert placements.n_placements == 50
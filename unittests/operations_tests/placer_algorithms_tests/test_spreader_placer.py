@@ -13,6 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import defaultdict
+import random
 from spinn_machine.virtual_machine import virtual_machine
 from pacman.exceptions import PacmanException
 from pacman.model.graphs.common import EdgeTrafficType
@@ -21,6 +23,7 @@ from pacman.model.graphs.machine import (
 from pacman.model.resources.resource_container import ResourceContainer
 from pacman.model.constraints.placer_constraints import ChipAndCoreConstraint
 from pacman.operations.placer_algorithms import SpreaderPlacer
+from pacman.operations.placer_algorithms.spreader_placer import _ChipOrder
 from pacman.model.routing_info import DictBasedMachinePartitionNKeysMap
 from pacman.operations.chip_id_allocator_algorithms import (
     MallocBasedChipIdAllocator)
@@ -182,3 +185,31 @@ def test_sdram_links():
         raise Exception("should blow up here")
     except PacmanException:
         pass
+
+
+def test_chip_order():
+    """ Test that the chips stay in the order a stable sort by cost gives
+    """
+    chips = [(x, y) for x in range(4) for y in range(4)]
+    cost_per_chip = defaultdict(int)
+    cost_per_chip[2, 2] = 3
+    chip_order = _ChipOrder(chips, cost_per_chip)
+
+    # Not sorted until first asked to be
+    assert list(chip_order) == chips
+    assert len(chip_order) == len(chips)
+    assert (3, 3) in chip_order
+    assert (4, 4) not in chip_order
+
+    expected = sorted(chips, key=lambda chip: cost_per_chip[chip])
+    chip_order.resort([])
+    assert list(chip_order) == expected
+
+    rng = random.Random(1)
+    for _ in range(100):
+        changed = rng.sample(chips, rng.randint(0, 3))
+        for chip in changed:
+            cost_per_chip[chip] += rng.randint(-2, 4)
+        expected = sorted(expected, key=lambda chip: cost_per_chip[chip])
+        chip_order.resort(changed)
+        assert list(chip_order) == expected
@@ -81,6 +81,16 @@ class TestBasicDijkstraRouting(unittest.TestCase):
                 if vertex != vertex_to:
                     self.assertIn(vertex_to, vertices_reached)
 
+    def test_weight_changes_detected(self):
+        # Cached searches are only valid while the weights are unchanged
+        router = BasicDijkstraRouting()
+        router._max_bw = BasicDijkstraRouting.MAX_BW
+        nodes_info = router._initiate_node_info(virtual_machine(2, 2))
+        self.assertTrue(router._update_all_weights(nodes_info))
+        self.assertFalse(router._update_all_weights(nodes_info))
+        nodes_info[0, 0].weights[0] = 2
+        self.assertTrue(router._update_all_weights(nodes_info))
+
 
 if __name__ == '__main__':
     unittest.main()
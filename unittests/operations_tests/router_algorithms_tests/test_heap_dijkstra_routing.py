@@ -0,0 +1,102 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import unittest
+from spinn_machine.virtual_machine import virtual_machine
+from pacman.exceptions import PacmanRoutingException
+from pacman.model.graphs.machine import (
+    MachineGraph, MachineEdge, SimpleMachineVertex)
+from pacman.model.placements import Placements, Placement
+from pacman.model.resources import ResourceContainer
+from pacman.operations.router_algorithms import (
+    BasicDijkstraRouting, HeapDijkstraRouting)
+
+
+def _make_graph(machine, n_vertices, n_edges_per_vertex, seed, dense=False):
+    random.seed(seed)
+    graph = MachineGraph("Test")
+    placements = Placements()
+    cores = [(chip.x, chip.y, processor.processor_id)
+             for chip in machine.chips for processor in chip.processors
+             if not processor.is_monitor]
+    if dense:
+        cores = cores[:n_vertices]
+    else:
+        cores = random.sample(cores, n_vertices)
+    vertices = list()
+    for x, y, p in cores:
+        vertex = SimpleMachineVertex(resources=ResourceContainer())
+        graph.add_vertex(vertex)
+        placements.add_placement(Placement(vertex, x, y, p))
+        vertices.append(vertex)
+    for vertex in vertices:
+        for vertex_to in random.sample(vertices, n_edges_per_vertex):
+            graph.add_edge(MachineEdge(vertex, vertex_to), "Test")
+    return graph, placements
+
+
+def _describe(routing_paths):
+    return [
+        ((x, y), [(partition.pre_vertex.label,
+                   sorted(entry.link_ids), sorted(entry.processor_ids),
+                   entry.incoming_link, entry.incoming_processor)
+                  for partition, entry in routing_paths.get_entries_for_router(
+                      x, y).items()])
+        for x, y in routing_paths.get_routers()]
+
+
+class TestHeapDijkstraRouting(unittest.TestCase):
+
+    def _check_same_as_basic(self, machine, seed, dense=False):
+        graph, placements = _make_graph(machine, 60, 6, seed, dense)
+        for vertex in graph.vertices:
+            vertex._label = str(placements.get_placement_of_vertex(vertex))
+        basic = BasicDijkstraRouting()(
+            placements, machine, graph, use_progress_bar=False)
+        heap = HeapDijkstraRouting()(
+            placements, machine, graph, use_progress_bar=False)
+        self.assertEqual(_describe(heap), _describe(basic))
+
+    def test_same_as_basic(self):
+        self._check_same_as_basic(virtual_machine(8, 8), 1)
+
+    def test_same_as_basic_sharing_chips(self):
+        # Placements on the same chip carry on the same search
+        self._check_same_as_basic(virtual_machine(8, 8), 3, dense=True)
+
+    def test_same_as_basic_with_holes(self):
+        machine = virtual_machine(
+            12, 12, down_chips=[(2, 3), (5, 5), (6, 5), (9, 1)])
+        self._check_same_as_basic(machine, 2)
+
+    def test_unreachable(self):
+        machine = virtual_machine(
+            8, 8, down_links=[(0, 0, link) for link in range(6)])
+        graph = MachineGraph("Test")
+        placements = Placements()
+        source = SimpleMachineVertex(resources=ResourceContainer())
+        target = SimpleMachineVertex(resources=ResourceContainer())
+        graph.add_vertices([source, target])
+        placements.add_placement(Placement(source, 0, 0, 1))
+        placements.add_placement(Placement(target, 1, 1, 1))
+        graph.add_edge(MachineEdge(source, target), "Test")
+        with self.assertRaises(PacmanRoutingException):
+            HeapDijkstraRouting()(
+                placements, machine, graph, use_progress_bar=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
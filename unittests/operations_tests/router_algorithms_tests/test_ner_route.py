@@ -0,0 +1,96 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import unittest
+from spinn_machine.virtual_machine import virtual_machine
+from pacman.model.graphs.machine import (
+    MachineGraph, MachineEdge, SimpleMachineVertex)
+from pacman.model.placements import Placements, Placement
+from pacman.model.resources import ResourceContainer
+from pacman.operations.router_algorithms import NerRoute
+from pacman.operations.router_algorithms.ner_route import (
+    _nearest_route_node)
+
+
+class TestNerRoute(unittest.TestCase):
+
+    def _check_nearest_route_node(self, machine, n_nodes):
+        random.seed(n_nodes)
+        chips = [(chip.x, chip.y) for chip in machine.chips]
+        route = dict()
+        order = dict()
+        for key in random.sample(chips, n_nodes):
+            route[key] = None
+            order[key] = len(order)
+        for destination in chips:
+            expected = None
+            expected_distance = None
+            for key in route:
+                distance = machine.get_vector_length(key, destination)
+                if distance <= 3 and (
+                        expected is None or distance < expected_distance):
+                    expected = key
+                    expected_distance = distance
+            self.assertEqual(
+                _nearest_route_node(route, order, destination, 3, machine),
+                expected)
+
+    def test_nearest_route_node_no_wrap(self):
+        machine = virtual_machine(16, 16)
+        self._check_nearest_route_node(machine, 4)
+        self._check_nearest_route_node(machine, 60)
+
+    def test_nearest_route_node_wrap(self):
+        machine = virtual_machine(12, 12)
+        self._check_nearest_route_node(machine, 4)
+        self._check_nearest_route_node(machine, 60)
+
+    def test_parallel_same_as_serial(self):
+        machine = virtual_machine(
+            12, 12, down_chips=[(3, 3)], down_links=[(5, 5, 0), (6, 5, 3)])
+        random.seed(1)
+        graph = MachineGraph("Test")
+        placements = Placements()
+        cores = [(chip.x, chip.y, processor.processor_id)
+                 for chip in machine.chips for processor in chip.processors
+                 if not processor.is_monitor]
+        vertices = list()
+        for x, y, p in random.sample(cores, 80):
+            vertex = SimpleMachineVertex(
+                resources=ResourceContainer(), label=str((x, y, p)))
+            graph.add_vertex(vertex)
+            placements.add_placement(Placement(vertex, x, y, p))
+            vertices.append(vertex)
+        for vertex in vertices:
+            for vertex_to in random.sample(vertices, 10):
+                graph.add_edge(MachineEdge(vertex, vertex_to), "Test")
+
+        def describe(routing_tables):
+            return [
+                ((x, y), [(partition.pre_vertex.label, entry.link_ids,
+                           entry.processor_ids, entry.incoming_link,
+                           entry.incoming_processor)
+                          for partition, entry in
+                          routing_tables.get_entries_for_router(x, y).items()])
+                for x, y in routing_tables.get_routers()]
+
+        serial = NerRoute()(graph, machine, placements)
+        parallel = NerRoute()(graph, machine, placements, n_processes=2)
+        self.assertEqual(describe(parallel), describe(serial))
+
+
+if __name__ == '__main__':
+    unittest.main()
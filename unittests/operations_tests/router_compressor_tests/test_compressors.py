@@ -13,12 +13,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import shutil
+import tempfile
+import time
 import unittest
 from spinn_machine import MulticastRoutingEntry
+from pacman.exceptions import MinimisationFailedError
+from pacman.executor import PACMANAlgorithmExecutor
 from pacman.model.routing_tables import (
     UnCompressedMulticastRoutingTable, MulticastRoutingTables)
 from pacman.operations.router_compressors.routing_compression_checker import (
     compare_tables)
+from pacman.operations.router_compressors import (
+    CompressionCache, PortfolioCompressor)
 from pacman.operations.router_compressors.pair_compressor import (
     PairCompressor)
 from pacman.operations.router_compressors.unordered_compressor import (
@@ -72,6 +80,204 @@ class MyTestCase(unittest.TestCase):
         compressed_tables = compressor(self.original_tables)
         self.check_compression(compressed_tables)
 
+    def test_portfolio_compressor(self):
+        compressor = PortfolioCompressor()
+        compressed_tables = compressor(self.original_tables)
+        self.check_compression(compressed_tables)
+        winner, timings = compressor.records[0, 0]
+        self.assertIn(winner, timings)
+        self.assertEqual(
+            list(timings), ["PairCompressor", "MundyRouterCompressor"])
+
+    def test_portfolio_escalates(self):
+        self.add_bigger_tables()
+        compressor = PortfolioCompressor()
+        compressor(self.original_tables, target_length=1000)
+        for winner, timings in compressor.records.values():
+            # Pair compression is enough to get under the target
+            self.assertEqual(winner, "PairCompressor")
+            self.assertIsNone(timings["MundyRouterCompressor"])
+        # No compressor can get under this target, so all are tried
+        compressor(self.original_tables, target_length=1)
+        for winner, timings in compressor.records.values():
+            self.assertIsNotNone(timings["MundyRouterCompressor"])
+
+    def test_portfolio_race(self):
+        self.add_bigger_tables()
+        serial = PortfolioCompressor()(self.original_tables, target_length=1)
+        compressor = PortfolioCompressor()
+        raced = compressor(
+            self.original_tables, target_length=1, race=True, time_budget=60)
+        self.check_same_entries(serial, raced)
+        self.assertEqual(len(compressor.records), 6)
+
+    def test_portfolio_time_budget(self):
+        # The slow compressor is stopped once out of time, as the result
+        # of the pair compressor fits in a router
+        compressor = PortfolioCompressor([PairCompressor, SlowPairCompressor])
+        compressor(
+            self.original_tables, target_length=1, race=True,
+            time_budget=0.1)
+        winner, timings = compressor.records[0, 0]
+        self.assertEqual(winner, "PairCompressor")
+        self.assertIsNone(timings["SlowPairCompressor"])
+
+        # With no result that fits, the slow compressor is waited for
+        compressor = PortfolioCompressor(
+            [FailingCompressor, SlowPairCompressor])
+        compressed = compressor(
+            self.original_tables, target_length=1, race=True,
+            time_budget=0.1)
+        self.check_compression(compressed)
+        winner, timings = compressor.records[0, 0]
+        self.assertEqual(winner, "SlowPairCompressor")
+        self.assertGreater(
+            timings["SlowPairCompressor"].total_seconds(), 0.1)
+
+    def test_portfolio_all_fail(self):
+        compressor = PortfolioCompressor([FailingCompressor])
+        with self.assertRaises(MinimisationFailedError):
+            compressor(self.original_tables, race=True, time_budget=10)
+        winner, timings = compressor.records[0, 0]
+        self.assertIsNone(winner)
+        self.assertIsNotNone(timings["FailingCompressor"])
+
+    def test_portfolio_executor(self):
+        executor = PACMANAlgorithmExecutor(
+            ["PortfolioCompressor"], [],
+            {"MemoryRoutingTables": self.original_tables},
+            ["MemoryCompressedRoutingTables", "CompressionRecords"], [], [])
+        executor.execute_mapping()
+        self.check_compression(
+            executor.get_item("MemoryCompressedRoutingTables"))
+        winner, _ = executor.get_item("CompressionRecords")[0, 0]
+        self.assertEqual(winner, "PairCompressor")
+
+    def add_bigger_tables(self):
+        for x in range(1, 6):
+            table = UnCompressedMulticastRoutingTable(x=x, y=0)
+            for key in range(20 * x):
+                table.add_multicast_routing_entry(MulticastRoutingEntry(
+                    key << 4, 0xFFFFFFF0, [key // 4 % 3], [], key % 2 == 0))
+            self.original_tables.add_routing_table(table)
+
+    def check_same_entries(self, compressed_a, compressed_b):
+        for original in self.original_tables:
+            entries_a = compressed_a.get_routing_table_for_chip(
+                original.x, original.y).multicast_routing_entries
+            entries_b = compressed_b.get_routing_table_for_chip(
+                original.x, original.y).multicast_routing_entries
+            self.assertEqual(
+                [(entry.routing_entry_key, entry.mask,
+                  entry.spinnaker_route, entry.defaultable)
+                 for entry in entries_a],
+                [(entry.routing_entry_key, entry.mask,
+                  entry.spinnaker_route, entry.defaultable)
+                 for entry in entries_b])
+
+    def test_parallel_same_as_serial(self):
+        self.add_bigger_tables()
+        for compressor_class in (
+                PairCompressor, UnorderedCompressor, MundyRouterCompressor):
+            serial = compressor_class()(self.original_tables)
+            parallel = compressor_class()(self.original_tables, n_processes=2)
+            self.check_compression(parallel)
+            self.check_same_entries(serial, parallel)
+
+    def test_cache(self):
+        self.add_bigger_tables()
+        cache_directory = tempfile.mkdtemp()
+        try:
+            uncached = PairCompressor()(self.original_tables)
+            first = CountingPairCompressor()(
+                self.original_tables, cache_directory=cache_directory)
+            self.assertEqual(CountingPairCompressor.n_compressed, 6)
+            second = CountingPairCompressor()(
+                self.original_tables, cache_directory=cache_directory)
+            self.assertEqual(CountingPairCompressor.n_compressed, 6)
+            self.check_same_entries(uncached, first)
+            self.check_same_entries(uncached, second)
+
+            # Only the files used most recently are kept within the size
+            names = sorted(os.listdir(cache_directory))
+            self.assertEqual(len(names), 6)
+            for i, name in enumerate(names):
+                os.utime(os.path.join(cache_directory, name), (i, i))
+            newest = os.path.getsize(os.path.join(cache_directory, names[-1]))
+            CompressionCache(cache_directory, newest).trim()
+            self.assertEqual(os.listdir(cache_directory), names[-1:])
+
+            # Files left half written are deleted once old, and files
+            # which vanish while trimming are passed over
+            for name in ("old.partial", "new.partial"):
+                open(os.path.join(cache_directory, name), "wb").close()
+            os.utime(os.path.join(cache_directory, "old.partial"), (0, 0))
+            os.symlink(os.path.join(cache_directory, "gone"),
+                       os.path.join(cache_directory, "gone.entries"))
+            CompressionCache(cache_directory, newest).trim()
+            self.assertEqual(
+                sorted(os.listdir(cache_directory)),
+                sorted(names[-1:] + ["gone.entries", "new.partial"]))
+        finally:
+            shutil.rmtree(cache_directory)
+
+    def test_portfolio_cache(self):
+        self.add_bigger_tables()
+        cache_directory = tempfile.mkdtemp()
+        try:
+            first = PortfolioCompressor()(
+                self.original_tables, target_length=1,
+                cache_directory=cache_directory)
+            compressor = PortfolioCompressor()
+            second = compressor(
+                self.original_tables, target_length=1,
+                cache_directory=cache_directory)
+            self.check_same_entries(first, second)
+            for winner, timings in compressor.records.values():
+                self.assertEqual(winner, PortfolioCompressor.FROM_CACHE)
+                self.assertEqual(
+                    list(timings), ["PairCompressor", "MundyRouterCompressor"])
+                self.assertIsNone(timings["PairCompressor"])
+
+            # A portfolio of other compressors does not use those tables
+            compressor = PortfolioCompressor([PairCompressor])
+            compressor(
+                self.original_tables, target_length=1,
+                cache_directory=cache_directory)
+            for winner, _ in compressor.records.values():
+                self.assertEqual(winner, "PairCompressor")
+        finally:
+            shutil.rmtree(cache_directory)
+
+
+class CountingPairCompressor(PairCompressor):
+    """ A PairCompressor which counts the tables it compresses
+    """
+
+    n_compressed = 0
+
+    def compress_table(self, router_table):
+        CountingPairCompressor.n_compressed += 1
+        return super(CountingPairCompressor, self).compress_table(
+            router_table)
+
+
+class SlowPairCompressor(PairCompressor):
+    """ A PairCompressor which takes at least half a second per table
+    """
+
+    def compress_table(self, router_table):
+        time.sleep(0.5)
+        return super(SlowPairCompressor, self).compress_table(router_table)
+
+
+class FailingCompressor(PairCompressor):
+    """ A compressor which fails to compress any table
+    """
+
+    def compress_table(self, router_table):
+        raise MinimisationFailedError("Failed on purpose")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,57 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import unittest
+from pacman.operations.router_compressors import Entry
+from pacman.operations.router_compressors.mundys_router_compressor.\
+    ordered_covering import (
+        _get_best_merge, _MergeCache, get_generality, ordered_covering)
+
+
+class TestOrderedCovering(unittest.TestCase):
+
+    def _table(self, seed):
+        rng = random.Random(seed)
+        keys = rng.sample(range(1 << 12), 300)
+        return [Entry(key << 4, 0xFFFFFFF0 if rng.random() < 0.8 else
+                      0xFFFFFF00, False, rng.choice([1, 2, 4, 8, 16]))
+                for key in keys]
+
+    def test_same_as_uncached(self):
+        for seed in range(3):
+            table = sorted(
+                self._table(seed),
+                key=lambda entry: get_generality(entry.key, entry.mask))
+            aliases = {}
+            merges = _MergeCache()
+            while True:
+                expected = _get_best_merge(table, aliases)
+                merge = merges.get_best_merge(table, aliases)
+                self.assertEqual(merge.goodness, expected.goodness)
+                self.assertEqual(merge.entries, expected.entries)
+                if merge.goodness <= 0:
+                    break
+                table, aliases = merge.apply(aliases)
+                merges.merge_applied(merge)
+            self.assertLess(len(table), 300)
+
+    def test_target_length(self):
+        table, _ = ordered_covering(self._table(0), 250, no_raise=True)
+        self.assertLessEqual(len(table), 250)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from spinn_machine import MulticastRoutingEntry
+from pacman.exceptions import PacmanRoutingException
+from pacman.model.routing_tables import UnCompressedMulticastRoutingTable
+from pacman.operations.router_compressors.routing_compression_checker import (
+    calc_remainders, compare_tables, covers)
+
+
+class TestRoutingCompressionChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.original = UnCompressedMulticastRoutingTable(0, 0, [
+            MulticastRoutingEntry(0b0000, 0b1111, [1], [], False),
+            MulticastRoutingEntry(0b0001, 0b1111, [1], [], False),
+            MulticastRoutingEntry(0b0010, 0b1111, [1], [], False),
+            MulticastRoutingEntry(0b0100, 0b1111, [2], [], False),
+            MulticastRoutingEntry(0b1000, 0b1111, [], [3], True)])
+
+    def _compressed(self, *entries):
+        return UnCompressedMulticastRoutingTable(0, 0, [
+            MulticastRoutingEntry(key, mask, processors, links, defaultable)
+            for key, mask, processors, links, defaultable in entries])
+
+    def test_covers(self):
+        self.assertTrue(covers(0b0100, 0b1100, 0b0000, 0b0000))
+        self.assertTrue(covers(0b0100, 0b1100, 0b0110, 0b0111))
+        self.assertFalse(covers(0b0100, 0b1100, 0b1000, 0b1000))
+
+    def test_calc_remainders(self):
+        # **** less 1*01 is ***0, **11 and 0*01, which match no key twice
+        self.assertEqual(
+            calc_remainders(0b0000, 0b0000, 0b1001, 0b1011),
+            [(0b0000, 0b0001), (0b0011, 0b0011), (0b0001, 0b1011)])
+        self.assertEqual(calc_remainders(0b0100, 0b1100, 0, 0), [])
+
+    def test_same_table(self):
+        compare_tables(self.original, self.original)
+
+    def test_compressed(self):
+        compare_tables(self.original, self._compressed(
+            (0b0100, 0b1111, [2], [], False),
+            (0b0000, 0b1100, [1], [], False)))
+
+    def test_missing_route(self):
+        with self.assertRaises(PacmanRoutingException) as e:
+            compare_tables(self.original, self._compressed(
+                (0b0000, 0b1100, [1], [], False)))
+        self.assertIn("No route found", str(e.exception))
+
+    def test_different_processors(self):
+        with self.assertRaises(PacmanRoutingException) as e:
+            compare_tables(self.original, self._compressed(
+                (0b0000, 0b1000, [1], [], False)))
+        self.assertIn("different processor_ids", str(e.exception))
+
+    def test_different_links(self):
+        with self.assertRaises(PacmanRoutingException) as e:
+            compare_tables(self.original, self._compressed(
+                (0b0100, 0b1111, [2], [], False),
+                (0b0000, 0b1100, [1], [], False),
+                (0b1000, 0b1000, [], [4], False)))
+        self.assertIn("different link_ids", str(e.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
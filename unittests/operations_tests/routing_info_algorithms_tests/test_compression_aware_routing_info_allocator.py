@@ -0,0 +1,78 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from pacman.model.graphs.machine import (
+    MachineEdge, MachineGraph, SimpleMachineVertex)
+from pacman.model.resources import ResourceContainer
+from pacman.model.routing_info import DictBasedMachinePartitionNKeysMap
+from pacman.model.routing_table_by_partition import (
+    MulticastRoutingTableByPartition, MulticastRoutingTableByPartitionEntry)
+from pacman.operations.routing_info_allocator_algorithms import (
+    CompressionAwareRoutingInfoAllocator)
+
+
+class TestCompressionAwareRoutingInfoAllocator(unittest.TestCase):
+
+    def test_allocate(self):
+        machine_graph = MachineGraph("Test")
+        n_keys_map = DictBasedMachinePartitionNKeysMap()
+        vertices = [SimpleMachineVertex(ResourceContainer())
+                    for _ in range(5)]
+        machine_graph.add_vertices(vertices)
+        partitions = list()
+        for vertex in vertices[:4]:
+            machine_graph.add_edge(MachineEdge(vertex, vertices[4]), "P")
+            partition = machine_graph.\
+                get_outgoing_edge_partition_starting_at_vertex(vertex, "P")
+            n_keys_map.set_n_keys_for_partition(partition, 10)
+            partitions.append(partition)
+
+        # The first two partitions take the same routes, and the third
+        # shares one of them
+        routing_tables = MulticastRoutingTableByPartition()
+        for partition, routes in zip(partitions, [
+                [((0, 0), [0], []), ((1, 0), [], [1])],
+                [((0, 0), [0], []), ((1, 0), [], [1])],
+                [((0, 0), [0], []), ((1, 0), [], [2])],
+                [((0, 1), [1], [])]]):
+            for (x, y), links, processors in routes:
+                routing_tables.add_path_entry(
+                    MulticastRoutingTableByPartitionEntry(links, processors),
+                    x, y, partition)
+
+        routing_infos, estimates = CompressionAwareRoutingInfoAllocator()(
+            machine_graph, n_keys_map, routing_tables)
+        self.assertEqual(
+            [routing_infos.get_first_key_from_partition(partition)
+             for partition in partitions], [0, 16, 32, 48])
+        for partition in partitions:
+            self.assertEqual(
+                routing_infos.get_routing_info_from_partition(
+                    partition).first_mask, 0xFFFFFFF0)
+
+        # On (1, 0) the routes of the first two and the third differ
+        self.assertEqual(estimates, {(0, 0): 1, (1, 0): 2, (0, 1): 1})
+
+    def test_no_partitions(self):
+        routing_infos, estimates = CompressionAwareRoutingInfoAllocator()(
+            MachineGraph("Test"), DictBasedMachinePartitionNKeysMap(),
+            MulticastRoutingTableByPartition())
+        self.assertEqual(list(routing_infos), [])
+        self.assertEqual(estimates, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
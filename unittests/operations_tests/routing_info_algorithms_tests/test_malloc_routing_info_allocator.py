@@ -113,6 +113,19 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(allocator._free_space_tracker[2].size,
                          0x100000000 - 0x1800, error)
 
+    def test_find_aligned_space(self):
+        allocator = MallocBasedRoutingInfoAllocator()
+        allocator._allocate_elements(0x10, 0x10)
+        allocator._allocate_elements(0x48, 0x8)
+        self.assertEqual(allocator._find_aligned_space(0x10), 0)
+        self.assertEqual(allocator._find_aligned_space(0x20), 0x20)
+        allocator._allocate_elements(0x20, 0x20)
+        self.assertEqual(allocator._find_aligned_space(0x20), 0x60)
+        self.assertEqual(allocator._find_aligned_space(0x8), 0)
+        allocator._allocate_elements(0, 0x10)
+        self.assertEqual(allocator._find_aligned_space(0x8), 0x40)
+        self.assertEqual(allocator._find_aligned_space(0x200000000), None)
+
     def _integration_setup(self):
         machine_graph = MachineGraph(label="test me you git")
         n_keys_map = DictBasedMachinePartitionNKeysMap()
@@ -0,0 +1,61 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from pacman.utilities.utility_objs import ChipCapacityIndex, ChipSelection
+
+
+class TestChipCapacityIndex(unittest.TestCase):
+
+    def _index(self):
+        keys = [(x, 0) for x in range(5)]
+        index = ChipCapacityIndex(keys)
+        index.update((0, 0), 0, 1000)
+        index.update((1, 0), 3, 100)
+        index.update((2, 0), 1, 500)
+        index.update((3, 0), 2, 200)
+        index.update((4, 0), 1, 300)
+        return index
+
+    def test_first_fit(self):
+        index = self._index()
+        self.assertEqual(index.first_fit(50), (1, 0))
+        self.assertEqual(index.first_fit(150), (2, 0))
+        self.assertEqual(index.first_fit(150, 2), (3, 0))
+        self.assertEqual(index.first_fit(50, 3), (1, 0))
+        self.assertIsNone(index.first_fit(150, 3))
+        self.assertIsNone(index.first_fit(600))
+
+    def test_best_fit(self):
+        index = self._index()
+        self.assertEqual(index.best_fit(250), (4, 0))
+        self.assertEqual(index.best_fit(400), (2, 0))
+        self.assertEqual(index.best_fit(150, 2), (3, 0))
+        self.assertEqual(index.find(ChipSelection.BEST_FIT, 50), (4, 0))
+        self.assertIsNone(index.best_fit(600))
+
+    def test_update(self):
+        index = self._index()
+        index.update((1, 0), 0, 100)
+        index.update((0, 0), 2, 1000)
+        index.update((9, 9), 18, 1000)
+        self.assertNotIn((9, 9), index)
+        self.assertEqual(index.first_fit(50), (0, 0))
+        self.assertEqual(index.first_fit(50, 3), None)
+        self.assertEqual(index.best_fit(400, 2), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+import numpy
+from spinn_machine import machine_from_size, virtual_machine
+from pacman.utilities.algorithm_utilities import MachineTopology
+
+
+class TestMachineTopology(unittest.TestCase):
+
+    def _check_same_as_machine(self, machine):
+        keys = [(x, y) for x in range(machine.width)
+                for y in range(machine.height)]
+        sources = numpy.array(keys)[:, numpy.newaxis]
+        destinations = numpy.array(keys)[numpy.newaxis]
+        topology = MachineTopology(machine)
+        lengths = topology.vector_lengths(sources, destinations)
+        vectors = topology.vectors(sources, destinations)
+        for i, source in enumerate(keys):
+            for j, destination in enumerate(keys):
+                self.assertEqual(
+                    lengths[i, j],
+                    machine.get_vector_length(source, destination))
+                self.assertEqual(
+                    tuple(vectors[i, j]),
+                    machine.get_vector(source, destination))
+
+    def test_no_wrap(self):
+        self._check_same_as_machine(machine_from_size(8, 8))
+
+    def test_full_wrap(self):
+        self._check_same_as_machine(machine_from_size(12, 12))
+
+    def test_horizontal_wrap(self):
+        self._check_same_as_machine(machine_from_size(12, 8))
+
+    def test_vertical_wrap(self):
+        self._check_same_as_machine(machine_from_size(8, 12))
+
+    def test_coordinates(self):
+        machine = virtual_machine(8, 8)
+        topology = MachineTopology.of(machine)
+        self.assertIs(MachineTopology.of(machine), topology)
+        self.assertEqual(len(topology.coordinates), machine.n_chips)
+        for chip in machine.chips:
+            self.assertEqual(
+                tuple(topology.coordinates[topology.ids[chip.x, chip.y]]),
+                (chip.x, chip.y))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,9 +18,11 @@ from spinn_machine import (
     virtual_machine, Chip, Router, SDRAM, machine_from_chips)
 from pacman.model.resources import (
     ResourceContainer, ConstantSDRAM, PreAllocatedResourceContainer,
-    CoreResource, SpecificCoreResource)
-from pacman.exceptions import PacmanValueError
-from pacman.utilities.utility_objs import ResourceTracker
+    CoreResource, SpecificCoreResource, IPtagResource)
+from pacman.exceptions import (
+    PacmanInvalidParameterException, PacmanValueError)
+from pacman.utilities.utility_objs import (
+    ArrayResourceTracker, ChipSelection, ResourceTracker)
 
 
 class TestResourceTracker(unittest.TestCase):
@@ -123,6 +125,217 @@ class TestResourceTracker(unittest.TestCase):
             resource_tracker.allocate_resources(
                 ResourceContainer(sdram=ConstantSDRAM(1024)))
 
+    def test_chip_selection(self):
+        machine = virtual_machine(width=2, height=2, n_cpus_per_chip=5)
+        keys = list(machine.chip_coordinates)
+        sdram = machine.get_chip_at(*keys[0]).sdram.size
+        small = ResourceContainer(sdram=ConstantSDRAM(500))
+        big = ResourceContainer(sdram=ConstantSDRAM(sdram - 2000))
+        expected = {
+            ChipSelection.ORDERED: keys[0],
+            ChipSelection.FIRST_FIT: keys[0],
+            ChipSelection.BEST_FIT: keys[2]}
+        for selection in ChipSelection:
+            tracker = ResourceTracker(
+                machine, plan_n_timesteps=None, chip_selection=selection)
+            tracker.allocate_resources(big, [keys[2]])
+            x, y, _, _, _ = tracker.allocate_resources(small)
+            self.assertEqual((x, y), expected[selection])
+
+            # A request that does not fit on the partly used chip
+            x, y, _, _, _ = tracker.allocate_resources(big)
+            self.assertEqual((x, y), keys[0])
+
+            # A chip with no cores left is never chosen
+            tracker.allocate_resources(small, [keys[2]])
+            tracker.allocate_resources(small, [keys[2]])
+            x, y, _, _, _ = tracker.allocate_resources(small)
+            self.assertNotEqual((x, y), keys[2])
+
+    def test_chip_selection_matches_ordered(self):
+        machine = virtual_machine(width=8, height=8)
+        resources = ResourceContainer(sdram=ConstantSDRAM(10000000))
+        ordered = ResourceTracker(machine, plan_n_timesteps=None)
+        indexed = ResourceTracker(
+            machine, plan_n_timesteps=None,
+            chip_selection=ChipSelection.FIRST_FIT)
+        for _ in range(500):
+            self.assertEqual(
+                ordered.allocate_resources(resources)[:2],
+                indexed.allocate_resources(resources)[:2])
+        group = [resources, resources, resources]
+        self.assertEqual(
+            [r[:2] for r in ordered.allocate_group_resources(
+                group, processor_ids=[None] * 3, group_ip_tags=[None] * 3,
+                group_reverse_ip_tags=[None] * 3)],
+            [r[:2] for r in indexed.allocate_group_resources(
+                group, processor_ids=[None] * 3, group_ip_tags=[None] * 3,
+                group_reverse_ip_tags=[None] * 3)])
+
+    def test_array_tracker_matches(self):
+        machine = virtual_machine(width=8, height=8)
+        chip = machine.get_chip_at(1, 1)
+        preallocated_resources = PreAllocatedResourceContainer(
+            specific_core_resources=[
+                SpecificCoreResource(chip=chip, cores=[1, 3])],
+            core_resources=[CoreResource(chip=chip, n_cores=2)])
+        trackers = [
+            tracker_class(machine, plan_n_timesteps=None,
+                          preallocated_resources=preallocated_resources)
+            for tracker_class in (ResourceTracker, ArrayResourceTracker)]
+        resources = ResourceContainer(sdram=ConstantSDRAM(20000000))
+        board = machine.get_chip_at(0, 0).ip_address
+        allocations = list()
+        for i in range(150):
+            results = [
+                tracker.allocate_resources(
+                    resources, board_address=board if i % 3 else None)
+                for tracker in trackers]
+            self.assertEqual(results[0][:2], results[1][:2])
+            allocations.append(results)
+        for results in allocations[::2]:
+            for tracker, (x, y, p, ip_tags, rip_tags) in zip(
+                    trackers, results):
+                tracker.unallocate_resources(
+                    x, y, p, resources, ip_tags, rip_tags)
+        self.assertEqual(
+            trackers[0].allocate_resources(resources, [(1, 1)], 2)[:3],
+            trackers[1].allocate_resources(resources, [(1, 1)], 2)[:3])
+        for tracker in trackers:
+            with self.assertRaises(PacmanValueError):
+                tracker.allocate_resources(resources, [(1, 1)], 3)
+        self.assertEqual(
+            trackers[0].get_maximum_resources_available().sdram.fixed,
+            trackers[1].get_maximum_resources_available().sdram.fixed)
+        self.assertEqual(
+            trackers[0]._available_resources(machine.chip_coordinates),
+            trackers[1]._available_resources(machine.chip_coordinates))
+        self.assertEqual(trackers[0].chips_used, trackers[1].chips_used)
+
+    def test_array_tracker_cores(self):
+        machine = virtual_machine(width=2, height=2, n_cpus_per_chip=18)
+        chip = machine.get_chip_at(0, 0)
+        tracker = ArrayResourceTracker(machine, plan_n_timesteps=None)
+        self.assertEqual(tracker._n_cores_available(chip, (0, 0), None), 17)
+        self.assertEqual(tracker._n_cores_available(chip, (0, 0), 0), 0)
+        self.assertEqual(tracker._allocate_core(chip, (0, 0), None), 1)
+        self.assertEqual(tracker._allocate_core(chip, (0, 0), 5), 5)
+        self.assertEqual(tracker._allocate_core(chip, (0, 0), None), 2)
+        self.assertEqual(tracker._n_cores_available(chip, (0, 0), 5), 0)
+        self.assertEqual(tracker._n_cores_available(chip, (0, 0), None), 14)
+        tracker.unallocate_resources(
+            0, 0, 1, ResourceContainer(), None, None)
+        self.assertEqual(tracker._best_core_available(chip), 1)
+
+    def test_allocate_many(self):
+        machine = virtual_machine(width=8, height=8)
+        sdram = machine.get_chip_at(0, 0).sdram.size
+        resources = ResourceContainer(sdram=ConstantSDRAM(sdram // 5))
+        for selection in ChipSelection:
+            single = ResourceTracker(
+                machine, plan_n_timesteps=None, chip_selection=selection)
+            bulk = ResourceTracker(
+                machine, plan_n_timesteps=None, chip_selection=selection)
+            expected = [single.allocate_resources(resources)[:2]
+                        for _ in range(23)]
+            allocations = bulk.allocate_many(resources, 23)
+            self.assertEqual([(x, y) for x, y, _ in allocations], expected)
+            self.assertEqual(len(set(allocations)), 23)
+            self.assertEqual(single.chips_used, bulk.chips_used)
+
+    def test_allocate_many_fails_cleanly(self):
+        machine = virtual_machine(width=2, height=2, n_cpus_per_chip=5)
+        tracker = ResourceTracker(machine, plan_n_timesteps=None)
+        resources = ResourceContainer(sdram=ConstantSDRAM(1000))
+        with self.assertRaises(PacmanValueError):
+            tracker.allocate_many(resources, 17)
+        self.assertEqual(tracker.chips_used, 0)
+        self.assertEqual(len(tracker.allocate_many(resources, 16)), 16)
+
+    def _check_rollback(self, tracker_class):
+        machine = virtual_machine(width=2, height=2, n_cpus_per_chip=5)
+        tracker = tracker_class(machine, plan_n_timesteps=None)
+        resources = ResourceContainer(
+            sdram=ConstantSDRAM(1000),
+            iptags=[IPtagResource("1.2.3.4", 5, True)])
+        start = tracker.get_maximum_resources_available()
+        n_tags = tracker._n_tags_free
+        first = tracker.allocate_constrained_resources(resources, [])
+
+        outer = tracker.checkpoint()
+        tracker.allocate_constrained_resources(resources, [])
+        inner = tracker.checkpoint()
+        x, y, p, ip_tags, reverse_ip_tags = \
+            tracker.allocate_constrained_resources(resources, [])
+        tracker.unallocate_resources(
+            x, y, p, resources, ip_tags, reverse_ip_tags)
+        tracker.allocate_many(ResourceContainer(sdram=ConstantSDRAM(1)), 5)
+        tracker.commit(inner)
+        with self.assertRaises(PacmanInvalidParameterException):
+            tracker.rollback(inner)
+        tracker.rollback(outer)
+
+        # Only the first allocation is left
+        self.assertEqual(tracker.chips_used, 1)
+        x, y, p, ip_tags, reverse_ip_tags = first
+        tracker.unallocate_resources(
+            x, y, p, resources, ip_tags, reverse_ip_tags)
+        self.assertEqual(tracker.chips_used, 0)
+        self.assertEqual(tracker._n_tags_free, n_tags)
+        self.assertEqual(tracker._address_and_traffic_ip_tag, dict())
+        end = tracker.get_maximum_resources_available()
+        self.assertEqual(end.cpu_cycles.get_value(),
+                         start.cpu_cycles.get_value())
+        self.assertEqual(end.sdram.fixed, start.sdram.fixed)
+        self.assertEqual(len(tracker.allocate_many(
+            ResourceContainer(sdram=ConstantSDRAM(1)), 16)), 16)
+
+    def test_running_totals(self):
+        machine = virtual_machine(width=8, height=8)
+        resources = ResourceContainer(
+            sdram=ConstantSDRAM(20000000),
+            iptags=[IPtagResource("1.2.3.4", 5, True)])
+        for tracker_class in (ResourceTracker, ArrayResourceTracker):
+            tracker = tracker_class(machine, plan_n_timesteps=None)
+            allocations = [
+                tracker.allocate_constrained_resources(resources, [])
+                for _ in range(60)]
+            token = tracker.checkpoint()
+            for (x, y, p, ip_tags, rip_tags) in allocations[::3]:
+                tracker.unallocate_resources(
+                    x, y, p, resources, ip_tags, rip_tags)
+            self.assertEqual(
+                tracker._available_resources(),
+                tracker._available_resources(
+                    list(tracker._get_usable_chips(None, None))))
+            tracker.rollback(token)
+            n_cores, n_chips, max_sdram, n_tags = \
+                tracker._available_resources()
+            self.assertEqual(
+                (n_cores, n_chips, max_sdram),
+                tracker._available_resources(
+                    list(tracker._get_usable_chips(None, None)))[:3])
+            self.assertEqual(
+                n_tags, sum(len(chip.tag_ids)
+                            for chip in machine.ethernet_connected_chips) - 1)
+
+    def test_allocate_taken_tag(self):
+        machine = virtual_machine(width=2, height=2)
+        tracker = ResourceTracker(machine, plan_n_timesteps=None)
+        board_address = machine.boot_chip.ip_address
+        tracker._setup_board_tags(board_address)
+        n_tags = tracker._n_tags_free
+        tag = tracker._allocate_tag_id(None, board_address)
+        with self.assertRaises(KeyError):
+            tracker._allocate_tag_id(tag, board_address)
+        self.assertEqual(tracker._n_tags_free, n_tags - 1)
+
+    def test_rollback(self):
+        self._check_rollback(ResourceTracker)
+
+    def test_array_tracker_rollback(self):
+        self._check_rollback(ArrayResourceTracker)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,41 @@
+# Copyright (c) 2020 The University of Manchester
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from spinn_machine import MulticastRoutingEntry
+from pacman.exceptions import PacmanInvalidParameterException
+from pacman.utilities.utility_calls import spinnaker_route
+
+
+class TestUtilityCalls(unittest.TestCase):
+
+    def test_spinnaker_route(self):
+        for links, processors in (
+                ([], []), ([0, 5], []), ([], [0, 17]), ([2, 3], [1, 4, 7])):
+            entry = MulticastRoutingEntry(
+                routing_entry_key=0, mask=0, link_ids=links,
+                processor_ids=processors)
+            self.assertEqual(
+                spinnaker_route(links, processors), entry.spinnaker_route)
+
+    def test_spinnaker_route_out_of_range(self):
+        with self.assertRaises(PacmanInvalidParameterException):
+            spinnaker_route([6], [])
+        with self.assertRaises(PacmanInvalidParameterException):
+            spinnaker_route([], [18])
+
+
+if __name__ == '__main__':
+    unittest.main()